@@ -97,6 +97,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'weatherApp.tracing.RequestTracingMiddleware',
 ]
 
 # CORS configuration
@@ -220,5 +221,66 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024
 
-
-
+# Weather advisory models
+# Load every weatherApp model artifact when the WSGI/ASGI application starts
+# instead of per request (manage.py commands load them on first use)
+WEATHER_PRELOAD_MODELS = True
+# Record the memory allocated by each artifact (roughly doubles preload time)
+WEATHER_TRACK_MODEL_MEMORY = True
+# How often workers re-read the materialized soil/altitude table (seconds)
+WEATHER_LOCATION_TABLE_REFRESH_SECONDS = 300
+# Per-district forecasts kept in memory (LRU, rolled over daily)
+WEATHER_FORECAST_CACHE_SIZE = 128
+# Largest number of items accepted by the batch crop requirement endpoint
+WEATHER_BATCH_MAX_ITEMS = 1000
+# Memory budget for the per-soil-type crop requirement models (LRU by soil type)
+WEATHER_SOIL_BUNDLE_CACHE_BYTES = 256 * 1024 * 1024
+# Memory-map the numpy arrays in the soil models so forked workers share them
+WEATHER_SOIL_BUNDLE_MMAP = False
+# How often the water model resolution table checks the soil model directories for changes (seconds)
+WEATHER_MODEL_RESOLUTION_CHECK_SECONDS = 60
+# How often the in-memory crop catalog checks the crop dataset for changes (seconds)
+WEATHER_CROP_CATALOG_CHECK_SECONDS = 30
+# How often the advisory matrix and location table versions check their model files and datasets for changes (seconds)
+WEATHER_MODEL_VERSION_CHECK_SECONDS = 30
+# Run the soil, altitude and weather lookups of an advisory request concurrently
+WEATHER_ADVISORY_CONCURRENT = True
+# Threads shared by all advisory requests of a process
+WEATHER_ADVISORY_WORKERS = 8
+# Per-stage timeouts (seconds), counted from when the stage starts running;
+# a stage over its limit fails the request with 504
+WEATHER_ADVISORY_STAGE_TIMEOUTS = {
+    'soil': 5,
+    'altitude': 5,
+    'weather': 10,
+}
+# Longest a stage may wait for a free advisory thread before the request fails with 504 (seconds)
+WEATHER_ADVISORY_QUEUE_TIMEOUT = 30
+# Run one synthetic prediction per model after warm-up so the first request is not cold
+WEATHER_WARM_UP_PREDICTIONS = True
+# Add a Server-Timing header with the stage durations of advisory requests
+WEATHER_SERVER_TIMING = False
+# Cached district comparisons written by manage.py build_district_comparison
+WEATHER_DISTRICT_COMPARISON_DIR = os.path.join(BASE_DIR, 'reports', 'district_comparison')
+# Forecast charts can be requested for today and up to this many days back
+WEATHER_FORECAST_CHART_MAX_AGE_DAYS = 7
+
+# Advisory progress and per-request stage timings; set WEATHER_LOG_LEVEL=DEBUG
+# for the full crop requirement reports
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'simple': {'format': '%(asctime)s %(levelname)s %(name)s: %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'simple'},
+    },
+    'loggers': {
+        'weatherApp': {
+            'handlers': ['console'],
+            'level': os.environ.get('WEATHER_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
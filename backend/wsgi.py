@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/wsgi/
 
 import os
 
+from django.apps import apps
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
+
+# Load the weather models before the first request instead of at app import.
+# With gunicorn's preload_app (see gunicorn.conf.py) this runs once in the
+# master, and the workers forked from it share the loaded models.
+apps.get_app_config('weatherApp').warm_up()
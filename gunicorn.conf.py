@@ -0,0 +1,42 @@
+"""
+Gunicorn settings for the backend: gunicorn -c gunicorn.conf.py backend.wsgi
+
+The application is loaded in the master before the workers are forked, so
+the weather models warmed up by backend/wsgi.py are loaded once and shared
+copy-on-write by every worker. when_ready then prepares the master for
+forking (see weatherApp.warmup.prepare_for_fork).
+"""
+import logging
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+preload_app = True
+
+logger = logging.getLogger('gunicorn.error')
+
+
+def when_ready(server):
+    # Runs in the master after the preloaded app warmed up, before the first worker is forked
+    if server.cfg.preload_app:
+        from weatherApp.warmup import prepare_for_fork
+
+        prepare_for_fork()
+
+
+def post_fork(server, worker):
+    from weatherApp.warmup import warm_up_report
+
+    report = warm_up_report()
+    warm_up = report['warm_up'] or {}
+    memory = report['memory'] or {}
+    logger.info(
+        "Worker %s forked: warm-up took %ss in the master; %s bytes shared, %s bytes private",
+        worker.pid, warm_up.get('seconds'), memory.get('shared_bytes'), memory.get('private_bytes'),
+    )
+
+
+def child_exit(server, worker):
+    logger.info("Worker %s exited", worker.pid)
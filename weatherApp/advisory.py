@@ -0,0 +1,137 @@
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .tracing import record_stage
+
+logger = logging.getLogger(__name__)
+
+# Used for stages without an entry in WEATHER_ADVISORY_STAGE_TIMEOUTS (seconds)
+DEFAULT_STAGE_TIMEOUT = 10
+# Default of WEATHER_ADVISORY_QUEUE_TIMEOUT (seconds)
+DEFAULT_QUEUE_TIMEOUT = 30
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Process-wide pool for advisory stages, created on first use (after any fork)."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'WEATHER_ADVISORY_WORKERS', 8),
+                    thread_name_prefix='advisory',
+                )
+    return _executor
+
+
+class _StageClock:
+    """When a stage left the pool queue and started running."""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.start = None
+
+
+def _run_stage(func, clock):
+    """
+    Run one stage in a pool thread and return (result, seconds), releasing
+    the thread's DB connection afterwards like the end of a request would.
+    """
+    clock.start = time.perf_counter()
+    clock.started.set()
+    try:
+        return func(), time.perf_counter() - clock.start
+    finally:
+        close_old_connections()
+
+
+@dataclass
+class StageResults:
+    """Result of every advisory stage plus how long each took."""
+    results: dict
+    seconds: dict = field(default_factory=dict)
+    timed_out: set = field(default_factory=set)
+
+    def __getitem__(self, stage):
+        return self.results[stage]
+
+    def error_status(self, stage):
+        """HTTP status for a failed stage: 504 if it timed out, 400 otherwise."""
+        return 504 if stage in self.timed_out else 400
+
+
+def stage_timeout(stage):
+    timeouts = getattr(settings, 'WEATHER_ADVISORY_STAGE_TIMEOUTS', {})
+    return timeouts.get(stage, DEFAULT_STAGE_TIMEOUT)
+
+
+def queue_timeout():
+    return getattr(settings, 'WEATHER_ADVISORY_QUEUE_TIMEOUT', DEFAULT_QUEUE_TIMEOUT)
+
+
+def run_stages(stages):
+    """
+    Run independent advisory stages (name -> zero-argument callable) and
+    return their results.
+
+    Stages run concurrently in a bounded thread pool, each in a copy of the
+    caller's context so context variables carry over. A stage's timeout
+    counts from when a pool thread starts running it, so time spent queued
+    behind other requests' stages does not count against it. A stage that
+    is still running after its timeout, or that has not started within
+    WEATHER_ADVISORY_QUEUE_TIMEOUT of being submitted, gets {"error": ...}
+    as its result and is listed in ``timed_out``. A queued stage is
+    cancelled; a running one keeps its pool thread until it finishes.
+    Exceptions raised by a stage propagate to the caller, as they would
+    when the stages ran inline. With WEATHER_ADVISORY_CONCURRENT = False the
+    stages run one after another in the calling thread (no timeouts).
+    Each stage's duration is added to the current request trace.
+    """
+    if not getattr(settings, 'WEATHER_ADVISORY_CONCURRENT', True) or len(stages) < 2:
+        results = StageResults({})
+        for name, func in stages.items():
+            start = time.perf_counter()
+            results.results[name] = func()
+            results.seconds[name] = time.perf_counter() - start
+            record_stage(name, results.seconds[name])
+        return results
+
+    executor = get_executor()
+    submitted = time.perf_counter()
+    clocks = {name: _StageClock() for name in stages}
+    futures = {
+        name: executor.submit(contextvars.copy_context().run, _run_stage, func, clocks[name])
+        for name, func in stages.items()
+    }
+
+    results = StageResults({})
+    queue_deadline = submitted + queue_timeout()
+    for name, future in futures.items():
+        clock = clocks[name]
+        try:
+            if not clock.started.wait(max(queue_deadline - time.perf_counter(), 0)):
+                future.cancel()
+                logger.warning("Advisory stage %s was not started within %.1fs", name, queue_timeout())
+                raise TimeoutError
+            remaining = stage_timeout(name) - (time.perf_counter() - clock.start)
+            try:
+                results.results[name], results.seconds[name] = future.result(timeout=max(remaining, 0))
+            except TimeoutError:
+                logger.warning("Advisory stage %s timed out after %.1fs", name, stage_timeout(name))
+                raise
+        except TimeoutError:
+            results.results[name] = {"error": f"Timed out while computing the {name} prediction."}
+            results.timed_out.add(name)
+            results.seconds[name] = time.perf_counter() - (clock.start or submitted)
+        record_stage(name, results.seconds[name])
+    return results
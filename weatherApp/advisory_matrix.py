@@ -0,0 +1,184 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+from django.db import transaction
+
+from .crop_catalog import CROP_DATASET_PATH, crop_catalog
+from .location_predictions import score_all_locations
+from .model_registry import ModelVersion, registry
+from .predict_crop_requirements import (
+    SEASON_MAPPING,
+    load_crop_dataset,
+    predict_crop_requirements_batch,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _advisory_model_files():
+    model_paths = [
+        registry.soil_model_path(soil_type, target)
+        for soil_type in registry.soil_types()
+        for target in registry.soil_targets(soil_type)
+    ]
+    return [], model_paths + [CROP_DATASET_PATH]
+
+
+_model_version = ModelVersion(registry, _advisory_model_files)
+
+
+def advisory_model_version():
+    """Version of the crop requirement models and dataset the matrix was built from."""
+    return _model_version()
+
+
+def crop_key(crop_name):
+    return str(crop_name).strip().lower()
+
+
+def entry_fields(soil_type, altitude, season, prediction):
+    """Model fields for one successful predict_crop_requirements result."""
+    requirements = prediction['requirements']
+    planting = requirements.get('planting_info', {})
+    return {
+        'soil_type': soil_type,
+        'altitude': altitude,
+        'crop_key': crop_key(prediction['crop']),
+        'season': season,
+        'crop': prediction['crop'],
+        'model_soil_type': prediction['soil_type'],
+        'nitrogen_kg_per_ha': float(requirements['nitrogen_kg_per_ha']),
+        'phosphorus_kg_per_ha': float(requirements['phosphorus_kg_per_ha']),
+        'potassium_kg_per_ha': float(requirements['potassium_kg_per_ha']),
+        'water_requirement_mm': requirements['water_requirement_mm'],
+        'optimal_ph': requirements.get('optimal_ph'),
+        'min_sunlight_hours': requirements.get('min_sunlight_hours'),
+        'row_spacing_cm': planting.get('row_spacing_cm'),
+        'plant_spacing_cm': planting.get('plant_spacing_cm'),
+        'planting_depth_cm': planting.get('planting_depth_cm'),
+        'expected_yield_tons_per_ha': prediction.get('expected_yield_tons_per_ha'),
+        'intercropping_recommendation': prediction.get('intercropping_recommendation'),
+        'seasonal_recommendations': prediction.get('seasonal_recommendations'),
+        'model_notes': prediction.get('model_notes'),
+    }
+
+
+def entry_to_prediction(entry):
+    """Rebuild the predict_crop_requirements result stored in an AdvisoryMatrixEntry."""
+    requirements = {
+        "nitrogen_kg_per_ha": entry.nitrogen_kg_per_ha,
+        "phosphorus_kg_per_ha": entry.phosphorus_kg_per_ha,
+        "potassium_kg_per_ha": entry.potassium_kg_per_ha,
+        "water_requirement_mm": entry.water_requirement_mm,
+    }
+    if entry.optimal_ph is not None:
+        requirements["optimal_ph"] = entry.optimal_ph
+    if entry.min_sunlight_hours is not None:
+        requirements["min_sunlight_hours"] = entry.min_sunlight_hours
+    if entry.row_spacing_cm is not None:
+        requirements["planting_info"] = {
+            "row_spacing_cm": entry.row_spacing_cm,
+            "plant_spacing_cm": entry.plant_spacing_cm,
+            "planting_depth_cm": entry.planting_depth_cm,
+        }
+
+    prediction = {
+        "crop": entry.crop,
+        "soil_type": entry.model_soil_type,
+        "season": entry.season,
+        "altitude": entry.altitude,
+        "requirements": requirements,
+    }
+    if entry.expected_yield_tons_per_ha is not None:
+        prediction["expected_yield_tons_per_ha"] = entry.expected_yield_tons_per_ha
+    if entry.intercropping_recommendation is not None:
+        prediction["intercropping_recommendation"] = entry.intercropping_recommendation
+    if entry.seasonal_recommendations is not None:
+        prediction["seasonal_recommendations"] = entry.seasonal_recommendations
+    if entry.model_notes:
+        prediction["model_notes"] = entry.model_notes
+    return prediction
+
+
+def _init_worker():
+    # Spawned workers start without Django; forked ones inherit it
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+def score_matrix_group(soil_type, altitude, crops, seasons):
+    """Predict every crop and season for one (soil type, altitude) pair."""
+    items = [
+        {'crop': crop, 'soil_type': soil_type, 'altitude': altitude, 'season': season}
+        for crop in crops
+        for season in seasons
+    ]
+    predictions = predict_crop_requirements_batch(items)
+
+    rows = []
+    for item, prediction in zip(items, predictions):
+        if 'error' in prediction:
+            logger.warning("Skipping %s on %s/%s (%s): %s", item['crop'], soil_type, altitude,
+                           item['season'], prediction['error'])
+            continue
+        rows.append(entry_fields(soil_type, altitude, item['season'], prediction))
+    return rows
+
+
+def build_advisory_matrix(workers=1, model_version=None):
+    """
+    Precompute crop requirements for every (soil type, altitude) a known
+    sector resolves to, times every crop and season, and replace the rows
+    stored for the model version. Pairs are scored in ``workers`` processes.
+    """
+    from .models import AdvisoryMatrixEntry
+
+    model_version = model_version or advisory_model_version()
+    pairs = sorted({(row['soil_type'], row['altitude']) for row in score_all_locations()})
+    crops = list(load_crop_dataset()['crop'].unique())
+    seasons = list(SEASON_MAPPING)
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            groups = list(executor.map(
+                score_matrix_group,
+                [soil_type for soil_type, _ in pairs],
+                [altitude for _, altitude in pairs],
+                [crops] * len(pairs),
+                [seasons] * len(pairs),
+            ))
+    else:
+        groups = [score_matrix_group(soil_type, altitude, crops, seasons) for soil_type, altitude in pairs]
+
+    rows = [AdvisoryMatrixEntry(model_version=model_version, **fields) for group in groups for fields in group]
+
+    with transaction.atomic():
+        AdvisoryMatrixEntry.objects.filter(model_version=model_version).delete()
+        AdvisoryMatrixEntry.objects.bulk_create(rows, batch_size=500)
+
+    return model_version, len(pairs), len(rows)
+
+
+def lookup_advisory(crop_name, soil_type, altitude, season):
+    """Stored prediction for the inputs, or None to fall back to live inference."""
+    from .models import AdvisoryMatrixEntry
+
+    try:
+        # Aliases and misspellings are stored under the crop they resolve to
+        crop, _ = crop_catalog.lookup(crop_name)
+        entry = AdvisoryMatrixEntry.objects.get(
+            model_version=advisory_model_version(),
+            soil_type=soil_type,
+            altitude=altitude,
+            crop_key=crop_key(crop.name if crop is not None else crop_name),
+            season=season,
+        )
+    except AdvisoryMatrixEntry.DoesNotExist:
+        return None
+    except Exception as e:
+        # Table not migrated yet or DB unavailable: serve live predictions
+        logger.warning("Could not read the advisory matrix: %s", e)
+        return None
+    return entry_to_prediction(entry)
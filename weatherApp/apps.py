@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class WeatherappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'weatherApp'
+
+    def warm_up(self, before_fork=False):
+        """
+        Load the prediction models once per process instead of on every request.
+
+        Called from the WSGI/ASGI entry points rather than ready(), so
+        manage.py commands and tests do not pay for loading every model.
+        See ``weatherApp.warmup.warm_up``.
+        """
+        from .warmup import warm_up
+        return warm_up(before_fork=before_fork)
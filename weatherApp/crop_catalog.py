@@ -0,0 +1,286 @@
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from difflib import get_close_matches
+
+import pandas as pd
+from django.conf import settings
+
+from .location_index import normalize_name
+
+logger = logging.getLogger(__name__)
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+CROP_DATASET_PATH = os.path.join(current_dir, 'data', 'comprehensive_crop_requirements.csv')
+
+ALTITUDE_TYPES = ['low', 'mid', 'high']
+SEASON_TYPES = ['dry', 'wet', 'short_dry', 'long_rainy', 'long_dry', 'short_rainy']
+
+# Other names farmers use for crops in the dataset
+CROP_ALIASES = {
+    'corn': 'Maize',
+    'paddy': 'Rice',
+    'potato': 'Irish Potatoes',
+    'potatoes': 'Irish Potatoes',
+    'soya': 'Soybeans',
+    'soya beans': 'Soybeans',
+    'soy beans': 'Soybeans',
+    'peanut': 'Groundnuts',
+    'peanuts': 'Groundnuts',
+    'mung beans': 'Green Grams',
+    'bell pepper': 'Green Peppers',
+    'bell peppers': 'Green Peppers',
+    'aubergine': 'Eggplant',
+    'tamarillo': 'Tree Tomato',
+    'plantain': 'Banana',
+    'cocoyam': 'Taro',
+    'oil palm': 'Palm Oil',
+    'chilli': 'Chili Peppers',
+    'chillies': 'Chili Peppers',
+}
+
+# Ratio below which a fuzzy match is not used (difflib's default)
+FUZZY_CUTOFF = 0.6
+# Fuzzy lookups remembered per dataset version
+FUZZY_CACHE_SIZE = 1024
+
+
+def trigrams(text):
+    """Character trigrams of a normalized name, padded so short names still share grams."""
+    padded = f"  {normalize_name(text)} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def singular(name):
+    """Naive singular of every word of a normalized name ('sweet potatoes' -> 'sweet potato')."""
+    words = []
+    for word in name.split():
+        if word.endswith('oes'):
+            word = word[:-2]
+        elif word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        words.append(word)
+    return ' '.join(words)
+
+
+def build_input_features(crop_data):
+    """Copy of the crop rows with every altitude/season column the models might expect."""
+    input_features = crop_data.copy()
+
+    # Generate all possible altitude-season combinations and ensure they exist in input_features
+    for alt in ALTITUDE_TYPES:
+        for seas in SEASON_TYPES:
+            col_name = f"{alt}_altitude_{seas}_adjusted"
+            if col_name not in input_features.columns:
+                input_features[col_name] = 0.0  # Add with default value
+
+    # Also ensure base altitude columns exist
+    for alt in ALTITUDE_TYPES:
+        col_name = f"{alt}_altitude_adjusted"
+        if col_name not in input_features.columns:
+            input_features[col_name] = 0.0
+
+    return input_features
+
+
+@dataclass(frozen=True, eq=False)
+class CropEntry:
+    """One crop of the dataset: its row and the model input built from it."""
+    name: str
+    data: pd.DataFrame
+    features: pd.DataFrame
+
+
+class CropCatalog:
+    """
+    In-memory copy of the crop requirements dataset.
+
+    Loaded once and reloaded when the CSV's mtime changes (checked at most
+    every ``check_seconds``). Crops are found by normalized name, then by
+    alias (``CROP_ALIASES`` plus singular forms of the dataset names), then
+    by fuzzy match.
+
+    Fuzzy matching keeps difflib's ranking but only runs it on crops whose
+    precomputed character counts allow a ratio above the cutoff (difflib's
+    own quick_ratio bound), so it returns what a full scan would. The
+    trigram index drives autocomplete.
+    """
+
+    def __init__(self, dataset_path=CROP_DATASET_PATH, check_seconds=None):
+        self.dataset_path = dataset_path
+        self.check_seconds = check_seconds
+        self._frame = None
+        self._entries = None
+        self._names = None
+        self._aliases = None
+        self._grams = None
+        self._char_counts = None
+        self._fuzzy = {}
+        self._mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _check_interval(self):
+        if self.check_seconds is not None:
+            return self.check_seconds
+        return getattr(settings, 'WEATHER_CROP_CATALOG_CHECK_SECONDS', 30)
+
+    def _build(self):
+        mtime = os.stat(self.dataset_path).st_mtime_ns
+        frame = pd.read_csv(self.dataset_path)
+        features = build_input_features(frame)
+
+        entries = {}
+        names = {}
+        for position, crop_name in enumerate(frame['crop']):
+            if crop_name in entries:
+                continue
+            entries[crop_name] = CropEntry(
+                name=crop_name,
+                data=frame.iloc[[position]],
+                features=features.iloc[[position]].reset_index(drop=True),
+            )
+            names.setdefault(normalize_name(crop_name), crop_name)
+
+        aliases = {}
+        for normalized, crop_name in names.items():
+            aliases.setdefault(singular(normalized), crop_name)
+        for alias, crop_name in CROP_ALIASES.items():
+            if crop_name in entries:
+                aliases[normalize_name(alias)] = crop_name
+        aliases = {alias: crop_name for alias, crop_name in aliases.items() if alias not in names}
+
+        grams = {}
+        for crop_name in entries:
+            for gram in trigrams(crop_name):
+                grams.setdefault(gram, set()).add(crop_name)
+
+        char_counts = {crop_name: Counter(crop_name) for crop_name in entries}
+
+        with self._lock:
+            self._frame = frame
+            self._entries = entries
+            self._names = names
+            self._aliases = aliases
+            self._grams = grams
+            self._char_counts = char_counts
+            self._fuzzy = {}
+            self._mtime = mtime
+            self._checked_at = time.monotonic()
+        logger.info("Loaded %d crops and %d aliases from %s", len(entries), len(aliases), self.dataset_path)
+
+    def _ensure_loaded(self):
+        if self._entries is None:
+            self._build()
+        elif time.monotonic() - self._checked_at > self._check_interval():
+            if os.stat(self.dataset_path).st_mtime_ns != self._mtime:
+                self._build()
+            else:
+                self._checked_at = time.monotonic()
+
+    def warm_up(self):
+        self._ensure_loaded()
+        return len(self._entries)
+
+    def reload(self):
+        self._build()
+
+    def frame(self):
+        """The dataset as a DataFrame (shared; do not modify)."""
+        self._ensure_loaded()
+        return self._frame
+
+    def names(self):
+        """Crop names in dataset order."""
+        self._ensure_loaded()
+        return list(self._entries)
+
+    def _candidates(self, query):
+        """Crops sharing at least one trigram with the query."""
+        found = set()
+        for gram in trigrams(query):
+            found.update(self._grams.get(gram, ()))
+        return found
+
+    def closest(self, query):
+        """Best fuzzy match for a name, or None if nothing is similar enough."""
+        self._ensure_loaded()
+        try:
+            return self._fuzzy[query]
+        except KeyError:
+            pass
+
+        query_counts = Counter(query)
+        candidates = [
+            crop_name for crop_name, counts in self._char_counts.items()
+            if 2 * sum((query_counts & counts).values()) >= FUZZY_CUTOFF * (len(query) + len(crop_name))
+        ]
+        matches = get_close_matches(query, candidates, n=1, cutoff=FUZZY_CUTOFF)
+        if len(self._fuzzy) >= FUZZY_CACHE_SIZE:
+            self._fuzzy.clear()
+        self._fuzzy[query] = matches[0] if matches else None
+        return self._fuzzy[query]
+
+    def lookup(self, query):
+        """
+        Return (entry, match) for a crop name, where match is 'exact', 'alias'
+        or 'fuzzy', or (None, None) if no crop is close enough.
+        """
+        self._ensure_loaded()
+        normalized = normalize_name(query)
+        if normalized in self._names:
+            return self._entries[self._names[normalized]], 'exact'
+        if normalized in self._aliases:
+            return self._entries[self._aliases[normalized]], 'alias'
+        crop_name = self.closest(query)
+        if crop_name is None:
+            return None, None
+        return self._entries[crop_name], 'fuzzy'
+
+    def autocomplete(self, prefix, limit=10):
+        """
+        Crop names for a partially typed name: names and aliases with a word
+        starting with the prefix first, then the closest fuzzy matches.
+        """
+        self._ensure_loaded()
+        normalized = normalize_name(prefix)
+        if not normalized:
+            return []
+
+        results = {}
+
+        def starts_word(name):
+            return name.startswith(normalized) or f" {normalized}" in f" {name}"
+
+        for name, crop_name in sorted(self._names.items()):
+            if starts_word(name):
+                results.setdefault(crop_name, 'prefix')
+        for alias, crop_name in sorted(self._aliases.items()):
+            if starts_word(alias):
+                results.setdefault(crop_name, 'alias')
+
+        if len(results) < limit:
+            query_grams = trigrams(normalized)
+            scored = []
+            for crop_name in self._candidates(normalized):
+                if crop_name in results:
+                    continue
+                crop_grams = trigrams(crop_name)
+                score = len(query_grams & crop_grams) / len(query_grams | crop_grams)
+                scored.append((-score, crop_name))
+            for _, crop_name in sorted(scored)[:limit - len(results)]:
+                results[crop_name] = 'fuzzy'
+
+        return [{'crop': crop_name, 'match': match} for crop_name, match in list(results.items())[:limit]]
+
+    def __len__(self):
+        self._ensure_loaded()
+        return len(self._entries)
+
+
+# Shared instance used by the crop requirement predictions
+crop_catalog = CropCatalog()
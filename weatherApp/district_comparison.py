@@ -0,0 +1,148 @@
+import logging
+import os
+import tempfile
+import time
+from datetime import date, datetime, timezone as dt_timezone
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.utils import timezone
+
+from .forecast_cache import forecast_seed
+from .predict_weather import (FORECAST_MODEL_VERSION, RWANDA_DISTRICTS, forecast_weather_batch,
+                              summarize_district_forecasts)
+
+logger = logging.getLogger(__name__)
+
+FILE_PREFIX = 'district_comparison_'
+
+
+def comparison_dir():
+    return getattr(settings, 'WEATHER_DISTRICT_COMPARISON_DIR',
+                   os.path.join(settings.BASE_DIR, 'reports', 'district_comparison'))
+
+
+def comparison_path(forecast_date):
+    return os.path.join(comparison_dir(), f'{FILE_PREFIX}{forecast_date.isoformat()}.npz')
+
+
+def district_forecasts(forecast_date, days_to_predict=365):
+    """
+    Forecast of every district starting at forecast_date, each simulated
+    from its own forecast_seed. With the default 365 days a district's rows
+    are the same forecast the advisory views and yearly forecast charts
+    serve for it on that date.
+    """
+    districts = list(RWANDA_DISTRICTS)
+    return forecast_weather_batch(districts, days_to_predict, start_date=forecast_date,
+                                  seeds=[forecast_seed(district, forecast_date) for district in districts])
+
+
+def write_comparison(path, tables, metadata):
+    """
+    Save every column of every table as its own array ("<period>/<column>")
+    in an .npz file, written to a temporary file and renamed into place so
+    readers never see a partial file.
+    """
+    arrays = {f'meta/{key}': np.array(str(value)) for key, value in metadata.items()}
+    for period, table in tables.items():
+        for column in table.columns:
+            values = table[column].to_numpy()
+            # Strings as a fixed-width unicode array, so loading needs no pickle
+            arrays[f'{period}/{column}'] = values.astype(str) if values.dtype == object else values
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix='.', suffix='.npz', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **arrays)
+        # mkstemp creates the file readable by its owner only
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def build_district_comparison(forecast_date=None, days_to_predict=365):
+    """
+    Forecast every district starting at forecast_date (default today; see
+    district_forecasts), summarize it per month, season and year and cache
+    the tables for the date.
+
+    Returns:
+        (path of the cached file, dict of period -> DataFrame)
+    """
+    forecast_date = forecast_date or timezone.localdate()
+    start = time.perf_counter()
+    forecast = district_forecasts(forecast_date, days_to_predict)
+    tables = summarize_district_forecasts(forecast)
+
+    path = comparison_path(forecast_date)
+    write_comparison(path, tables, {
+        'forecast_date': forecast_date.isoformat(),
+        'model_version': FORECAST_MODEL_VERSION,
+        'days': days_to_predict,
+        'created_at': datetime.now(dt_timezone.utc).isoformat(),
+    })
+    logger.info("Built district comparison for %s in %.2fs", forecast_date, time.perf_counter() - start)
+    return path, tables
+
+
+def load_district_comparison(forecast_date, periods=None):
+    """
+    Read the cached comparison for a date.
+
+    Returns (metadata dict, dict of period -> DataFrame) with only the
+    requested periods (all by default), or None if it was not built.
+    """
+    try:
+        data = np.load(comparison_path(forecast_date), allow_pickle=False)
+    except FileNotFoundError:
+        return None
+
+    metadata, columns = {}, {}
+    with data:
+        for key in data.files:
+            period, column = key.split('/', 1)
+            if period == 'meta':
+                metadata[column] = data[key].item()
+            elif periods is None or period in periods:
+                columns.setdefault(period, {})[column] = data[key]
+    return metadata, {period: pd.DataFrame(table) for period, table in columns.items()}
+
+
+def comparison_dates():
+    """Dates with a cached comparison, oldest first."""
+    directory = comparison_dir()
+    if not os.path.isdir(directory):
+        return []
+    dates = []
+    for name in os.listdir(directory):
+        if name.startswith(FILE_PREFIX) and name.endswith('.npz'):
+            try:
+                dates.append(date.fromisoformat(name[len(FILE_PREFIX):-len('.npz')]))
+            except ValueError:
+                continue
+    return sorted(dates)
+
+
+def latest_comparison_date(on_or_before):
+    """Most recent date up to on_or_before with a cached comparison, or None."""
+    dates = [d for d in comparison_dates() if d <= on_or_before]
+    return dates[-1] if dates else None
+
+
+def prune_district_comparisons(keep):
+    """Delete all but the ``keep`` most recent cached comparisons. Returns the number deleted."""
+    directory = comparison_dir()
+    if not os.path.isdir(directory):
+        return 0
+    # ISO dates in the names sort chronologically
+    files = sorted(f for f in os.listdir(directory) if f.startswith(FILE_PREFIX) and f.endswith('.npz'))
+    stale = files[:-keep] if keep > 0 else files
+    for name in stale:
+        os.remove(os.path.join(directory, name))
+    return len(stale)
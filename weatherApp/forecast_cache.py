@@ -0,0 +1,163 @@
+import logging
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils import timezone
+
+from .location_index import normalize_name
+from .predict_weather import FORECAST_MODEL_VERSION, RWANDA_DISTRICTS, get_forecast
+
+logger = logging.getLogger(__name__)
+
+
+def forecast_seed(district, forecast_date, model_version=FORECAST_MODEL_VERSION):
+    """Stable seed so every worker produces the same forecast for a district on a given day."""
+    return zlib.crc32(f"{district}|{forecast_date.isoformat()}|{model_version}".encode())
+
+
+_DISTRICT_NAMES = {normalize_name(district): district for district in RWANDA_DISTRICTS}
+
+
+def canonical_district(name):
+    """Return the RWANDA_DISTRICTS spelling of a district name (case and whitespace ignored), or None."""
+    return _DISTRICT_NAMES.get(normalize_name(name))
+
+
+class ForecastCache:
+    """
+    Bounded LRU cache of WeatherForecastSummary objects keyed by
+    (district, forecast date, model version).
+
+    Forecasts are seeded from the key, so a hit and a recomputation return
+    the same values. District names are mapped to their ``RWANDA_DISTRICTS``
+    spelling; forecasts for unknown names are computed but never cached, so
+    they cannot evict the real districts. The first lookup for a new day
+    drops the previous day's entries and re-warms every district in a
+    background thread; only the requested district is computed inline.
+    """
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._warmed_date = None
+        self._warm_up_thread = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.uncached = 0
+
+    def _capacity(self):
+        if self.max_entries is not None:
+            return self.max_entries
+        return getattr(settings, 'WEATHER_FORECAST_CACHE_SIZE', 128)
+
+    def _compute(self, district, forecast_date):
+        return get_forecast(district, seed=forecast_seed(district, forecast_date), start_date=forecast_date)
+
+    def _store(self, key, forecast):
+        with self._lock:
+            # A background warm-up may finish after the cache rolled over to the next day
+            if key[1] < self._warmed_date:
+                return
+            self._entries[key] = forecast
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._capacity():
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _roll_over(self, forecast_date):
+        """Move the cache to forecast_date and drop earlier days. False if it already was there or later."""
+        with self._lock:
+            if self._warmed_date is not None and forecast_date <= self._warmed_date:
+                return False
+            self._warmed_date = forecast_date
+            for key in [k for k in self._entries if k[1] < forecast_date]:
+                del self._entries[key]
+            return True
+
+    def get(self, district, forecast_date=None):
+        """Return the forecast summary for a district, computing it on a miss."""
+        forecast_date = forecast_date or timezone.localdate()
+        if (self._warmed_date is None or forecast_date > self._warmed_date) and self._roll_over(forecast_date):
+            self._warm_up_thread = threading.Thread(
+                target=self._fill, args=(forecast_date, list(RWANDA_DISTRICTS)),
+                name='forecast-cache-warm-up', daemon=True,
+            )
+            self._warm_up_thread.start()
+
+        canonical = canonical_district(district)
+        if canonical is None:
+            with self._lock:
+                self.uncached += 1
+            return self._compute(district, forecast_date)
+
+        key = (canonical, forecast_date, FORECAST_MODEL_VERSION)
+        with self._lock:
+            forecast = self._entries.get(key)
+            if forecast is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return forecast
+            self.misses += 1
+
+        # Computed outside the lock; concurrent misses produce identical results
+        forecast = self._compute(canonical, forecast_date)
+        self._store(key, forecast)
+        return forecast
+
+    def _fill(self, forecast_date, districts):
+        start = time.perf_counter()
+        for district in districts:
+            key = (district, forecast_date, FORECAST_MODEL_VERSION)
+            with self._lock:
+                if key in self._entries or forecast_date < self._warmed_date:
+                    continue
+            try:
+                self._store(key, self._compute(district, forecast_date))
+            except Exception as e:
+                logger.warning("Could not precompute forecast for %s: %s", district, e)
+
+        elapsed = time.perf_counter() - start
+        logger.info("Warmed forecast cache for %d districts (%s) in %.2fs", len(districts), forecast_date, elapsed)
+        return elapsed
+
+    def warm_up(self, forecast_date=None, districts=None):
+        """Precompute forecasts for every district and drop entries from earlier days."""
+        forecast_date = forecast_date or timezone.localdate()
+        names = RWANDA_DISTRICTS if districts is None else districts
+        self._roll_over(forecast_date)
+        return self._fill(forecast_date, [d for d in map(canonical_district, names) if d is not None])
+
+    def discard(self, district, forecast_date=None):
+        """Drop one district's forecast so the next lookup recomputes it."""
+        forecast_date = forecast_date or timezone.localdate()
+        with self._lock:
+            self._entries.pop((canonical_district(district), forecast_date, FORECAST_MODEL_VERSION), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._warmed_date = None
+            self.hits = self.misses = self.evictions = self.uncached = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'model_version': FORECAST_MODEL_VERSION,
+            'forecast_date': self._warmed_date.isoformat() if self._warmed_date else None,
+            'entries': len(self._entries),
+            'max_entries': self._capacity(),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'uncached': self.uncached,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+# Shared instance used by the advisory views
+forecast_cache = ForecastCache()
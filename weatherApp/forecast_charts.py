@@ -0,0 +1,168 @@
+import io
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils import timezone
+
+from .district_comparison import build_district_comparison, load_district_comparison
+from .forecast_cache import forecast_seed
+from .models import ForecastChart
+from .predict_weather import (COMPARISON_CHARTS, YEARLY_FORECAST_CHARTS, forecast_weather_yearly,
+                              render_comparison_chart, render_yearly_forecast_chart)
+
+logger = logging.getLogger(__name__)
+
+CHART_FORMATS = [value for value, _ in ForecastChart.FORMAT_CHOICES]
+
+# Chart data kept by a worker between jobs, keyed by (district, forecast date)
+_MAX_CACHED_DATA = 8
+
+
+def chart_types(district):
+    """Chart types of a district's yearly forecast, or of the district comparison when district is blank."""
+    return list(YEARLY_FORECAST_CHARTS if district else COMPARISON_CHARTS)
+
+
+def chart_date_range():
+    """(oldest, newest) forecast dates charts can be requested for: today and WEATHER_FORECAST_CHART_MAX_AGE_DAYS back."""
+    today = timezone.localdate()
+    return today - timedelta(days=getattr(settings, 'WEATHER_FORECAST_CHART_MAX_AGE_DAYS', 7)), today
+
+
+def chart_file_name(chart):
+    return f'{chart.forecast_date.isoformat()}/{chart.district or "all"}/{chart.chart_type}.{chart.format}'
+
+
+def request_charts(district, forecast_date, types=None, fmt='png'):
+    """
+    Return the charts of a district (blank for the district comparison) for
+    a date, queuing the ones that were never rendered or whose file has gone
+    missing. Never renders anything itself.
+
+    Raises ValueError for a date outside chart_date_range(), so callers
+    cannot queue work for arbitrary dates.
+    """
+    oldest, newest = chart_date_range()
+    if not oldest <= forecast_date <= newest:
+        raise ValueError(f"Charts are only available from {oldest.isoformat()} to {newest.isoformat()}")
+
+    charts = []
+    for chart_type in types or chart_types(district):
+        chart, created = ForecastChart.objects.get_or_create(
+            district=district, forecast_date=forecast_date, chart_type=chart_type, format=fmt,
+        )
+        if not created and chart.status == ForecastChart.READY and not chart.file.storage.exists(chart.file.name):
+            ForecastChart.objects.filter(pk=chart.pk, status=ForecastChart.READY).update(
+                status=ForecastChart.PENDING, updated_at=timezone.now(),
+            )
+            chart.status = ForecastChart.PENDING
+        charts.append(chart)
+    return charts
+
+
+def chart_status(chart):
+    status = {'chart': chart.chart_type, 'format': chart.format, 'status': chart.status, 'url': None}
+    if chart.status == ForecastChart.READY:
+        status['url'] = chart.file.url
+    elif chart.status == ForecastChart.FAILED:
+        status['error'] = chart.error
+    return status
+
+
+def claim_next_chart():
+    """
+    Mark the oldest pending chart as running and return it, or None when
+    the queue is empty. The conditional update makes sure that of several
+    workers only one claims a chart.
+    """
+    while True:
+        chart = ForecastChart.objects.filter(status=ForecastChart.PENDING).order_by('updated_at', 'pk').first()
+        if chart is None:
+            return None
+        claimed = ForecastChart.objects.filter(pk=chart.pk, status=ForecastChart.PENDING).update(
+            status=ForecastChart.RUNNING, updated_at=timezone.now(),
+        )
+        if claimed:
+            chart.status = ForecastChart.RUNNING
+            return chart
+
+
+def requeue_charts(statuses):
+    """Queue charts in the given statuses again. Returns the number queued."""
+    return ForecastChart.objects.filter(status__in=statuses).update(
+        status=ForecastChart.PENDING, error=None, updated_at=timezone.now(),
+    )
+
+
+def prune_forecast_charts(keep_days):
+    """
+    Delete the charts, and their files, of forecast dates more than
+    ``keep_days`` days before today. Returns the number deleted.
+    """
+    stale = ForecastChart.objects.filter(forecast_date__lt=timezone.localdate() - timedelta(days=keep_days))
+    for chart in stale.exclude(file=''):
+        chart.file.delete(save=False)
+    return stale.delete()[0]
+
+
+def chart_data(district, forecast_date):
+    """Forecast a chart is drawn from: the district's yearly forecast, or the cached district comparison."""
+    if district:
+        return forecast_weather_yearly(district, seed=forecast_seed(district, forecast_date), start_date=forecast_date)
+    comparison = load_district_comparison(forecast_date)
+    if comparison is not None:
+        return comparison[1]
+    return build_district_comparison(forecast_date)[1]
+
+
+def render_chart(chart, data):
+    """Draw a claimed chart into MEDIA_ROOT and mark it ready."""
+    render = render_yearly_forecast_chart if chart.district else render_comparison_chart
+    buffer = io.BytesIO()
+    render(data, chart.chart_type, buffer, fmt=chart.format)
+
+    if chart.file:
+        chart.file.delete(save=False)
+    chart.file.save(chart_file_name(chart), ContentFile(buffer.getvalue()), save=False)
+    chart.status = ForecastChart.READY
+    chart.error = None
+    chart.save(update_fields=['file', 'status', 'error', 'updated_at'])
+
+
+def run_pending_charts(limit=None):
+    """
+    Render queued charts until the queue is empty or ``limit`` charts were
+    rendered. A chart that fails to render is marked failed with the error.
+
+    Returns:
+        (number rendered, number failed)
+    """
+    rendered = failed = 0
+    data_cache = {}
+    while limit is None or rendered + failed < limit:
+        chart = claim_next_chart()
+        if chart is None:
+            break
+
+        start = time.perf_counter()
+        key = (chart.district, chart.forecast_date)
+        try:
+            if key not in data_cache:
+                if len(data_cache) >= _MAX_CACHED_DATA:
+                    data_cache.pop(next(iter(data_cache)))
+                data_cache[key] = chart_data(*key)
+            render_chart(chart, data_cache[key])
+        except Exception as e:
+            logger.exception("Rendering %s failed", chart)
+            ForecastChart.objects.filter(pk=chart.pk).update(
+                status=ForecastChart.FAILED, error=str(e), updated_at=timezone.now(),
+            )
+            failed += 1
+            continue
+
+        logger.info("Rendered %s in %.2fs", chart, time.perf_counter() - start)
+        rendered += 1
+    return rendered, failed
@@ -0,0 +1,54 @@
+import importlib
+import logging
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_timings = {}
+_lock = threading.Lock()
+
+
+def load_module(name):
+    """
+    Import a heavy dependency on first use and record how long it took.
+
+    The plotting, scikit-learn and TensorFlow stacks are only needed for
+    training, reports and a few fallbacks, so weatherApp goes through this
+    loader instead of importing them at module load.
+    """
+    if name in _timings:
+        return sys.modules[name]
+
+    with _lock:
+        if name not in _timings:
+            already_loaded = name in sys.modules
+            start = time.perf_counter()
+            importlib.import_module(name)
+            elapsed = time.perf_counter() - start
+            _timings[name] = {
+                'import_ms': round(elapsed * 1000, 1),
+                'already_loaded': already_loaded,
+            }
+            logger.info("Imported %s in %.1f ms", name, elapsed * 1000)
+    return sys.modules[name]
+
+
+class LazyModule:
+    """Stand-in for a module that imports it through load_module on first attribute access."""
+
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(load_module(self._name), attr)
+
+    def __repr__(self):
+        state = 'loaded' if self._name in _timings else 'not loaded'
+        return f"<LazyModule {self._name} ({state})>"
+
+
+def import_timings():
+    """Import time of every module loaded through load_module in this process."""
+    return {name: dict(timing) for name, timing in _timings.items()}
@@ -0,0 +1,144 @@
+import os
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .model_registry import registry
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+SOIL_DATASET_PATH = os.path.join(current_dir, 'data', 'rwanda_soilTypes.csv')
+SECTORS_DATASET_PATH = os.path.join(current_dir, 'data', 'rwanda_complete_districts_and_sectors_soilData.csv')
+
+
+def normalize_name(name):
+    """Case- and whitespace-insensitive key for district and sector names."""
+    return ' '.join(str(name).split()).casefold()
+
+
+@dataclass(frozen=True)
+class LocationRecord:
+    district: str
+    sector: str
+    latitude: float
+    longitude: float
+    district_encoded: Optional[int]
+    sector_encoded: Optional[int]
+
+
+def _encode(encoder, name):
+    """Label-encoder id for a name, or None when the encoder has never seen it."""
+    if encoder is None:
+        return None
+    position = int(np.searchsorted(encoder.classes_, name))
+    if position < len(encoder.classes_) and encoder.classes_[position] == name:
+        return position
+    return None
+
+
+class LocationIndex:
+    """
+    In-memory index of every known (district, sector) pair.
+
+    Built once from the soil datasets. Maps each pair to its centroid
+    coordinates and label-encoder ids, and each district to its sectors.
+    Lookups are dict reads and ignore case and extra whitespace.
+    """
+
+    def __init__(self, soil_dataset_path=SOIL_DATASET_PATH, sectors_dataset_path=SECTORS_DATASET_PATH):
+        self.soil_dataset_path = soil_dataset_path
+        self.sectors_dataset_path = sectors_dataset_path
+        self._records = None
+        self._districts = None
+        self._sectors = None
+        self._lock = threading.Lock()
+
+    def _build(self):
+        frames = [pd.read_csv(self.soil_dataset_path)[['District', 'Sector', 'Latitude', 'Longitude']]]
+        if os.path.exists(self.sectors_dataset_path):
+            # Sectors missing from the soil dataset take their coordinates from the complete list
+            sectors = pd.read_csv(self.sectors_dataset_path)[['District', 'Sector', 'Latitude', 'Longitude']]
+            known = set(zip(frames[0]['District'], frames[0]['Sector']))
+            extra = [pair not in known for pair in zip(sectors['District'], sectors['Sector'])]
+            frames.append(sectors[extra])
+
+        centroids = (pd.concat(frames, ignore_index=True)
+                     .groupby(['District', 'Sector'], sort=True)[['Latitude', 'Longitude']]
+                     .mean())
+
+        try:
+            district_encoder = registry.get('district_encoder')
+            sector_encoder = registry.get('sector_encoder')
+        except FileNotFoundError:
+            district_encoder = sector_encoder = None
+
+        records = {}
+        districts = {}
+        sectors = {}
+        for (district, sector), row in centroids.iterrows():
+            record = LocationRecord(
+                district=district,
+                sector=sector,
+                latitude=float(row['Latitude']),
+                longitude=float(row['Longitude']),
+                district_encoded=_encode(district_encoder, district),
+                sector_encoded=_encode(sector_encoder, sector),
+            )
+            records[(normalize_name(district), normalize_name(sector))] = record
+            districts.setdefault(normalize_name(district), district)
+            sectors.setdefault(district, []).append(sector)
+
+        self._sectors = {district: tuple(sorted(names)) for district, names in sectors.items()}
+        self._districts = districts
+        self._records = records
+
+    def _ensure_built(self):
+        if self._records is None:
+            with self._lock:
+                if self._records is None:
+                    self._build()
+
+    def warm_up(self):
+        self._ensure_built()
+        return len(self._records)
+
+    def reload(self):
+        with self._lock:
+            self._build()
+
+    def lookup(self, district, sector):
+        """Return the LocationRecord for a (district, sector) pair, or None."""
+        self._ensure_built()
+        return self._records.get((normalize_name(district), normalize_name(sector)))
+
+    def records(self):
+        """Every indexed location, ordered by district and sector."""
+        self._ensure_built()
+        return sorted(self._records.values(), key=lambda r: (r.district, r.sector))
+
+    def canonical_district(self, district):
+        """Return the dataset spelling of a district name, or None."""
+        self._ensure_built()
+        return self._districts.get(normalize_name(district))
+
+    def districts(self):
+        self._ensure_built()
+        return sorted(self._sectors)
+
+    def sectors(self, district):
+        """List the sectors of a district (empty if the district is unknown)."""
+        canonical = self.canonical_district(district)
+        if canonical is None:
+            return []
+        return list(self._sectors[canonical])
+
+    def __len__(self):
+        self._ensure_built()
+        return len(self._records)
+
+
+# Shared instance used by the soil, altitude and sector lookups
+location_index = LocationIndex()
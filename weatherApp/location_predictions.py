@@ -0,0 +1,136 @@
+import logging
+import threading
+import time
+
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+
+from .location_index import SECTORS_DATASET_PATH, SOIL_DATASET_PATH, location_index, normalize_name
+from .model_registry import ModelVersion, registry
+from .predict_locationl_altitude import load_model_components
+from .predict_soil_type import get_soil_preprocessor_artifact
+
+logger = logging.getLogger(__name__)
+
+# Artifacts whose content determines the soil and altitude predictions
+LOCATION_MODEL_ARTIFACTS = [
+    'soil_texture_model',
+    'soil_preprocessor_fitted',
+    'altitude_model',
+    'district_encoder',
+    'sector_encoder',
+    'altitude_mapping',
+]
+
+_model_version = ModelVersion(
+    registry, lambda: (LOCATION_MODEL_ARTIFACTS, [SOIL_DATASET_PATH, SECTORS_DATASET_PATH])
+)
+
+
+def location_model_version():
+    """Version of the current soil/altitude models and location datasets."""
+    return _model_version()
+
+
+def score_all_locations():
+    """
+    Predict soil type and altitude for every indexed (district, sector) pair
+    with one vectorized predict per model.
+
+    Pairs the altitude encoders do not know are left out; they keep going
+    through live inference.
+    """
+    records = [r for r in location_index.records()
+               if r.district_encoded is not None and r.sector_encoded is not None]
+    if not records:
+        return []
+
+    soil_model = registry.get('soil_texture_model')
+    preprocessor = get_soil_preprocessor_artifact()['preprocessor']
+    soil_features = preprocessor.transform(pd.DataFrame({
+        'District': [r.district for r in records],
+        'Latitude': [r.latitude for r in records],
+        'Longitude': [r.longitude for r in records],
+    }))
+    soil_types = soil_model.predict(soil_features)
+
+    altitude_model, _, _, altitude_mapping = load_model_components()
+    altitudes = altitude_model.predict([[r.district_encoded, r.sector_encoded] for r in records])
+
+    return [
+        {
+            'district': record.district,
+            'sector': record.sector,
+            'soil_type': str(soil_type).lower(),
+            'altitude': altitude_mapping[altitude],
+        }
+        for record, soil_type, altitude in zip(records, soil_types, altitudes)
+    ]
+
+
+def materialize_location_predictions(model_version=None):
+    """Replace the stored predictions for a model version with a fresh scoring run."""
+    from .models import LocationPrediction
+
+    model_version = model_version or location_model_version()
+    rows = [LocationPrediction(model_version=model_version, **scored) for scored in score_all_locations()]
+
+    with transaction.atomic():
+        LocationPrediction.objects.filter(model_version=model_version).delete()
+        LocationPrediction.objects.bulk_create(rows, batch_size=500)
+
+    location_predictions.reload()
+    return model_version, len(rows)
+
+
+class LocationPredictionTable:
+    """
+    Process-local copy of the materialized LocationPrediction rows for the
+    current model version, so lookups are a dict read instead of a model
+    predict or a DB query. Refreshed from the DB every ``refresh_seconds``.
+    """
+
+    def __init__(self, refresh_seconds=None):
+        self.refresh_seconds = refresh_seconds
+        self._rows = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _refresh_interval(self):
+        if self.refresh_seconds is not None:
+            return self.refresh_seconds
+        return getattr(settings, 'WEATHER_LOCATION_TABLE_REFRESH_SECONDS', 300)
+
+    def reload(self):
+        from .models import LocationPrediction
+
+        version = location_model_version()
+        rows = LocationPrediction.objects.filter(model_version=version).values_list(
+            'district', 'sector', 'soil_type', 'altitude'
+        )
+        table = {
+            (normalize_name(district), normalize_name(sector)): (soil_type, altitude)
+            for district, sector, soil_type, altitude in rows
+        }
+        with self._lock:
+            self._rows = table
+            self._loaded_at = time.monotonic()
+        return len(table)
+
+    def lookup(self, district, sector):
+        """Return (soil_type, altitude) for a known pair, or None to fall back to live inference."""
+        if self._rows is None or time.monotonic() - self._loaded_at > self._refresh_interval():
+            try:
+                self.reload()
+            except Exception as e:
+                # Table not migrated yet or DB unavailable: serve live predictions
+                logger.warning("Could not load materialized location predictions: %s", e)
+                with self._lock:
+                    self._rows = self._rows or {}
+                    self._loaded_at = time.monotonic()
+        return self._rows.get((normalize_name(district), normalize_name(sector)))
+
+
+# Shared instance used by the advisory views
+location_predictions = LocationPredictionTable()
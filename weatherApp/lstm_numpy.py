@@ -0,0 +1,129 @@
+"""
+NumPy-only inference for the location LSTM weather models.
+
+``export_keras_model`` (run once, wherever TensorFlow is installed) writes
+the weights of a trained Sequential LSTM/Dropout/Dense model to a ``.npz``
+file. ``NumpyLSTMModel`` loads that file and runs the forward pass with
+NumPy, so serving a forecast never imports TensorFlow.
+"""
+import os
+
+import numpy as np
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _hard_sigmoid(x):
+    return np.clip(0.2 * x + 0.5, 0.0, 1.0)
+
+
+ACTIVATIONS = {
+    'tanh': np.tanh,
+    'sigmoid': _sigmoid,
+    'hard_sigmoid': _hard_sigmoid,
+    'relu': lambda x: np.maximum(x, 0.0),
+    'linear': lambda x: x,
+}
+
+
+def export_keras_model(model, npz_path):
+    """
+    Write the weights of a Keras Sequential model made of LSTM, Dropout and
+    Dense layers to ``npz_path``. Dropout is a no-op at inference and is skipped.
+    """
+    arrays = {}
+    layers = []
+    for layer in model.layers:
+        kind = type(layer).__name__
+        if kind == 'Dropout':
+            continue
+        index = len(layers)
+        weights = layer.get_weights()
+        if kind == 'LSTM':
+            arrays[f'{index}_kernel'], arrays[f'{index}_recurrent_kernel'], arrays[f'{index}_bias'] = weights
+            arrays[f'{index}_config'] = np.array([
+                'lstm', layer.activation.__name__, layer.recurrent_activation.__name__,
+                str(bool(layer.return_sequences)),
+            ])
+        elif kind == 'Dense':
+            arrays[f'{index}_kernel'], arrays[f'{index}_bias'] = weights
+            arrays[f'{index}_config'] = np.array(['dense', layer.activation.__name__])
+        else:
+            raise ValueError(f"Unsupported layer type for NumPy export: {kind}")
+        layers.append(kind)
+
+    arrays['layer_count'] = np.array(len(layers))
+    os.makedirs(os.path.dirname(os.path.abspath(npz_path)), exist_ok=True)
+    np.savez(npz_path, **arrays)
+    return layers
+
+
+class NumpyLSTMModel:
+    """
+    Forward pass of an exported LSTM model. ``predict`` and
+    ``predict_on_batch`` take (batch, timesteps, features) inputs and return
+    (batch, units) outputs, like the Keras model they replace.
+    """
+
+    def __init__(self, layers):
+        self.layers = layers
+
+    @classmethod
+    def load(cls, npz_path):
+        with np.load(npz_path, allow_pickle=False) as data:
+            layers = []
+            for index in range(int(data['layer_count'])):
+                config = [str(value) for value in data[f'{index}_config']]
+                layer = {
+                    'type': config[0],
+                    'kernel': data[f'{index}_kernel'].astype(np.float32),
+                    'bias': data[f'{index}_bias'].astype(np.float32),
+                    'activation': ACTIVATIONS[config[1]],
+                }
+                if config[0] == 'lstm':
+                    layer['recurrent_kernel'] = data[f'{index}_recurrent_kernel'].astype(np.float32)
+                    layer['recurrent_activation'] = ACTIVATIONS[config[2]]
+                    layer['return_sequences'] = config[3] == 'True'
+                layers.append(layer)
+        return cls(layers)
+
+    @staticmethod
+    def _lstm(layer, x):
+        batch, timesteps, _ = x.shape
+        units = layer['recurrent_kernel'].shape[0]
+        activation = layer['activation']
+        recurrent_activation = layer['recurrent_activation']
+        recurrent_kernel = layer['recurrent_kernel']
+
+        # Input projection for every timestep at once; gates are ordered i, f, c, o
+        projected = x @ layer['kernel'] + layer['bias']
+        h = np.zeros((batch, units), dtype=np.float32)
+        c = np.zeros((batch, units), dtype=np.float32)
+        outputs = np.empty((batch, timesteps, units), dtype=np.float32) if layer['return_sequences'] else None
+
+        for t in range(timesteps):
+            z = projected[:, t] + h @ recurrent_kernel
+            i = recurrent_activation(z[:, :units])
+            f = recurrent_activation(z[:, units:2 * units])
+            g = activation(z[:, 2 * units:3 * units])
+            o = recurrent_activation(z[:, 3 * units:])
+            c = f * c + i * g
+            h = o * activation(c)
+            if outputs is not None:
+                outputs[:, t] = h
+
+        return outputs if outputs is not None else h
+
+    def predict(self, X, verbose=0):
+        x = np.asarray(X, dtype=np.float32)
+        for layer in self.layers:
+            if layer['type'] == 'lstm':
+                x = self._lstm(layer, x)
+            else:
+                x = layer['activation'](x @ layer['kernel'] + layer['bias'])
+        return x
+
+    def predict_on_batch(self, X):
+        return self.predict(X)
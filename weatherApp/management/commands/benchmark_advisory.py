@@ -0,0 +1,94 @@
+import contextlib
+import io
+import json
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from weatherApp.benchmarking import percentile
+from weatherApp.forecast_cache import forecast_cache
+from weatherApp.location_index import location_index
+from weatherApp.predict_weather import RWANDA_DISTRICTS
+
+ADVISORY_URL = '/weather/create/'
+
+
+class Command(BaseCommand):
+    help = "Compare end-to-end advisory latency with sequential and concurrent soil/altitude/weather lookups"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=30,
+                            help="Requests per mode, spread over the known sectors (default: 30)")
+        parser.add_argument('--crop', default='Maize')
+        parser.add_argument('--season', default='long_rainy')
+        parser.add_argument('--cold', action='store_true',
+                            help="Drop each district's cached forecast before its request")
+        parser.add_argument('--json', action='store_true', help="Print the results as JSON")
+
+    def sample_locations(self, count):
+        records = [r for r in location_index.records() if r.district in RWANDA_DISTRICTS]
+        step = max(1, len(records) // max(count, 1))
+        return [(r.district, r.sector) for r in records[::step][:count]]
+
+    def time_requests(self, client, locations, options):
+        timings = []
+        for district, sector in locations:
+            if options['cold']:
+                forecast_cache.discard(district)
+            payload = {'district': district, 'sector': sector, 'crop': options['crop'], 'season': options['season']}
+            start = time.perf_counter()
+            # Own savepoint, so a failed save (e.g. a repeated weather record) is undone alone
+            with contextlib.redirect_stdout(io.StringIO()), transaction.atomic():
+                response = client.post(ADVISORY_URL, payload, format='json')
+            timings.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                self.stderr.write(f"{district}/{sector}: HTTP {response.status_code} {response.content[:200]!r}")
+        return timings
+
+    def handle(self, *args, **options):
+        locations = self.sample_locations(options['requests'])
+        report = {'requests': len(locations), 'cold': options['cold'], 'modes': {}}
+
+        # Requests save predictions; keep the benchmark out of the database.
+        # The test client sends Host: testserver, as under the test runner
+        with transaction.atomic(), override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            user = get_user_model().objects.create_user(
+                phone_number='0700000000', role='farmer', email='advisory-benchmark@example.com', password=None,
+            )
+            client = APIClient()
+            client.force_authenticate(user)
+
+            # One untimed request per mode so lazy loading is not measured
+            for concurrent in (False, True):
+                with override_settings(WEATHER_ADVISORY_CONCURRENT=concurrent):
+                    self.time_requests(client, locations[:1], dict(options, cold=False))
+
+            for mode, concurrent in (('sequential', False), ('concurrent', True)):
+                with override_settings(WEATHER_ADVISORY_CONCURRENT=concurrent):
+                    timings = self.time_requests(client, locations, options)
+                report['modes'][mode] = {
+                    'p50_ms': round(percentile(timings, 50) * 1000, 2),
+                    'p95_ms': round(percentile(timings, 95) * 1000, 2),
+                    'mean_ms': round(statistics.mean(timings) * 1000, 2),
+                }
+            transaction.set_rollback(True)
+
+        sequential = report['modes']['sequential']['mean_ms']
+        concurrent = report['modes']['concurrent']['mean_ms']
+        report['speedup'] = round(sequential / concurrent, 2) if concurrent else None
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        for mode, timing in report['modes'].items():
+            self.stdout.write(f"{mode:<11} p50 {timing['p50_ms']:.1f} ms  p95 {timing['p95_ms']:.1f} ms  "
+                              f"mean {timing['mean_ms']:.1f} ms")
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(locations)} requests per mode, concurrent is {report['speedup']}x the sequential throughput"
+        ))
@@ -0,0 +1,82 @@
+import json
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Libraries that should only be imported on first use, never at startup
+HEAVY_MODULES = ['tensorflow', 'keras', 'matplotlib', 'seaborn', 'sklearn', 'scipy']
+
+# Runs in a fresh interpreter so nothing is already imported or cached
+STARTUP_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+setup_done = time.perf_counter()
+from django.urls import get_resolver, resolve
+get_resolver().url_patterns
+for url in %(urls)r:
+    resolve(url)
+urls_done = time.perf_counter()
+print(json.dumps({
+    'setup_seconds': setup_done - start,
+    'url_seconds': urls_done - setup_done,
+    'total_seconds': urls_done - start,
+    'heavy_modules': sorted(m for m in %(heavy)r if m in sys.modules),
+}))
+"""
+
+PROBE_URLS = ['/weather/create/', '/sales/available/']
+
+
+class Command(BaseCommand):
+    help = "Measure django.setup() plus URL resolution time in fresh interpreters"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5,
+                            help="Number of fresh interpreters to time (default: 5)")
+        parser.add_argument('--max-seconds', type=float, default=None,
+                            help="Fail if the median total startup time exceeds this")
+        parser.add_argument('--json', action='store_true',
+                            help="Print the results as JSON")
+
+    def probe(self):
+        result = subprocess.run(
+            [sys.executable, '-c', STARTUP_PROBE % {'urls': PROBE_URLS, 'heavy': HEAVY_MODULES}],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Startup probe failed:\n{result.stderr}")
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def handle(self, *args, **options):
+        runs = [self.probe() for _ in range(max(1, options['runs']))]
+
+        report = {'runs': len(runs)}
+        for phase in ('setup_seconds', 'url_seconds', 'total_seconds'):
+            values = [run[phase] for run in runs]
+            report[phase] = {
+                'median': round(statistics.median(values), 4),
+                'min': round(min(values), 4),
+                'max': round(max(values), 4),
+            }
+        report['heavy_modules'] = sorted({m for run in runs for m in run['heavy_modules']})
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            for phase, label in (('setup_seconds', 'django.setup()'), ('url_seconds', 'URL resolution'),
+                                 ('total_seconds', 'Total')):
+                timing = report[phase]
+                self.stdout.write(f"{label:<16} median {timing['median']:.3f}s "
+                                  f"(min {timing['min']:.3f}s, max {timing['max']:.3f}s)")
+            heavy = ', '.join(report['heavy_modules']) or 'none'
+            self.stdout.write(f"Heavy modules imported at startup: {heavy}")
+
+        median = report['total_seconds']['median']
+        if options['max_seconds'] is not None and median > options['max_seconds']:
+            raise CommandError(f"Median startup time {median:.3f}s exceeds {options['max_seconds']:.3f}s")
+        self.stdout.write(self.style.SUCCESS(f"Startup benchmark finished over {len(runs)} runs"))
@@ -0,0 +1,202 @@
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from itertools import cycle
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from weatherApp import views
+from weatherApp.benchmarking import git_revision, percentile
+from weatherApp.location_index import location_index
+from weatherApp.predict_crop_requirements import predict_crop_requirements
+from weatherApp.predict_locationl_altitude import predict_altitude
+from weatherApp.predict_soil_type import predict_soil_texture
+from weatherApp.predict_weather import RWANDA_DISTRICTS, forecast_weather_yearly, get_seasonal_forecast_summary
+
+# Inputs cycled through by the crop requirement and advisory cases
+CROPS = ['Maize', 'Beans', 'Rice', 'Irish Potatoes', 'Cassava']
+SEASONS = ['long_rainy', 'short_rainy', 'long_dry', 'short_dry']
+SOIL_TYPES = ['loamy', 'clay', 'sandy']
+ALTITUDES = ['low', 'mid', 'high']
+
+# Calls per case traced for allocations (tracemalloc slows every allocation down)
+ALLOCATION_CALLS = 5
+
+
+def current_rss_bytes():
+    """Resident set size of this process, or None where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+
+def peak_rss_bytes():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if platform.system() == 'Darwin' else peak * 1024
+
+
+class Command(BaseCommand):
+    help = ("Benchmark the weatherApp prediction functions and advisory views against the shipped models, "
+            "reporting p50/p95 latency, allocations and peak RSS")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20,
+                            help="Timed calls per case (default: 20)")
+        parser.add_argument('--warmup', type=int, default=5,
+                            help="Untimed calls per case before timing (default: 5)")
+        parser.add_argument('--only', nargs='+', metavar='CASE',
+                            help="Run only these cases")
+        parser.add_argument('--output', help="Write the results to this JSON file")
+        parser.add_argument('--compare', metavar='JSON',
+                            help="Compare against the results of an earlier run")
+        parser.add_argument('--max-regression', type=float, default=None, metavar='PERCENT',
+                            help="With --compare, fail if any case's p50 is slower by more than this")
+
+    def cases(self, user):
+        """Case name -> zero-argument callable, each call using the next set of inputs."""
+        locations = cycle([(r.district, r.sector) for r in location_index.records()
+                           if r.district in RWANDA_DISTRICTS][::7])
+        districts = cycle(list(RWANDA_DISTRICTS))
+        crops = cycle(CROPS)
+        seasons = cycle(SEASONS)
+        soil_types = cycle(SOIL_TYPES)
+        altitudes = cycle(ALTITUDES)
+        forecast = forecast_weather_yearly(next(iter(RWANDA_DISTRICTS)), seed=42)
+        factory = APIRequestFactory()
+
+        def call_view(view):
+            district, sector = next(locations)
+            request = factory.post('/weather/create/', {
+                'district': district, 'sector': sector, 'crop': next(crops), 'season': next(seasons),
+            }, format='json')
+            force_authenticate(request, user=user)
+            # Own savepoint, so a failed save (e.g. a repeated weather record) is undone alone
+            with transaction.atomic():
+                response = view(request)
+            if response.status_code != 200:
+                raise CommandError(f"{view.__name__} returned {response.status_code}: {response.data}")
+            return response
+
+        return {
+            'predict_soil_texture': lambda: predict_soil_texture(*next(locations)),
+            'predict_altitude': lambda: predict_altitude(*next(locations)),
+            'predict_crop_requirements': lambda: predict_crop_requirements(
+                next(crops), next(soil_types), altitude=next(altitudes), season=next(seasons)),
+            'forecast_weather_yearly': lambda: forecast_weather_yearly(next(districts), seed=42),
+            'get_seasonal_forecast_summary': lambda: get_seasonal_forecast_summary(forecast),
+            # make_crop_requirement_prediction has no URL, so both views get DRF test requests directly
+            'make_crop_requirement_prediction': lambda: call_view(views.make_crop_requirement_prediction),
+            'make_weather_adjusted_crop_prediction': lambda: call_view(views.make_weather_adjusted_crop_prediction),
+        }
+
+    def run_case(self, func, iterations, warmup):
+        # Some prediction functions still print their results
+        with contextlib.redirect_stdout(io.StringIO()):
+            return self.measure(func, iterations, warmup)
+
+    def measure(self, func, iterations, warmup):
+        for _ in range(warmup):
+            func()
+
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+
+        # Peak Python allocations of a single call, measured on separate calls
+        peaks = []
+        tracemalloc.start()
+        try:
+            for _ in range(min(ALLOCATION_CALLS, iterations)):
+                tracemalloc.reset_peak()
+                before, _ = tracemalloc.get_traced_memory()
+                func()
+                peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'iterations': iterations,
+            'p50_ms': round(percentile(timings, 50) * 1000, 3),
+            'p95_ms': round(percentile(timings, 95) * 1000, 3),
+            'mean_ms': round(statistics.mean(timings) * 1000, 3),
+            'alloc_peak_bytes': int(statistics.median(peaks)) if peaks else None,
+            'rss_bytes': current_rss_bytes(),
+            'peak_rss_bytes': peak_rss_bytes(),
+        }
+
+    def compare(self, report, baseline_path, max_regression):
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+
+        regressions = []
+        self.stdout.write(f"\nCompared with {baseline.get('git_revision') or baseline_path}:")
+        for name, result in report['cases'].items():
+            previous = baseline.get('cases', {}).get(name)
+            if not previous:
+                continue
+            change = (result['p50_ms'] - previous['p50_ms']) / previous['p50_ms'] * 100 if previous['p50_ms'] else 0.0
+            self.stdout.write(f"  {name:<40} p50 {previous['p50_ms']:.2f} -> {result['p50_ms']:.2f} ms ({change:+.1f}%)")
+            if max_regression is not None and change > max_regression:
+                regressions.append(name)
+
+        if regressions:
+            raise CommandError(f"p50 regressed by more than {max_regression}% for: {', '.join(regressions)}")
+
+    def handle(self, *args, **options):
+        report = {
+            'git_revision': git_revision(),
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'cases': {},
+        }
+
+        # Progress logging is not part of what is being measured
+        logging.disable(logging.INFO)
+        try:
+            # The views save predictions; keep the benchmark out of the database
+            with transaction.atomic():
+                user = get_user_model().objects.create_user(
+                    phone_number='0700000001', role='farmer', email='weather-benchmark@example.com', password=None,
+                )
+                cases = self.cases(user)
+                unknown = set(options['only'] or []) - set(cases)
+                if unknown:
+                    raise CommandError(f"Unknown cases: {', '.join(sorted(unknown))}. Choose from {', '.join(cases)}")
+
+                for name, func in cases.items():
+                    if options['only'] and name not in options['only']:
+                        continue
+                    result = self.run_case(func, max(1, options['iterations']), options['warmup'])
+                    report['cases'][name] = result
+                    self.stdout.write(f"{name:<40} p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  "
+                                      f"alloc {result['alloc_peak_bytes'] / 1024:8.1f} KiB  "
+                                      f"peak RSS {result['peak_rss_bytes'] / 2 ** 20:6.1f} MiB")
+                transaction.set_rollback(True)
+        finally:
+            logging.disable(logging.NOTSET)
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if options['compare']:
+            self.compare(report, options['compare'], options['max_regression'])
+
+        self.stdout.write(self.style.SUCCESS(f"Benchmarked {len(report['cases'])} cases"))
@@ -0,0 +1,29 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from weatherApp.advisory_matrix import advisory_model_version, build_advisory_matrix
+
+
+class Command(BaseCommand):
+    help = "Precompute crop requirements for every soil type/altitude, crop and season and store them"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help="Number of worker processes (default: number of CPUs)")
+        parser.add_argument('--model-version', default=None,
+                            help="Version key to store the rows under (defaults to the current model fingerprint)")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        version, pairs, count = build_advisory_matrix(
+            workers=max(1, options['workers']),
+            model_version=options['model_version'] or advisory_model_version(),
+        )
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored {count} advisory rows for {pairs} soil/altitude pairs "
+            f"(model version {version}) in {elapsed:.2f}s"
+        ))
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from weatherApp.district_comparison import build_district_comparison, prune_district_comparisons
+from weatherApp.predict_weather import create_comparison_visualizations
+
+
+class Command(BaseCommand):
+    help = ("Forecast every district, summarize the forecasts per month, season and year and cache "
+            "the comparison for the admin district comparison endpoint")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help="First forecast day, YYYY-MM-DD (default: today)")
+        parser.add_argument('--days', type=int, default=365, help="Number of days to forecast (default: 365)")
+        parser.add_argument('--keep', type=int, default=None,
+                            help="Afterwards delete all but this many most recent cached comparisons")
+        parser.add_argument('--charts', action='store_true',
+                            help="Also render the comparison charts to plots/")
+
+    def handle(self, *args, **options):
+        forecast_date = None
+        if options['date']:
+            try:
+                forecast_date = parse_date(options['date'])
+            except ValueError:
+                forecast_date = None
+            if forecast_date is None:
+                raise CommandError(f"Invalid date '{options['date']}', expected YYYY-MM-DD")
+
+        if options['keep'] is not None and options['keep'] < 1:
+            raise CommandError("--keep must be at least 1")
+
+        start = time.perf_counter()
+        path, tables = build_district_comparison(forecast_date, days_to_predict=options['days'])
+        elapsed = time.perf_counter() - start
+
+        if options['charts']:
+            create_comparison_visualizations(tables)
+        if options['keep'] is not None:
+            deleted = prune_district_comparisons(options['keep'])
+            self.stdout.write(f"Deleted {deleted} older comparisons")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Cached the comparison of {len(tables['yearly'])} districts to {path} in {elapsed:.2f}s"
+        ))
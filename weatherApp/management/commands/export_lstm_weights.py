@@ -0,0 +1,34 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from weatherApp.lstm_numpy import export_keras_model
+from weatherApp.model_registry import models_dir
+
+WEATHER_TARGETS = ['temp', 'rainfall', 'humidity']
+
+
+class Command(BaseCommand):
+    help = "Export the location LSTM weather models to .npz files for TensorFlow-free inference"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--models-dir', default=models_dir,
+                            help="Directory holding location_lstm_<target>_model.h5 (default: weatherApp/models)")
+
+    def handle(self, *args, **options):
+        try:
+            from tensorflow.keras.losses import MeanSquaredError
+            from tensorflow.keras.models import load_model
+        except ImportError:
+            raise CommandError("TensorFlow is required to read the .h5 models")
+
+        for target in WEATHER_TARGETS:
+            h5_path = os.path.join(options['models_dir'], f'location_lstm_{target}_model.h5')
+            npz_path = os.path.join(options['models_dir'], f'location_lstm_{target}_model.npz')
+            if not os.path.exists(h5_path):
+                self.stderr.write(f"Skipping {target}: {h5_path} not found")
+                continue
+
+            model = load_model(h5_path, custom_objects={'mse': MeanSquaredError()})
+            layers = export_keras_model(model, npz_path)
+            self.stdout.write(self.style.SUCCESS(f"Exported {target} ({', '.join(layers)}) to {npz_path}"))
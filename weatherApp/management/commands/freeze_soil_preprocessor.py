@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from weatherApp.predict_soil_type import (
+    FITTED_PREPROCESSOR_PATH,
+    SOIL_DATASET_PATH,
+    build_soil_preprocessor_artifact,
+)
+
+
+class Command(BaseCommand):
+    help = "Fit the soil preprocessor on the training data and save it as a versioned artifact"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dataset', default=SOIL_DATASET_PATH, help="Training CSV for the soil texture model")
+        parser.add_argument('--output', default=FITTED_PREPROCESSOR_PATH, help="Where to write the frozen artifact")
+
+    def handle(self, *args, **options):
+        artifact = build_soil_preprocessor_artifact(options['dataset'], options['output'])
+        stats = artifact['training_stats']
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Saved soil preprocessor version {artifact['version']} to {options['output']}"
+        ))
+        self.stdout.write(f"Training rows: {stats['rows']}, districts: {len(stats['districts'])}")
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from weatherApp.location_predictions import location_model_version, materialize_location_predictions
+
+
+class Command(BaseCommand):
+    help = "Score soil type and altitude for every known (district, sector) pair and store the results"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model-version', default=None,
+                            help="Version key to store the rows under (defaults to the current model fingerprint)")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        version, count = materialize_location_predictions(options['model_version'] or location_model_version())
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored {count} location predictions for model version {version} in {elapsed:.2f}s"
+        ))
@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from weatherApp.forecast_charts import prune_forecast_charts, requeue_charts, run_pending_charts
+from weatherApp.lazy_imports import load_module
+from weatherApp.models import ForecastChart
+
+
+class Command(BaseCommand):
+    help = ("Render the forecast charts queued by the forecast chart endpoint into MEDIA_ROOT, "
+            "polling the queue until stopped")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help="Exit once the queue is empty instead of polling for new charts")
+        parser.add_argument('--poll-seconds', type=float, default=2.0,
+                            help="Seconds to wait before checking an empty queue again (default: 2)")
+        parser.add_argument('--retry-failed', action='store_true',
+                            help="Queue the charts that failed, and the ones left running by a stopped worker, "
+                                 "again before starting")
+        parser.add_argument('--keep-days', type=int, default=None,
+                            help="Delete the charts, and their files, of forecast dates more than this many days "
+                                 "old, at start-up and then once a day")
+
+    def handle(self, *args, **options):
+        if options['poll_seconds'] <= 0:
+            raise CommandError("--poll-seconds must be positive")
+        if options['keep_days'] is not None and options['keep_days'] < 0:
+            raise CommandError("--keep-days must not be negative")
+
+        # Render without a display, before pyplot is imported by the first chart
+        load_module('matplotlib').use('Agg')
+
+        if options['retry_failed']:
+            queued = requeue_charts([ForecastChart.FAILED, ForecastChart.RUNNING])
+            self.stdout.write(f"Queued {queued} charts again")
+
+        total_rendered = total_failed = 0
+        pruned_on = None
+        while True:
+            if options['keep_days'] is not None and pruned_on != timezone.localdate():
+                pruned_on = timezone.localdate()
+                deleted = prune_forecast_charts(options['keep_days'])
+                self.stdout.write(f"Deleted {deleted} old forecast charts")
+
+            rendered, failed = run_pending_charts()
+            total_rendered += rendered
+            total_failed += failed
+            if rendered or failed:
+                self.stdout.write(f"Rendered {rendered} charts, {failed} failed")
+            if options['once']:
+                break
+            time.sleep(options['poll_seconds'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {total_rendered} forecast charts, {total_failed} failed"
+        ))
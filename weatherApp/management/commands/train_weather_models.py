@@ -0,0 +1,62 @@
+import importlib.util
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from weatherApp.benchmarking import git_revision
+from weatherApp.predict_weather import LOCATION_LSTM_TARGETS
+from weatherApp.weather_training import train_weather_models
+
+DEFAULT_DATA_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'rwanda_locations_weather_data.csv')
+
+
+class Command(BaseCommand):
+    help = ("Train the temperature, rainfall and humidity LSTM models in parallel worker processes "
+            "into a new versioned directory under weatherApp/models/weather_lstm")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--data', default=os.path.normpath(DEFAULT_DATA_PATH),
+                            help="Raw weather CSV to clean and train on (default: the shipped dataset)")
+        parser.add_argument('--targets', nargs='+', choices=list(LOCATION_LSTM_TARGETS),
+                            help="Targets to train (default: all)")
+        parser.add_argument('--model-version', help="Name of the version directory (default: UTC timestamp)")
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Worker processes (default: one per target)")
+        parser.add_argument('--threads-per-worker', type=int, default=None,
+                            help="Math library threads per worker (default: CPUs / workers)")
+        parser.add_argument('--lookback', type=int, default=14)
+        parser.add_argument('--units', type=int, default=64)
+        parser.add_argument('--epochs', type=int, default=20)
+        parser.add_argument('--batch-size', type=int, default=32)
+        parser.add_argument('--stream-batches', action='store_true',
+                            help="Train from batches gathered on the fly instead of materializing every sequence")
+
+    def handle(self, *args, **options):
+        if importlib.util.find_spec('tensorflow') is None:
+            raise CommandError("TensorFlow is required to train the weather models")
+        if not os.path.exists(options['data']):
+            raise CommandError(f"Weather data not found: {options['data']}")
+
+        try:
+            version_dir, manifest = train_weather_models(
+                options['data'],
+                targets=options['targets'],
+                version=options['model_version'],
+                workers=options['workers'],
+                threads_per_worker=options['threads_per_worker'],
+                metadata={'git_revision': git_revision()},
+                lookback=options['lookback'],
+                units=options['units'],
+                epochs=options['epochs'],
+                batch_size=options['batch_size'],
+                stream_batches=options['stream_batches'],
+            )
+        except FileExistsError as e:
+            raise CommandError(str(e))
+
+        for target, result in manifest['targets'].items():
+            self.stdout.write(f"{target:<10} test MSE {result['test_mse']:.5f}  wall {result['wall_seconds']:.1f}s")
+        self.stdout.write(self.style.SUCCESS(
+            f"Trained {len(manifest['targets'])} weather models with {manifest['workers']} workers "
+            f"x {manifest['threads_per_worker']} threads in {manifest['wall_seconds']:.1f}s into {version_dir}"
+        ))
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weatherApp', '0003_rename_croprequirement_croprequirementprediction'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LocationPrediction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('district', models.CharField(max_length=100)),
+                ('sector', models.CharField(max_length=100)),
+                ('soil_type', models.CharField(max_length=100)),
+                ('altitude', models.CharField(max_length=50)),
+                ('model_version', models.CharField(db_index=True, max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'unique_together': {('district', 'sector', 'model_version')},
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weatherApp', '0004_locationprediction'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdvisoryMatrixEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('soil_type', models.CharField(max_length=100)),
+                ('altitude', models.CharField(max_length=50)),
+                ('crop_key', models.CharField(max_length=100)),
+                ('season', models.CharField(max_length=50)),
+                ('model_version', models.CharField(db_index=True, max_length=64)),
+                ('crop', models.CharField(max_length=100)),
+                ('model_soil_type', models.CharField(max_length=100)),
+                ('nitrogen_kg_per_ha', models.FloatField()),
+                ('phosphorus_kg_per_ha', models.FloatField()),
+                ('potassium_kg_per_ha', models.FloatField()),
+                ('water_requirement_mm', models.FloatField(blank=True, null=True)),
+                ('optimal_ph', models.FloatField(blank=True, null=True)),
+                ('min_sunlight_hours', models.IntegerField(blank=True, null=True)),
+                ('row_spacing_cm', models.IntegerField(blank=True, null=True)),
+                ('plant_spacing_cm', models.IntegerField(blank=True, null=True)),
+                ('planting_depth_cm', models.IntegerField(blank=True, null=True)),
+                ('expected_yield_tons_per_ha', models.FloatField(blank=True, null=True)),
+                ('intercropping_recommendation', models.JSONField(blank=True, null=True)),
+                ('seasonal_recommendations', models.JSONField(blank=True, null=True)),
+                ('model_notes', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'unique_together': {('model_version', 'soil_type', 'altitude', 'crop_key', 'season')},
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-17 03:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weatherApp', '0005_advisorymatrixentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForecastChart',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('district', models.CharField(blank=True, max_length=100)),
+                ('forecast_date', models.DateField()),
+                ('chart_type', models.CharField(max_length=50)),
+                ('format', models.CharField(choices=[('png', 'PNG'), ('svg', 'SVG')], default='png', max_length=3)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('ready', 'Ready'), ('failed', 'Failed')], db_index=True, default='pending', max_length=10)),
+                ('file', models.FileField(blank=True, upload_to='forecast_charts/')),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('district', 'forecast_date', 'chart_type', 'format')},
+            },
+        ),
+    ]
@@ -0,0 +1,251 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+import tracemalloc
+
+from django.conf import settings
+from joblib import load
+
+from .soil_bundles import MODEL_SUFFIX, SoilBundleCache
+
+logger = logging.getLogger(__name__)
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+models_dir = os.path.join(current_dir, 'models')
+
+# Subdirectory of models_dir with the versioned LSTM training runs; every other subdirectory is a soil type
+WEATHER_MODEL_RUNS_DIR = 'weather_lstm'
+
+# Shared artifacts used by the soil, altitude and sector lookups
+LOCATION_ARTIFACTS = {
+    'soil_texture_model': 'best_soil_texture_model.joblib',
+    'soil_preprocessor': 'soil_preprocessor.joblib',
+    'soil_preprocessor_fitted': 'soil_preprocessor_fitted.joblib',
+    'altitude_model': 'rwanda_altitude_model.joblib',
+    'district_encoder': 'district_encoder.joblib',
+    'sector_encoder': 'sector_encoder.joblib',
+    'altitude_encoder': 'altitude_encoder.joblib',
+    'altitude_mapping': 'altitude_mapping.joblib',
+}
+
+
+def list_soil_types(directory):
+    """Names of the soil type model directories in a models directory."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(d for d in os.listdir(directory)
+                  if d != WEATHER_MODEL_RUNS_DIR and os.path.isdir(os.path.join(directory, d)))
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of the weatherApp joblib artifacts.
+
+    Every shared artifact is loaded at most once per process. ``warm_up``
+    loads the whole set up front (called from ``WeatherappConfig.warm_up``);
+    anything that is requested before warm-up is loaded on first use. Load
+    time and the memory allocated while unpickling are recorded per artifact.
+
+    The per-soil-type crop requirement models are held in a bounded
+    ``SoilBundleCache`` instead, so memory does not grow with every soil type.
+    """
+
+    def __init__(self, models_dir=models_dir, track_memory=True):
+        self.models_dir = models_dir
+        # Measuring allocations with tracemalloc roughly doubles load time
+        self.track_memory = track_memory
+        self._artifacts = {}
+        self.soil_bundles = SoilBundleCache(models_dir)
+        self._stats = {}
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    def _load(self, key, path):
+        """Load a joblib file, recording load time and allocated memory."""
+        measure = self.track_memory
+        tracing = tracemalloc.is_tracing()
+        if measure and not tracing:
+            tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0] if measure else 0
+        start = time.perf_counter()
+        try:
+            obj = load(path)
+        finally:
+            elapsed = time.perf_counter() - start
+            allocated = tracemalloc.get_traced_memory()[0] - before if measure else None
+            if measure and not tracing:
+                tracemalloc.stop()
+
+        self._stats[key] = {
+            'artifact': key,
+            'path': os.path.relpath(path, self.models_dir),
+            'file_bytes': os.path.getsize(path),
+            'memory_bytes': max(allocated, 0) if allocated is not None else None,
+            'load_seconds': round(elapsed, 6),
+        }
+        return obj
+
+    def get(self, name):
+        """Return a shared artifact by name (see ``LOCATION_ARTIFACTS``)."""
+        try:
+            return self._artifacts[name]
+        except KeyError:
+            pass
+
+        if name not in LOCATION_ARTIFACTS:
+            raise KeyError(f"Unknown model artifact '{name}'")
+
+        with self._lock:
+            if name not in self._artifacts:
+                path = os.path.join(self.models_dir, LOCATION_ARTIFACTS[name])
+                if not os.path.exists(path):
+                    raise FileNotFoundError(f"Model artifact not found: {path}")
+                self._artifacts[name] = self._load(name, path)
+            return self._artifacts[name]
+
+    def soil_model_path(self, soil_type, target):
+        return os.path.join(self.models_dir, soil_type, f"{target}{MODEL_SUFFIX}")
+
+    def has_soil_model(self, soil_type, target):
+        return os.path.exists(self.soil_model_path(soil_type, target))
+
+    def get_soil_model(self, soil_type, target):
+        """Return the model for a (soil_type, target) pair, e.g. ('loamy', 'adjusted_nitrogen')."""
+        return self.soil_bundles.get_model(soil_type, target)
+
+    def soil_types(self):
+        """List the soil types that have a model directory."""
+        return list_soil_types(self.models_dir)
+
+    def soil_targets(self, soil_type):
+        """List the target names that have a model file for a soil type."""
+        return self.soil_bundles.targets(soil_type)
+
+    def warm_up(self):
+        """
+        Load every shared artifact and as many soil bundles as fit in the
+        bundle cache budget. Missing or broken files are logged and skipped.
+        """
+        start = time.perf_counter()
+
+        for name in LOCATION_ARTIFACTS:
+            try:
+                self.get(name)
+            except Exception as e:
+                logger.warning("Could not preload model artifact %s: %s", name, e)
+
+        bundles = self.soil_bundles.warm_up(self.soil_types())
+
+        elapsed = time.perf_counter() - start
+        logger.info("Preloaded %d weather model artifacts and %d soil bundles in %.2fs",
+                    len(self._stats), bundles, elapsed)
+        return elapsed
+
+    def fingerprint(self, names, extra_paths=()):
+        """
+        Short content hash of a set of shared artifacts (plus any extra files,
+        e.g. datasets). Used as the model version for anything precomputed
+        from them. Missing files are skipped.
+        """
+        digest = hashlib.sha256()
+        paths = [os.path.join(self.models_dir, LOCATION_ARTIFACTS[name]) for name in sorted(names)]
+        for path in paths + list(extra_paths):
+            if not os.path.exists(path):
+                continue
+            digest.update(os.path.basename(path).encode())
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+        return digest.hexdigest()[:16]
+
+    def clear(self):
+        with self._lock:
+            self._artifacts.clear()
+            self._stats.clear()
+        self.soil_bundles.clear()
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+    def stats(self):
+        """Return load statistics for every artifact loaded so far."""
+        return sorted(self._stats.values(), key=lambda s: s['artifact'])
+
+    def summary(self):
+        stats = self.stats()
+        return {
+            'artifact_count': len(stats),
+            'total_file_bytes': sum(s['file_bytes'] for s in stats),
+            'total_memory_bytes': sum(s['memory_bytes'] or 0 for s in stats),
+            'total_load_seconds': round(sum(s['load_seconds'] for s in stats), 6),
+            'artifacts': stats,
+            'soil_bundles': self.soil_bundles.stats(),
+        }
+
+
+class ModelVersion:
+    """
+    ``ModelRegistry.fingerprint`` of a set of artifacts and files, cached
+    until one of the files changes.
+
+    ``files`` is called on every check and returns ``(artifact names, extra
+    paths)``, so models added since the last check count too. Hashing is only
+    redone when a file's mtime or size changed (checked at most every
+    ``check_seconds``) or after ``clear``.
+    """
+
+    def __init__(self, registry, files, check_seconds=None):
+        self.registry = registry
+        self.files = files
+        self.check_seconds = check_seconds
+        self._version = None
+        self._stamps = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _check_interval(self):
+        if self.check_seconds is not None:
+            return self.check_seconds
+        return getattr(settings, 'WEATHER_MODEL_VERSION_CHECK_SECONDS', 30)
+
+    def _paths(self):
+        names, extra_paths = self.files()
+        artifact_paths = [os.path.join(self.registry.models_dir, LOCATION_ARTIFACTS[name]) for name in sorted(names)]
+        return names, extra_paths, artifact_paths + list(extra_paths)
+
+    @staticmethod
+    def _stamp(paths):
+        stamps = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            stamps.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(stamps)
+
+    def __call__(self):
+        if self._version is not None and time.monotonic() - self._checked_at <= self._check_interval():
+            return self._version
+
+        with self._lock:
+            names, extra_paths, paths = self._paths()
+            stamps = self._stamp(paths)
+            if self._version is None or stamps != self._stamps:
+                self._version = self.registry.fingerprint(names, extra_paths=extra_paths)
+                self._stamps = stamps
+            self._checked_at = time.monotonic()
+            return self._version
+
+    def clear(self):
+        with self._lock:
+            self._version = None
+            self._stamps = None
+
+
+# Shared instance used by the prediction modules
+registry = ModelRegistry()
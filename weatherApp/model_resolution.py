@@ -0,0 +1,184 @@
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from django.conf import settings
+
+from .crop_catalog import ALTITUDE_TYPES, SEASON_TYPES
+from .model_registry import list_soil_types, registry
+from .soil_bundles import MODEL_SUFFIX
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_water_model(model_names, altitude, detailed_season):
+    """
+    Pick the water requirement model for an altitude and season from the
+    model names of one soil directory (in directory order).
+
+    Returns (model_name, rule) where rule says which fallback matched:
+    'exact', 'altitude', 'season' or 'any'; (None, None) if the directory
+    has no water requirement model at all.
+    """
+    # First try: exact match for altitude and season
+    exact_match = f"{altitude}_altitude_{detailed_season}_adjusted"
+    if exact_match in model_names:
+        return exact_match, 'exact'
+
+    # Second try: match with any season at this altitude
+    for name in model_names:
+        if name.startswith(f"{altitude}_altitude_"):
+            return name, 'altitude'
+
+    # Third try: match with any altitude for this season
+    for name in model_names:
+        if name.endswith(f"_altitude_{detailed_season}_adjusted"):
+            return name, 'season'
+
+    # Fourth try: use any available water requirement model
+    for name in model_names:
+        if "_altitude_" in name and name.endswith("_adjusted"):
+            return name, 'any'
+
+    return None, None
+
+
+@dataclass
+class SoilResolution:
+    """Resolved water models of one soil directory."""
+    soil_type: str
+    signature: int
+    model_names: list
+    entries: dict
+
+
+class ModelResolutionTable:
+    """
+    Water requirement model for every (soil, altitude, season), resolved once
+    per soil directory instead of probing the filesystem on each request.
+
+    Each soil directory is listed once and the fallback chain is run for
+    every known altitude and season. Combinations outside that set are
+    resolved from the stored listing on first use. A directory is rebuilt
+    when its mtime changes (models added, removed or renamed); mtimes are
+    checked at most every ``check_seconds``.
+    """
+
+    def __init__(self, models_dir=None, check_seconds=None):
+        self.models_dir = models_dir
+        self.check_seconds = check_seconds
+        self._soils = {}
+        self._checked_at = 0.0
+        self._built_at = None
+        self._lock = threading.Lock()
+
+    def _models_dir(self):
+        return self.models_dir or registry.models_dir
+
+    def _check_interval(self):
+        if self.check_seconds is not None:
+            return self.check_seconds
+        return getattr(settings, 'WEATHER_MODEL_RESOLUTION_CHECK_SECONDS', 60)
+
+    @staticmethod
+    def _signature(soil_dir):
+        return os.stat(soil_dir).st_mtime_ns
+
+    def _candidates(self):
+        """Altitudes and seasons requests are expected to use."""
+        from .predict_crop_requirements import SEASON_MAPPING
+
+        altitudes = list(ALTITUDE_TYPES)
+        try:
+            altitudes += [a for a in registry.get('altitude_mapping').values() if a not in altitudes]
+        except (FileNotFoundError, KeyError):
+            pass
+        seasons = list(dict.fromkeys(list(SEASON_MAPPING.values()) + SEASON_TYPES))
+        return altitudes, seasons
+
+    def _build_soil(self, soil_type):
+        soil_dir = os.path.join(self._models_dir(), soil_type)
+        signature = self._signature(soil_dir)
+        model_names = [f[:-len(MODEL_SUFFIX)] for f in os.listdir(soil_dir) if f.endswith(MODEL_SUFFIX)]
+
+        altitudes, seasons = self._candidates()
+        entries = {
+            (altitude, season): resolve_water_model(model_names, altitude, season)
+            for altitude in altitudes
+            for season in seasons
+        }
+        return SoilResolution(soil_type, signature, model_names, entries)
+
+    def build(self):
+        """Resolve every soil directory. Returns the number of table entries."""
+        soils = {soil_type: self._build_soil(soil_type) for soil_type in list_soil_types(self._models_dir())}
+        with self._lock:
+            self._soils = soils
+            self._checked_at = time.monotonic()
+            self._built_at = datetime.now(timezone.utc).isoformat()
+        logger.info("Resolved water models for %d soil types", len(soils))
+        return sum(len(soil.entries) for soil in soils.values())
+
+    def _refresh_changed(self):
+        """Re-resolve the soil directories whose mtime changed since they were resolved."""
+        soils = dict(self._soils)
+        for soil_type, soil in self._soils.items():
+            soil_dir = os.path.join(self._models_dir(), soil_type)
+            try:
+                if self._signature(soil_dir) == soil.signature:
+                    continue
+                soils[soil_type] = self._build_soil(soil_type)
+                logger.info("Models for %s changed, re-resolved water models", soil_type)
+            except FileNotFoundError:
+                del soils[soil_type]
+        with self._lock:
+            self._soils = soils
+            self._checked_at = time.monotonic()
+
+    def warm_up(self):
+        return self.build()
+
+    def lookup(self, soil_type, altitude, detailed_season):
+        """Return (model_name, rule) for a soil type, altitude and season."""
+        if not self._soils:
+            self.build()
+        elif time.monotonic() - self._checked_at > self._check_interval():
+            self._refresh_changed()
+
+        soil = self._soils.get(soil_type)
+        if soil is None:
+            # Soil directory created after the last build
+            self.build()
+            soil = self._soils.get(soil_type)
+            if soil is None:
+                return None, None
+
+        key = (altitude, detailed_season)
+        try:
+            return soil.entries[key]
+        except KeyError:
+            resolved = resolve_water_model(soil.model_names, altitude, detailed_season)
+            soil.entries[key] = resolved
+            return resolved
+
+    def table(self):
+        """The resolved table, for the diagnostics endpoint."""
+        if not self._soils:
+            self.build()
+        return {
+            'built_at': self._built_at,
+            'soil_types': {
+                soil_type: [
+                    {'altitude': altitude, 'season': season, 'model': model, 'rule': rule}
+                    for (altitude, season), (model, rule) in sorted(soil.entries.items())
+                ]
+                for soil_type, soil in sorted(self._soils.items())
+            },
+        }
+
+
+# Shared instance used by the crop requirement predictions
+model_resolution = ModelResolutionTable()
@@ -41,9 +41,87 @@ class CropRequirementPrediction(models.Model):
         
     def __str__(self):
         return f"{self.crop} in {self.district}/{self.sector} ({self.season})"
+
+
+class LocationPrediction(models.Model):
+    # Soil type and altitude scored once per (district, sector) for a model version
+    district = models.CharField(max_length=100)
+    sector = models.CharField(max_length=100)
+    soil_type = models.CharField(max_length=100)
+    altitude = models.CharField(max_length=50)
+    model_version = models.CharField(max_length=64, db_index=True)
     
+    created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        unique_together = ('district', 'sector', 'model_version')
+        
+    def __str__(self):
+        return f"{self.district}/{self.sector}: {self.soil_type}, {self.altitude} ({self.model_version})"
+
+
+class AdvisoryMatrixEntry(models.Model):
+    # Crop requirements precomputed for one (soil type, altitude, crop, season).
+    # Every sector that resolves to the same soil type and altitude shares a row.
+    soil_type = models.CharField(max_length=100)
+    altitude = models.CharField(max_length=50)
+    crop_key = models.CharField(max_length=100)  # lower-cased crop name
+    season = models.CharField(max_length=50)
+    model_version = models.CharField(max_length=64, db_index=True)
     
+    # Prediction as returned by predict_crop_requirements
+    crop = models.CharField(max_length=100)
+    model_soil_type = models.CharField(max_length=100)  # soil type whose models were used
+    nitrogen_kg_per_ha = models.FloatField()
+    phosphorus_kg_per_ha = models.FloatField()
+    potassium_kg_per_ha = models.FloatField()
+    water_requirement_mm = models.FloatField(null=True, blank=True)
+    optimal_ph = models.FloatField(null=True, blank=True)
+    min_sunlight_hours = models.IntegerField(null=True, blank=True)
     
+    row_spacing_cm = models.IntegerField(null=True, blank=True)
+    plant_spacing_cm = models.IntegerField(null=True, blank=True)
+    planting_depth_cm = models.IntegerField(null=True, blank=True)
+    
+    expected_yield_tons_per_ha = models.FloatField(null=True, blank=True)
+    intercropping_recommendation = models.JSONField(null=True, blank=True)
+    seasonal_recommendations = models.JSONField(null=True, blank=True)
+    model_notes = models.TextField(null=True, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
     
- 
\ No newline at end of file
+    class Meta:
+        unique_together = ('model_version', 'soil_type', 'altitude', 'crop_key', 'season')
+        
+    def __str__(self):
+        return f"{self.crop} on {self.soil_type}/{self.altitude} ({self.season}, {self.model_version})"
+
+
+class ForecastChart(models.Model):
+    # One rendered forecast chart, queued by the API and drawn by the
+    # render_forecast_charts worker. district is blank for the district
+    # comparison charts.
+    PENDING = 'pending'
+    RUNNING = 'running'
+    READY = 'ready'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(PENDING, 'Pending'), (RUNNING, 'Running'), (READY, 'Ready'), (FAILED, 'Failed')]
+    FORMAT_CHOICES = [('png', 'PNG'), ('svg', 'SVG')]
+    
+    district = models.CharField(max_length=100, blank=True)
+    forecast_date = models.DateField()
+    chart_type = models.CharField(max_length=50)
+    format = models.CharField(max_length=3, choices=FORMAT_CHOICES, default='png')
+    
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING, db_index=True)
+    file = models.FileField(upload_to='forecast_charts/', blank=True)
+    error = models.TextField(null=True, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ('district', 'forecast_date', 'chart_type', 'format')
+        
+    def __str__(self):
+        return f"{self.chart_type} chart of {self.district or 'all districts'} for {self.forecast_date} ({self.status})"
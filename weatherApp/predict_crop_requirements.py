@@ -1,9 +1,15 @@
 import pandas as pd
 import pandas as pd
-from joblib import load
 import os
 from rest_framework.response import Response
 from .predict_soil_type import predict_soil_texture
+from .model_registry import list_soil_types, registry
+from .model_resolution import model_resolution
+from .crop_catalog import crop_catalog
+from .tracing import trace_stage
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 # print(f"Current working directory: {os.getcwd()}")
@@ -365,356 +371,466 @@ models_dir = os.path.join(current_dir, 'models')
 #         return Response({"error": f"An error occurred during prediction: {str(e)}"})
 
 
-def predict_crop_requirements(crop_name, soil_type, altitude='mid', season='short_dry'):
-    try:
-        # Get the directory where this script is located
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        # Define model directory within the project
-        model_dir = os.path.join(current_dir, 'models')
-        
-        print(f"Looking for models in: {model_dir}")
-        
-        # Check if model directory exists
-        if not os.path.exists(model_dir):
-            return Response({"error": f"Model directory '{model_dir}' does not exist."})
-            
-        # Check if soil type subdirectory exists
+# Nutrient targets predicted for every crop
+BASE_TARGETS = ['adjusted_nitrogen', 'adjusted_phosphorus', 'adjusted_potassium']
+
+# Map Rwanda's seasons to the format in the dataset
+SEASON_MAPPING = {
+    'short_dry': 'short_dry',      # Dec-Feb
+    'long_rainy': 'long_rainy',    # Mar-May
+    'long_dry': 'long_dry',        # Jun-Sep
+    'short_rainy': 'short_rainy'   # Sep-Dec
+}
+
+# Reasonable defaults if a nutrient prediction fails
+NUTRIENT_DEFAULTS = {
+    'adjusted_nitrogen': 50.0,
+    'adjusted_phosphorus': 25.0,
+    'adjusted_potassium': 30.0
+}
+
+# Base water requirement defaults by season (in mm)
+WATER_DEFAULTS = {
+    'short_dry': 450,
+    'long_rainy': 200,
+    'long_dry': 550,
+    'short_rainy': 350
+}
+
+# Altitude adjustment factors for the default water requirement
+ALTITUDE_WATER_FACTORS = {
+    'low': 1.2,  # Higher water requirement in low altitude
+    'mid': 1.0,  # Base reference
+    'high': 0.8   # Lower water requirement in high altitude (cooler, less evaporation)
+}
+
+SEASONAL_FACTORS = {
+    'short_dry': {
+        'nitrogen_factor': 1.0,
+        'phosphorus_factor': 1.0,
+        'potassium_factor': 1.0,
+        'yield_factor': 1.0
+    },
+    'long_rainy': {
+        'nitrogen_factor': 1.25,
+        'phosphorus_factor': 0.9,
+        'potassium_factor': 1.15,
+        'yield_factor': 1.1
+    },
+    'long_dry': {
+        'nitrogen_factor': 0.9,
+        'phosphorus_factor': 1.1,
+        'potassium_factor': 0.95,
+        'yield_factor': 0.9
+    },
+    'short_rainy': {
+        'nitrogen_factor': 1.15,
+        'phosphorus_factor': 0.95,
+        'potassium_factor': 1.05,
+        'yield_factor': 1.05
+    }
+}
+
+# Season-specific recommendations for Rwanda's four seasons
+SEASONAL_RECOMMENDATIONS = {
+    'short_dry': [
+        "Implement water conservation techniques",
+        "Consider drought-resistant varieties",
+        "Apply mulch to reduce evaporation",
+        "Use drip irrigation if available"
+    ],
+    'long_rainy': [
+        "Ensure proper drainage systems to prevent waterlogging",
+        "Monitor closely for fungal diseases",
+        "Consider raised beds in low-lying areas",
+        "Implement erosion control measures on slopes"
+    ],
+    'long_dry': [
+        "Increase irrigation frequency and volume",
+        "Use deep mulching to preserve soil moisture",
+        "Consider shade structures for sensitive crops",
+        "Implement windbreaks to reduce evapotranspiration"
+    ],
+    'short_rainy': [
+        "Monitor drainage but prepare for dry spells",
+        "Implement integrated pest management for seasonal pests",
+        "Consider cover crops to prevent soil erosion",
+        "Time planting to maximize use of rainfall patterns"
+    ]
+}
+
+
+class CropRequirementError(Exception):
+    """A crop requirement prediction that cannot be made; the message is returned to the client."""
+
+
+def resolve_soil_type(soil_type):
+    """Return (soil_type, soil_dir), falling back to the first soil type with models."""
+    model_dir = registry.models_dir
+    
+    logger.debug("Looking for models in: %s", model_dir)
+    
+    # Check if model directory exists
+    if not os.path.exists(model_dir):
+        raise CropRequirementError(f"Model directory '{model_dir}' does not exist.")
+        
+    # Check if soil type subdirectory exists
+    soil_dir = os.path.join(model_dir, soil_type)
+    if not os.path.exists(soil_dir):
+        # Try to find an alternative soil type
+        available_soils = list_soil_types(model_dir)
+        if not available_soils:
+            raise CropRequirementError("No soil type directories found in the model directory.")
+        
+        # Use the first available soil type as fallback
+        requested_soil_type, soil_type = soil_type, available_soils[0]
         soil_dir = os.path.join(model_dir, soil_type)
-        if not os.path.exists(soil_dir):
-            # Try to find an alternative soil type
-            available_soils = [d for d in os.listdir(model_dir) 
-                              if os.path.isdir(os.path.join(model_dir, d))]
-            if not available_soils:
-                return Response({"error": "No soil type directories found in the model directory."})
-            
-            # Use the first available soil type as fallback
-            soil_type = available_soils[0]
-            soil_dir = os.path.join(model_dir, soil_type)
-            print(f"Warning: Soil type '{soil_type}' not found. Using '{soil_type}' instead.")
-        
-        # Load the comprehensive dataset
-        try:
-            df = pd.read_csv(os.path.join(current_dir, 'data', 'comprehensive_crop_requirements.csv'))
-        except FileNotFoundError:
-            return Response({"error": "Dataset file not found."})
-        
-        # Get the row for this crop
-        crop_data = df[df['crop'].str.lower() == crop_name.lower()]
-        
-        if len(crop_data) == 0:
-            # Try to find a close match using fuzzy matching
-            from difflib import get_close_matches
-            all_crops = df['crop'].unique()
-            close_matches = get_close_matches(crop_name, all_crops)
-            
-            if close_matches:
-                crop_name = close_matches[0]
-                crop_data = df[df['crop'] == crop_name]
-                print(f"Warning: Crop '{crop_name}' not found. Using closest match '{crop_name}' instead.")
-            else:
-                return Response({"error": f"Crop '{crop_name}' not found in the dataset."})
-        
-        # Create input features with a copy of crop data
-        input_features = crop_data.copy()
+        logger.warning("Soil type '%s' not found. Using '%s' instead.", requested_soil_type, soil_type)
+    
+    return soil_type, soil_dir
+
+
+def load_crop_dataset():
+    """The comprehensive crop requirements dataset (shared in-memory copy)."""
+    try:
+        return crop_catalog.frame()
+    except FileNotFoundError:
+        raise CropRequirementError("Dataset file not found.")
+
+
+def find_crop(crop_name):
+    """
+    Return (crop_name, crop_data, input_features) for a crop, using an alias
+    or the closest name if there is no exact match.
+    """
+    try:
+        entry, match = crop_catalog.lookup(crop_name)
+    except FileNotFoundError:
+        raise CropRequirementError("Dataset file not found.")
+    
+    if entry is None:
+        raise CropRequirementError(f"Crop '{crop_name}' not found in the dataset.")
+    if match == 'fuzzy':
+        logger.info("Crop '%s' not found. Using closest match '%s' instead.", crop_name, entry.name)
+    
+    return entry.name, entry.data, entry.features
+
+
+def select_water_model(soil_type, altitude, detailed_season):
+    """Pick the water requirement model for an altitude and season, or None."""
+    with trace_stage('resolve'):
+        water_req_key, rule = model_resolution.lookup(soil_type, altitude, detailed_season)
+    
+    if rule == 'exact':
+        logger.debug("Found exact match model: %s", water_req_key)
+    elif rule == 'altitude':
+        logger.debug("Found altitude-specific model: %s", water_req_key)
+    elif rule == 'season':
+        logger.debug("Found season-specific model: %s", water_req_key)
+    elif rule == 'any':
+        logger.debug("No specific model found. Using fallback model: %s", water_req_key)
+    else:
+        logger.warning("No water requirement models found. Proceeding with nutrient predictions only.")
+    
+    return water_req_key
+
+
+def load_soil_models(soil_type, water_req_key, crop_data):
+    """
+    Return (soil_models, missing_models) for the nutrient targets and the
+    water model. Missing nutrient models are replaced by the dataset value
+    ({'direct_value': ...}) where the dataset has one.
+    """
+    soil_models = {}
+    
+    # Try to load all required models
+    target_variables = BASE_TARGETS.copy()
+    if water_req_key:
+        target_variables.append(water_req_key)
         
-        # Map Rwanda's seasons to the format in the dataset
-        season_mapping = {
-            'short_dry': 'short_dry',      # Dec-Feb
-            'long_rainy': 'long_rainy',    # Mar-May
-            'long_dry': 'long_dry',        # Jun-Sep
-            'short_rainy': 'short_rainy'   # Sep-Dec
+    missing_models = []
+    
+    for target in target_variables:
+        if registry.has_soil_model(soil_type, target):
+            try:
+                # Served from memory once the registry has been warmed up
+                soil_models[target] = registry.get_soil_model(soil_type, target)
+                logger.debug("Successfully loaded model: %s", target)
+            except Exception as e:
+                logger.warning("Error loading model %s: %s", target, e)
+                missing_models.append(f"{target} (Error: {str(e)})")
+        else:
+            missing_models.append(target)
+            logger.warning("Model file not found: %s", registry.soil_model_path(soil_type, target))
+    
+    # If we're missing nutrient models, try to use base models directly from dataset
+    if any(target in missing_models for target in BASE_TARGETS):
+        logger.warning("Some nutrient models are missing. Using dataset values directly.")
+        for nutrient in BASE_TARGETS:
+            if nutrient in missing_models and nutrient.replace('adjusted_', '') in crop_data.columns:
+                base_nutrient = nutrient.replace('adjusted_', '')
+                soil_models[nutrient] = {
+                    'direct_value': float(crop_data[base_nutrient].values[0])
+                }
+                logger.debug("Using direct value for %s: %s", nutrient, soil_models[nutrient]['direct_value'])
+                missing_models.remove(nutrient)
+    
+    # If we're still missing crucial models after fallbacks, return error
+    if missing_models and all(target in missing_models for target in BASE_TARGETS):
+        raise CropRequirementError(f"Missing models for all nutrient targets: {', '.join(missing_models)}")
+    
+    return soil_models, missing_models
+
+
+def add_model_columns(model, input_features):
+    """Add any column the model expects but the features lack (default 0.0)."""
+    if hasattr(model, 'feature_names_in_'):
+        missing_cols = set(model.feature_names_in_) - set(input_features.columns)
+        for col in missing_cols:
+            input_features[col] = 0.0  # Add missing columns with default values
+
+
+def fallback_prediction(target, crop_data, season):
+    """Value used when a model fails to predict for a target."""
+    # Use a default value based on dataset if prediction fails
+    if target.replace('adjusted_', '') in crop_data.columns:
+        value = float(crop_data[target.replace('adjusted_', '')].values[0])
+        logger.debug("Using default value for %s: %s", target, value)
+    # Use reasonable defaults if all else fails
+    elif target in NUTRIENT_DEFAULTS:
+        value = NUTRIENT_DEFAULTS[target]
+        logger.debug("Using standard default for %s: %s", target, value)
+    else:
+        # For water requirements, use a reasonable default based on season
+        value = WATER_DEFAULTS.get(season, 400)
+        logger.debug("Using seasonal default water value: %s", value)
+    return value
+
+
+def predict_target(target, model, input_features, crop_data, season):
+    """Predict one target for a crop, or fall back to a default value."""
+    if isinstance(model, dict) and 'direct_value' in model:
+        # Use direct value from the dataset
+        return model['direct_value']
+    
+    # Use the model to predict
+    try:
+        # Check if input_features has all columns the model expects
+        add_model_columns(model, input_features)
+        return model.predict(input_features)[0]
+    except Exception as e:
+        logger.warning("Error predicting with %s model: %s", target, e)
+        return fallback_prediction(target, crop_data, season)
+
+
+def format_requirements(crop_name, soil_type, season, altitude, crop_data, predictions, water_req_key, missing_models):
+    """Apply the seasonal adjustments and build the requirements response."""
+    seasonal_factors = SEASONAL_FACTORS
+    
+    # Apply seasonal adjustment factors
+    nitrogen = predictions.get('adjusted_nitrogen', 50.0) * seasonal_factors[season]['nitrogen_factor']
+    phosphorus = predictions.get('adjusted_phosphorus', 25.0) * seasonal_factors[season]['phosphorus_factor']
+    potassium = predictions.get('adjusted_potassium', 30.0) * seasonal_factors[season]['potassium_factor']
+    
+    # Select the water requirement based on altitude and season
+    water_requirement = predictions.get(water_req_key, None)
+    
+    # If water_requirement is still None, provide a default based on season and altitude
+    if water_requirement is None:
+        # Use the default for the season, adjusted by altitude
+        base_water = WATER_DEFAULTS.get(season, 400)
+        altitude_factor = ALTITUDE_WATER_FACTORS.get(altitude, 1.0)
+        water_requirement = base_water * altitude_factor
+        logger.debug("Using calculated default water requirement: %s mm", water_requirement)
+    
+    # Format the results
+    requirements = {
+        "crop": crop_name,
+        "soil_type": soil_type,
+        "season": season,
+        "altitude": altitude,
+        "requirements": {
+            "nitrogen_kg_per_ha": round(nitrogen, 2),
+            "phosphorus_kg_per_ha": round(phosphorus, 2),
+            "potassium_kg_per_ha": round(potassium, 2),
+            "water_requirement_mm": round(water_requirement, 2) if water_requirement else None,
         }
+    }
+    
+    # Add optional fields if they exist in the dataset
+    if 'optimal_ph' in crop_data:
+        requirements["requirements"]["optimal_ph"] = float(crop_data['optimal_ph'].values[0])
+    
+    if 'min_sunlight_hours' in crop_data:
+        requirements["requirements"]["min_sunlight_hours"] = int(crop_data['min_sunlight_hours'].values[0])
+    
+    # Add planting information if available
+    planting_fields = ['row_spacing_cm', 'plant_spacing_cm', 'planting_depth_cm']
+    if all(field in crop_data.columns for field in planting_fields):
+        planting_info = {
+            "row_spacing_cm": int(crop_data['row_spacing_cm'].values[0]),
+            "plant_spacing_cm": int(crop_data['plant_spacing_cm'].values[0]),
+            "planting_depth_cm": int(crop_data['planting_depth_cm'].values[0]),
+        }
+        requirements["requirements"]["planting_info"] = planting_info
+    
+    # Add expected yield if available
+    if 'optimal_yield' in crop_data.columns:
+        base_yield = float(crop_data['optimal_yield'].values[0])
+        # Apply yield factor based on season
+        adjusted_yield = base_yield * seasonal_factors[season]['yield_factor']
+        requirements["expected_yield_tons_per_ha"] = round(adjusted_yield, 2)
+    
+    # Add intercropping recommendation if available
+    if 'intercropping_compatibility' in crop_data.columns:
+        intercrop_value = crop_data['intercropping_compatibility'].values[0]
+        if isinstance(intercrop_value, str) and intercrop_value != 'None':
+            requirements["intercropping_recommendation"] = intercrop_value.split(',')
+    
+    # Add season-specific recommendations
+    if season in SEASONAL_RECOMMENDATIONS:
+        requirements["seasonal_recommendations"] = list(SEASONAL_RECOMMENDATIONS[season])
         
-        detailed_season = season_mapping.get(season, 'short_dry')  # Default to short_dry if unknown
-        
-        # Add missing altitude and season columns that models might expect
-        altitude_types = ['low', 'mid', 'high']
-        season_types = ['dry', 'wet', 'short_dry', 'long_rainy', 'long_dry', 'short_rainy']
+    # Add note about model limitations if fallbacks were used
+    if missing_models:
+        requirements["model_notes"] = f"Some models were unavailable ({', '.join(missing_models)}). Results may be less accurate."
+    
+    return requirements
+
+
+def predict_crop_requirements(crop_name, soil_type, altitude='mid', season='short_dry'):
+    try:
+        soil_type, soil_dir = resolve_soil_type(soil_type)
         
-        # Generate all possible altitude-season combinations and ensure they exist in input_features
-        for alt in altitude_types:
-            for seas in season_types:
-                col_name = f"{alt}_altitude_{seas}_adjusted"
-                if col_name not in input_features.columns:
-                    input_features[col_name] = 0.0  # Add with default value
-                
-        # Also ensure base altitude columns exist
-        for alt in altitude_types:
-            col_name = f"{alt}_altitude_adjusted"
-            if col_name not in input_features.columns:
-                input_features[col_name] = 0.0
+        # Get the row for this crop and a copy of its model input
+        crop_name, crop_data, input_features = find_crop(crop_name)
+        input_features = input_features.copy()
         
-        # Load the models for this soil type
-        soil_models = {}
-        
-        # Define target variables - both general and season-specific
-        base_targets = ['adjusted_nitrogen', 'adjusted_phosphorus', 'adjusted_potassium']
+        detailed_season = SEASON_MAPPING.get(season, 'short_dry')  # Default to short_dry if unknown
         
         # IMPROVED MODEL SELECTION LOGIC FOR WATER REQUIREMENTS
-        water_req_key = None
-        
-        # First try: exact match for altitude and season
-        exact_match = f"{altitude}_altitude_{detailed_season}_adjusted"
-        exact_model_path = os.path.join(soil_dir, f"{exact_match}_model.joblib")
-        if os.path.exists(exact_model_path):
-            water_req_key = exact_match
-            print(f"Found exact match model: {exact_match}")
-        else:
-            print(f"Could not find exact model: {exact_model_path}")
-        
-        # Second try: match with any season at this altitude
-        if not water_req_key:
-            altitude_pattern = f"{altitude}_altitude_"
-            altitude_models = [m.replace("_model.joblib", "") for m in os.listdir(soil_dir) 
-                            if m.startswith(altitude_pattern) and m.endswith("_model.joblib")]
-            if altitude_models:
-                water_req_key = altitude_models[0]
-                print(f"Found altitude-specific model: {water_req_key}")
-        
-        # Third try: match with any altitude for this season
-        if not water_req_key:
-            season_pattern = f"_altitude_{detailed_season}_adjusted"
-            season_models = [m.replace("_model.joblib", "") for m in os.listdir(soil_dir)
-                        if m.endswith(f"{season_pattern}_model.joblib")]
-            if season_models:
-                water_req_key = season_models[0]
-                print(f"Found season-specific model: {water_req_key}")
-        
-        # Fourth try: use any available water requirement model
-        if not water_req_key:
-            water_models = [m.replace("_model.joblib", "") for m in os.listdir(soil_dir)
-                        if "_altitude_" in m and m.endswith("_adjusted_model.joblib")]
-            if water_models:
-                water_req_key = water_models[0]
-                print(f"No specific model found. Using fallback model: {water_req_key}")
-            else:
-                print(f"Warning: No water requirement models found. Proceeding with nutrient predictions only.")
-                water_req_key = None
+        water_req_key = select_water_model(soil_type, altitude, detailed_season)
         
-        # Try to load all required models
-        target_variables = base_targets.copy()
-        if water_req_key:
-            target_variables.append(water_req_key)
-            
-        missing_models = []
-        
-        for target in target_variables:
-            model_path = os.path.join(soil_dir, f"{target}_model.joblib")
-            if os.path.exists(model_path):
-                try:
-                    soil_models[target] = load(model_path)
-                    print(f"Successfully loaded model: {target}")
-                except Exception as e:
-                    print(f"Error loading model {target}: {str(e)}")
-                    missing_models.append(f"{target} (Error: {str(e)})")
-            else:
-                missing_models.append(target)
-                print(f"Model file not found: {model_path}")
-        
-        # If we're missing nutrient models, try to use base models directly from dataset
-        if any(target in missing_models for target in base_targets):
-            print("Warning: Some nutrient models are missing. Using dataset values directly.")
-            for nutrient in base_targets:
-                if nutrient in missing_models and nutrient.replace('adjusted_', '') in crop_data.columns:
-                    base_nutrient = nutrient.replace('adjusted_', '')
-                    soil_models[nutrient] = {
-                        'direct_value': float(crop_data[base_nutrient].values[0])
-                    }
-                    print(f"Using direct value for {nutrient}: {soil_models[nutrient]['direct_value']}")
-                    missing_models.remove(nutrient)
-        
-        # If we're still missing crucial models after fallbacks, return error
-        if missing_models and all(target in missing_models for target in base_targets):
-            return Response({"error": f"Missing models for all nutrient targets: {', '.join(missing_models)}"})
+        # Load the models for this soil type
+        soil_models, missing_models = load_soil_models(soil_type, water_req_key, crop_data)
         
         # Make predictions for each target variable or use direct values
-        predictions = {}
-        for target, model in soil_models.items():
-            if isinstance(model, dict) and 'direct_value' in model:
-                # Use direct value from the dataset
-                predictions[target] = model['direct_value']
-            else:
-                # Use the model to predict
-                try:
-                    # Check if input_features has all columns the model expects
-                    if hasattr(model, 'feature_names_in_'):
-                        missing_cols = set(model.feature_names_in_) - set(input_features.columns)
-                        for col in missing_cols:
-                            input_features[col] = 0.0  # Add missing columns with default values
-                    
-                    predictions[target] = model.predict(input_features)[0]
-                except Exception as e:
-                    print(f"Error predicting with {target} model: {str(e)}")
-                    # Use a default value based on dataset if prediction fails
-                    if target.replace('adjusted_', '') in crop_data.columns:
-                        base_value = crop_data[target.replace('adjusted_', '')].values[0]
-                        predictions[target] = float(base_value)
-                        print(f"Using default value for {target}: {predictions[target]}")
-                    else:
-                        # Use reasonable defaults if all else fails
-                        defaults = {
-                            'adjusted_nitrogen': 50.0,
-                            'adjusted_phosphorus': 25.0,
-                            'adjusted_potassium': 30.0
-                        }
-                        if target in defaults:
-                            predictions[target] = defaults[target]
-                            print(f"Using standard default for {target}: {predictions[target]}")
-                        else:
-                            # For water requirements, use a reasonable default based on season
-                            water_defaults = {
-                                'short_dry': 450,
-                                'long_rainy': 200,
-                                'long_dry': 550,
-                                'short_rainy': 350
-                            }
-                            predictions[target] = water_defaults.get(season, 400)
-                            print(f"Using seasonal default water value: {predictions[target]}")
-        
-        # Apply seasonal adjustments for nutrient requirements
-        seasonal_factors = {
-            'short_dry': {
-                'nitrogen_factor': 1.0,
-                'phosphorus_factor': 1.0,
-                'potassium_factor': 1.0,
-                'yield_factor': 1.0
-            },
-            'long_rainy': {
-                'nitrogen_factor': 1.25,
-                'phosphorus_factor': 0.9,
-                'potassium_factor': 1.15,
-                'yield_factor': 1.1
-            },
-            'long_dry': {
-                'nitrogen_factor': 0.9,
-                'phosphorus_factor': 1.1,
-                'potassium_factor': 0.95,
-                'yield_factor': 0.9
-            },
-            'short_rainy': {
-                'nitrogen_factor': 1.15,
-                'phosphorus_factor': 0.95,
-                'potassium_factor': 1.05,
-                'yield_factor': 1.05
-            }
+        predictions = {
+            target: predict_target(target, model, input_features, crop_data, season)
+            for target, model in soil_models.items()
         }
         
-        # Apply seasonal adjustment factors
-        nitrogen = predictions.get('adjusted_nitrogen', 50.0) * seasonal_factors[season]['nitrogen_factor']
-        phosphorus = predictions.get('adjusted_phosphorus', 25.0) * seasonal_factors[season]['phosphorus_factor']
-        potassium = predictions.get('adjusted_potassium', 30.0) * seasonal_factors[season]['potassium_factor']
-        
-        # Select the water requirement based on altitude and season
-        water_requirement = predictions.get(water_req_key, None)
-        
-        # If water_requirement is still None, provide a default based on season and altitude
-        if water_requirement is None:
-            # Base defaults by season (in mm)
-            water_defaults = {
-                'short_dry': 450,
-                'long_rainy': 200,
-                'long_dry': 550,
-                'short_rainy': 350
-            }
+        return format_requirements(crop_name, soil_type, season, altitude, crop_data,
+                                   predictions, water_req_key, missing_models)
+        
+    except CropRequirementError as e:
+        return Response({"error": str(e)})
+    except Exception as e:
+        logger.exception("Crop requirement prediction failed")
+        return Response({"error": f"An error occurred during prediction: {str(e)}"})
+
+
+def predict_crop_requirements_batch(items):
+    """
+    Predict crop requirements for many (crop, soil_type, altitude, season) items.
+    
+    Items are grouped so that each (soil type, target) model runs a single
+    predict over every row that needs it; a model that fails on the batch
+    falls back to row-by-row prediction with the usual defaults.
+    
+    Args:
+        items: Iterable of dicts with 'crop', 'soil_type', 'altitude' and 'season'
+        
+    Returns:
+        list: One entry per item, in input order - the same dict
+        predict_crop_requirements returns, or {"error": message}
+    """
+    items = list(items)
+    results = [None] * len(items)
+    
+    # Work shared by items with the same soil type, crop or altitude/season
+    soil_types = {}
+    crops = {}
+    water_models = {}
+    model_sets = {}
+    
+    plans = {}
+    for index, item in enumerate(items):
+        try:
+            crop_name = item['crop']
+            altitude = item.get('altitude', 'mid')
+            season = item.get('season', 'short_dry')
             
-            # Altitude adjustment factors
-            altitude_factors = {
-                'low': 1.2,  # Higher water requirement in low altitude
-                'mid': 1.0,  # Base reference
-                'high': 0.8   # Lower water requirement in high altitude (cooler, less evaporation)
-            }
+            if item['soil_type'] not in soil_types:
+                soil_types[item['soil_type']] = resolve_soil_type(item['soil_type'])
+            soil_type, soil_dir = soil_types[item['soil_type']]
             
-            # Use the default for the season, adjusted by altitude
-            base_water = water_defaults.get(season, 400)
-            altitude_factor = altitude_factors.get(altitude, 1.0)
-            water_requirement = base_water * altitude_factor
-            print(f"Using calculated default water requirement: {water_requirement} mm")
-        
-        # Format the results
-        requirements = {
-            "crop": crop_name,
-            "soil_type": soil_type,
-            "season": season,
-            "altitude": altitude,
-            "requirements": {
-                "nitrogen_kg_per_ha": round(nitrogen, 2),
-                "phosphorus_kg_per_ha": round(phosphorus, 2),
-                "potassium_kg_per_ha": round(potassium, 2),
-                "water_requirement_mm": round(water_requirement, 2) if water_requirement else None,
-            }
-        }
-        
-        # Add optional fields if they exist in the dataset
-        if 'optimal_ph' in crop_data:
-            requirements["requirements"]["optimal_ph"] = float(crop_data['optimal_ph'].values[0])
-        
-        if 'min_sunlight_hours' in crop_data:
-            requirements["requirements"]["min_sunlight_hours"] = int(crop_data['min_sunlight_hours'].values[0])
-        
-        # Add planting information if available
-        planting_fields = ['row_spacing_cm', 'plant_spacing_cm', 'planting_depth_cm']
-        if all(field in crop_data.columns for field in planting_fields):
-            planting_info = {
-                "row_spacing_cm": int(crop_data['row_spacing_cm'].values[0]),
-                "plant_spacing_cm": int(crop_data['plant_spacing_cm'].values[0]),
-                "planting_depth_cm": int(crop_data['planting_depth_cm'].values[0]),
+            if crop_name not in crops:
+                crops[crop_name] = find_crop(crop_name)
+            matched_name, crop_data, features = crops[crop_name]
+            
+            water_key = (soil_type, altitude, season)
+            if water_key not in water_models:
+                detailed_season = SEASON_MAPPING.get(season, 'short_dry')
+                water_models[water_key] = select_water_model(soil_type, altitude, detailed_season)
+            water_req_key = water_models[water_key]
+            
+            models_key = (soil_type, water_req_key, matched_name)
+            if models_key not in model_sets:
+                model_sets[models_key] = load_soil_models(soil_type, water_req_key, crop_data)
+            soil_models, missing_models = model_sets[models_key]
+            
+            plans[index] = {
+                'crop_name': matched_name,
+                'soil_type': soil_type,
+                'altitude': altitude,
+                'season': season,
+                'crop_data': crop_data,
+                'features': features,
+                'water_req_key': water_req_key,
+                'soil_models': soil_models,
+                'missing_models': list(missing_models),
+                'predictions': {},
             }
-            requirements["requirements"]["planting_info"] = planting_info
-        
-        # Add expected yield if available
-        if 'optimal_yield' in crop_data.columns:
-            base_yield = float(crop_data['optimal_yield'].values[0])
-            # Apply yield factor based on season
-            adjusted_yield = base_yield * seasonal_factors[season]['yield_factor']
-            requirements["expected_yield_tons_per_ha"] = round(adjusted_yield, 2)
-        
-        # Add intercropping recommendation if available
-        if 'intercropping_compatibility' in crop_data.columns:
-            intercrop_value = crop_data['intercropping_compatibility'].values[0]
-            if isinstance(intercrop_value, str) and intercrop_value != 'None':
-                requirements["intercropping_recommendation"] = intercrop_value.split(',')
-        
-        # Add season-specific recommendations for Rwanda's four seasons
-        if season == 'short_dry':
-            requirements["seasonal_recommendations"] = [
-                "Implement water conservation techniques",
-                "Consider drought-resistant varieties",
-                "Apply mulch to reduce evaporation",
-                "Use drip irrigation if available"
-            ]
-        elif season == 'long_rainy':
-            requirements["seasonal_recommendations"] = [
-                "Ensure proper drainage systems to prevent waterlogging",
-                "Monitor closely for fungal diseases",
-                "Consider raised beds in low-lying areas",
-                "Implement erosion control measures on slopes"
-            ]
-        elif season == 'long_dry':
-            requirements["seasonal_recommendations"] = [
-                "Increase irrigation frequency and volume",
-                "Use deep mulching to preserve soil moisture",
-                "Consider shade structures for sensitive crops",
-                "Implement windbreaks to reduce evapotranspiration"
-            ]
-        elif season == 'short_rainy':
-            requirements["seasonal_recommendations"] = [
-                "Monitor drainage but prepare for dry spells",
-                "Implement integrated pest management for seasonal pests",
-                "Consider cover crops to prevent soil erosion",
-                "Time planting to maximize use of rainfall patterns"
+        except CropRequirementError as e:
+            results[index] = {"error": str(e)}
+        except Exception as e:
+            results[index] = {"error": f"An error occurred during prediction: {str(e)}"}
+    
+    # One predict per (soil type, target) model over all the rows that need it
+    groups = {}
+    for index, plan in plans.items():
+        for target, model in plan['soil_models'].items():
+            if isinstance(model, dict) and 'direct_value' in model:
+                plan['predictions'][target] = model['direct_value']
+            else:
+                groups.setdefault((plan['soil_type'], target), (model, []))[1].append(index)
+    
+    for (soil_type, target), (model, indices) in groups.items():
+        features = pd.concat([plans[index]['features'] for index in indices], ignore_index=True)
+        try:
+            add_model_columns(model, features)
+            values = model.predict(features)
+        except Exception as e:
+            logger.warning("Batch prediction with %s/%s failed, predicting row by row: %s", soil_type, target, e)
+            values = [
+                predict_target(target, model, plans[index]['features'].copy(),
+                               plans[index]['crop_data'], plans[index]['season'])
+                for index in indices
             ]
-            
-        # Add note about model limitations if fallbacks were used
-        if missing_models:
-            requirements["model_notes"] = f"Some models were unavailable ({', '.join(missing_models)}). Results may be less accurate."
-        
-        return requirements
-        
-    except Exception as e:
-        import traceback
-        error_details = traceback.format_exc()
-        print(f"Detailed error: {error_details}")
-        return Response({"error": f"An error occurred during prediction: {str(e)}"})
+        for index, value in zip(indices, values):
+            plans[index]['predictions'][target] = value
+    
+    for index, plan in plans.items():
+        try:
+            results[index] = format_requirements(
+                plan['crop_name'], plan['soil_type'], plan['season'], plan['altitude'], plan['crop_data'],
+                plan['predictions'], plan['water_req_key'], plan['missing_models']
+            )
+        except Exception as e:
+            results[index] = {"error": f"An error occurred during prediction: {str(e)}"}
+    
+    return results
     
     
     
@@ -1,6 +1,10 @@
-import joblib
+import logging
 import sys
 import os
+from .model_registry import registry
+from .location_index import location_index
+
+logger = logging.getLogger(__name__)
 
 import os
 # print(f"Current working directory: {os.getcwd()}")
@@ -14,25 +18,15 @@ models_dir = os.path.join(current_dir, 'models')
 def load_model_components():
     """Load all required model components."""
     try:
-        # Get the current directory (where this script is)
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        # Define paths
-        model_path = os.path.join(current_dir, 'models', 'rwanda_altitude_model.joblib')
-        district_encoder_path = os.path.join(current_dir, 'models', 'district_encoder.joblib')
-        sector_encoder_path = os.path.join(current_dir, 'models', 'sector_encoder.joblib')
-        altitude_mapping_path = os.path.join(current_dir, 'models', 'altitude_mapping.joblib')
-        
-        # Actually load the files
-        model = joblib.load(model_path)
-        district_encoder = joblib.load(district_encoder_path)
-        sector_encoder = joblib.load(sector_encoder_path)
-        altitude_mapping = joblib.load(altitude_mapping_path)
+        # Served from the process-wide registry; files are only read on first use
+        model = registry.get('altitude_model')
+        district_encoder = registry.get('district_encoder')
+        sector_encoder = registry.get('sector_encoder')
+        altitude_mapping = registry.get('altitude_mapping')
         
         return model, district_encoder, sector_encoder, altitude_mapping
     except FileNotFoundError as e:
-        print(f"Error: Required model files not found. {e}")
-        print(f"Current directory: {os.getcwd()}")
-        print(f"Looking for models in: {os.path.join(os.getcwd(), 'models')}")
+        logger.error("Required altitude model files not found in %s: %s", registry.models_dir, e)
         return None, None, None, None
     
     
@@ -45,19 +39,28 @@ def predict_altitude(district_name, sector_name):
     if model is None:
         return "Failed to load model components"
     
-    # Check if district exists in our encoded data
     try:
-        if district_name not in district_encoder.classes_:
-            return f"District '{district_name}' not found in the dataset"
+        # Known pairs carry their encoder ids in the location index
+        location = location_index.lookup(district_name, sector_name)
         
-        # Encode the input
-        district_enc = district_encoder.transform([district_name])[0]
-        
-        # Check if sector exists and encode it
-        try:
-            sector_enc = sector_encoder.transform([sector_name])[0]
-        except ValueError:
-            return f"Sector '{sector_name}' not found in the dataset"
+        if location is not None and location.district_encoded is not None and location.sector_encoded is not None:
+            district_enc = location.district_encoded
+            sector_enc = location.sector_encoded
+        else:
+            district_name = location_index.canonical_district(district_name) or district_name
+            
+            # Check if district exists in our encoded data
+            if district_name not in district_encoder.classes_:
+                return f"District '{district_name}' not found in the dataset"
+            
+            # Encode the input
+            district_enc = district_encoder.transform([district_name])[0]
+            
+            # Check if sector exists and encode it
+            try:
+                sector_enc = sector_encoder.transform([sector_name])[0]
+            except ValueError:
+                return f"Sector '{sector_name}' not found in the dataset"
         
         # Make prediction
         prediction = model.predict([[district_enc, sector_enc]])[0]
@@ -86,19 +89,17 @@ def list_sectors_in_district(district_name):
     if district_encoder is None:
         return []
     
-    # Load the original dataset to get sectors for a district
+    # Sectors come from the shared location index
     try:
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        dataset_path = os.path.join(current_dir, 'models', 'cleaned_data.joblib')
-        dataset = joblib.load(dataset_path)
+        sectors = location_index.sectors(district_name)
         
-        if district_name in dataset['District'].values:
-            return sorted(dataset[dataset['District'] == district_name]['Sector'].unique())
+        if sectors:
+            return sectors
         else:
-            print(f"District '{district_name}' not found")
+            logger.warning("District '%s' not found", district_name)
             return []
     except Exception as e:
-        print(f"Could not load sector information: {e}")
+        logger.warning("Could not load sector information: %s", e)
         return []
 
 
@@ -1,7 +1,14 @@
 import pandas as pd
-from joblib import load
+import hashlib
+import logging
 import os
+from datetime import datetime, timezone
+import joblib
+from .lazy_imports import load_module
+from .model_registry import registry
+from .location_index import location_index
 
+logger = logging.getLogger(__name__)
 
 # print(f"Current working directory: {os.getcwd()}")
 # print(f"Script location: {os.path.dirname(os.path.abspath(__file__))}")
@@ -10,60 +17,131 @@ import os
 current_dir = os.path.dirname(os.path.__file__)
 models_dir = os.path.join(current_dir, 'models')
 
+SOIL_DATASET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'rwanda_soilTypes.csv')
+FITTED_PREPROCESSOR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', 'soil_preprocessor_fitted.joblib')
+SOIL_FEATURE_COLUMNS = ['District', 'Latitude', 'Longitude']
+
+# In-memory artifact used when the frozen file is missing or was fitted on another dataset
+_built_artifact = None
+# Frozen artifact whose dataset hash was last compared with the CSV, and the result
+_checked_artifact = None
+_checked_artifact_current = False
+
+
+def dataset_sha256(dataset_path=SOIL_DATASET_PATH):
+    with open(dataset_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def build_soil_preprocessor_artifact(dataset_path=SOIL_DATASET_PATH, output_path=FITTED_PREPROCESSOR_PATH):
+    """
+    Fit the soil preprocessor on the training data and freeze it together
+    with the training-set statistics.
+
+    The artifact is versioned by the SHA-256 of the training CSV. Pass
+    ``output_path=None`` to build it in memory only.
+    """
+    sha256 = dataset_sha256(dataset_path)
+    
+    dataset = pd.read_csv(dataset_path)
+    training_data = dataset[SOIL_FEATURE_COLUMNS]
+    
+    sklearn = load_module('sklearn')
+    preprocessor = load_module('sklearn.base').clone(registry.get('soil_preprocessor'))
+    preprocessor.fit(training_data)
+    
+    def column_stats(column):
+        return {
+            'mean': float(column.mean()),
+            'std': float(column.std()),
+            'min': float(column.min()),
+            'max': float(column.max()),
+        }
+    
+    artifact = {
+        'version': sha256[:12],
+        'dataset_sha256': sha256,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'sklearn_version': sklearn.__version__,
+        'preprocessor': preprocessor,
+        'training_stats': {
+            'rows': int(len(training_data)),
+            'districts': sorted(training_data['District'].unique().tolist()),
+            'latitude': column_stats(training_data['Latitude']),
+            'longitude': column_stats(training_data['Longitude']),
+        },
+    }
+    
+    if output_path:
+        joblib.dump(artifact, output_path)
+    
+    return artifact
 
-def predict_soil_texture(district, sector):
 
+def get_soil_preprocessor_artifact():
+    """
+    Return the frozen preprocessor artifact, building it once in memory if
+    the file is missing or was fitted on a different version of the soil
+    dataset (its dataset_sha256 is checked once per loaded artifact).
+    """
+    global _built_artifact, _checked_artifact, _checked_artifact_current
     try:
-        # Load the model and preprocessor
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        # Load the model and preprocessor
-        model_path = os.path.join(current_dir, 'models', 'best_soil_texture_model.joblib')
+        artifact = registry.get('soil_preprocessor_fitted')
+    except FileNotFoundError:
+        artifact = None
+    
+    if artifact is not None:
+        if artifact is not _checked_artifact:
+            _checked_artifact = artifact
+            _checked_artifact_current = artifact.get('dataset_sha256') == dataset_sha256()
+            if not _checked_artifact_current:
+                logger.warning("Frozen soil preprocessor %s was fitted on a different %s; fitting it once in memory. "
+                               "Run manage.py freeze_soil_preprocessor to update it.",
+                               artifact.get('version'), os.path.basename(SOIL_DATASET_PATH))
+        if _checked_artifact_current:
+            return artifact
+    
+    if _built_artifact is None:
+        if artifact is None:
+            logger.warning("Frozen soil preprocessor not found. Fitting it once in memory.")
+        _built_artifact = build_soil_preprocessor_artifact(output_path=None)
+    return _built_artifact
 
-        preprocessor_path = os.path.join(current_dir, 'models', 'soil_preprocessor.joblib')
-        
-        if not os.path.exists(model_path) or not os.path.exists(preprocessor_path):
+
+
+def predict_soil_texture(district, sector):
+
+    try:
+        # Models are loaded once per process by the shared registry
+        try:
+            model = registry.get('soil_texture_model')
+            preprocessor = get_soil_preprocessor_artifact()['preprocessor']
+        except FileNotFoundError:
             return "Error: Model or preprocessor file not found."
         
-        model = load(model_path)
-        preprocessor = load(preprocessor_path)
-        
-        # Load the original dataset to get coordinates
+        # Look up the sector centroid in the shared location index
         try:
-            dataset = pd.read_csv(os.path.join(current_dir, 'data', 'rwanda_soilTypes.csv'))
-            
-            # Find average coordinates for the specific sector
-            sector_data = dataset[(dataset['District'] == district) & (dataset['Sector'] == sector)]
-            
-            if len(sector_data) > 0:
-                # Use average coordinates for the sector
-                latitude = sector_data['Latitude'].mean()
-                longitude = sector_data['Longitude'].mean()
-            else:
-                return f"Error: The combination of District '{district}' and Sector '{sector}' was not found in the dataset."
-                
+            location = location_index.lookup(district, sector)
         except FileNotFoundError:
             return "Error: Dataset file not found."
         
+        if location is None:
+            return f"Error: The combination of District '{district}' and Sector '{sector}' was not found in the dataset."
+        
         # Create a dataframe with the input data
         input_data = pd.DataFrame({
-            'District': [district],
-            'Latitude': [latitude],
-            'Longitude': [longitude]
+            'District': [location.district],
+            'Latitude': [location.latitude],
+            'Longitude': [location.longitude]
         })
 
-        # Get a sample of the training data to fit the preprocessor
-        training_data = dataset[['District', 'Latitude', 'Longitude']]
-        
-        # Fit the preprocessor on the training data
-        preprocessor.fit(training_data)
-        
-        # Now transform the input data
+        # The preprocessor was fitted on the training data when it was frozen
         X_processed = preprocessor.transform(input_data)
         
         # Make the prediction
         prediction = model.predict(X_processed)[0]
         
-        print("Predicted Soil type type is:", prediction)
+        logger.debug("Predicted soil type for %s, %s: %s", district, sector, prediction)
         
         return prediction.lower()
     
@@ -1,22 +1,21 @@
 import numpy as np
 import pandas as pd
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 import random
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.preprocessing import MinMaxScaler
-from sklearn.model_selection import train_test_split
-from tensorflow.keras.models import Sequential, load_model
-from tensorflow.keras.layers import LSTM, Dense, Dropout
 import joblib
+import logging
 import os
-from tensorflow.keras.losses import MeanSquaredError
+from .lazy_imports import LazyModule, load_module
+from .lstm_numpy import NumpyLSTMModel, export_keras_model
 
+# Plotting and scikit-learn are only used for training and reports, so they
+# are imported on first use instead of whenever the views are loaded
+plt = LazyModule('matplotlib.pyplot')
+sns = LazyModule('seaborn')
+preprocessing = LazyModule('sklearn.preprocessing')
 
-
-# Set up output directories
-os.makedirs('plots', exist_ok=True)
-os.makedirs('reports', exist_ok=True)
+logger = logging.getLogger(__name__)
 
 
 
@@ -276,216 +275,330 @@ RWANDA_DISTRICTS = {
     }
 }
 
-def generate_location_weather_data(start_date='2022-01-01', n_days=1095):  # ~3 years of data
-    """
-    Generate synthetic weather data for multiple locations in Rwanda
+# Measurement columns of the synthetic dataset; about 1% of their values are left missing
+WEATHER_MEASUREMENT_COLUMNS = ['temp_min_c', 'temp_max_c', 'temp_avg_c', 'humidity_pct',
+                               'rainfall_mm', 'wind_speed_kmh', 'sunshine_hours']
+
+# Day-to-day persistence of the synthetic weather
+TEMP_PERSISTENCE = 0.7
+HUMIDITY_PERSISTENCE = 0.6
+RAIN_PERSISTENCE = 0.2  # added to the chance of rain the day after a rainy day
+
+
+def simulate_location_weather(locations, dates, rng):
     """
-    dates = [datetime.strptime(start_date, '%Y-%m-%d') + timedelta(days=i) for i in range(n_days)]
+    Simulate daily weather for several districts at once
     
-    all_locations_data = []
+    Every draw is made for all days and districts up front. Temperature is
+    an AR(1) process on the daily average, computed with a linear filter;
+    humidity (clipped to 40-100%) and rainfall (more likely after a rainy
+    day) depend non-linearly on the previous day, so they are computed by
+    a scan over days that updates every district at each step.
     
-    for location, attributes in RWANDA_DISTRICTS.items():
-        # Base values adjusted for location
-        temp_min_base = 15 + attributes['temp_offset']  # Celsius
-        temp_max_base = 30 + attributes['temp_offset']  # Celsius
-        humidity_base = 70 + attributes['humidity_offset']  # Percentage
-        rainfall_factor = attributes['rainfall_factor']
-        elevation = attributes['elevation']
-        
-        # Lists to store location data
-        temp_min = []
-        temp_max = []
-        temp_avg = []
-        humidity = []
-        rainfall = []
-        wind_speed = []
-        sunshine_hours = []
-        
-        # For correlation between days (weather patterns)
-        prev_temp = temp_min_base + (temp_max_base - temp_min_base) / 2
-        prev_humidity = humidity_base
-        prev_rainfall = 0
-        
-        for date in dates:
-            month = date.month
-            day_of_year = date.timetuple().tm_yday
-            
-            # Seasonal temperature variations (cooler in June-August, warmer in Feb-March)
-            seasonal_temp_effect = -3 * np.sin(2 * np.pi * (day_of_year - 15) / 365)
-            
-            # Temperature persistence (correlation with previous day)
-            persistence_factor = 0.7
-            random_factor = 1 - persistence_factor
-            
-            # Random daily variations with persistence from previous day
-            daily_temp_variation = persistence_factor * (prev_temp - temp_min_base - temp_max_base) / 2 + \
-                                random_factor * np.random.normal(0, 1.5)
-            
-            # Calculate actual temperatures
-            day_temp_min = temp_min_base + seasonal_temp_effect + daily_temp_variation - random.uniform(0, 3)
-            day_temp_max = temp_max_base + seasonal_temp_effect + daily_temp_variation + random.uniform(0, 3)
-            day_temp_avg = (day_temp_min + day_temp_max) / 2
-            
-            # Update previous temperature for next iteration
-            prev_temp = day_temp_avg
-            
-            # Humidity - higher in rainy seasons and with elevation effects
-            # March-May and September-December have higher humidity
-            humidity_seasonal = 5 * (1 if (month >= 3 and month <= 5) or (month >= 9 and month <= 12) else -1)
-            
-            # Humidity has some persistence from previous day
-            humidity_persistence = 0.6
-            day_humidity = humidity_base + humidity_seasonal + \
-                          humidity_persistence * (prev_humidity - humidity_base) + \
-                          (1 - humidity_persistence) * np.random.normal(0, 5)
-            
-            day_humidity = max(40, min(100, day_humidity))  # Constrain between 40-100%
-            prev_humidity = day_humidity
-            
-            # Rainfall patterns - two rainy seasons in Rwanda
-            # Major rainy season: March-May
-            # Minor rainy season: September-December
-            is_rainy_season = (month >= 3 and month <= 5) or (month >= 9 and month <= 12)
-            
-            # Rainfall probability based on season and previous day's rainfall
-            base_rain_probability = 0.6 if is_rainy_season else 0.2
-            # Higher chance of rain if it rained yesterday (weather patterns)
-            rain_persistence = 0.2 if prev_rainfall > 0 else 0
-            rain_probability = min(0.9, base_rain_probability + rain_persistence)
-            
-            if random.random() < rain_probability:
-                if month >= 3 and month <= 5:  # Major rainy season
-                    day_rainfall = max(0, np.random.gamma(5, 5) * rainfall_factor + np.random.normal(0, 2))
-                elif month >= 9 and month <= 12:  # Minor rainy season
-                    day_rainfall = max(0, np.random.gamma(3, 4) * rainfall_factor + np.random.normal(0, 2))
-                else:  # Dry season, occasional rain
-                    day_rainfall = max(0, np.random.gamma(1, 2) * rainfall_factor + np.random.normal(0, 1))
-            else:
-                day_rainfall = 0
-                
-            # Update previous rainfall
-            prev_rainfall = day_rainfall
-            
-            # Wind speed (affected by elevation and terrain)
-            # Higher elevations tend to have higher wind speeds
-            elevation_factor = (elevation - 1400) / 1000  # Normalized to range of elevations
-            day_wind_speed = max(0, np.random.gamma(2, 1.5) + elevation_factor + np.random.normal(0, 0.5))
-            
-            # Sunshine hours (negatively correlated with rainfall)
-            potential_sunshine = 12  # Maximum possible
-            if day_rainfall > 10:
-                day_sunshine = max(0, potential_sunshine * (0.3 + np.random.normal(0, 0.1)))
-            elif day_rainfall > 0:
-                day_sunshine = max(0, potential_sunshine * (0.6 + np.random.normal(0, 0.15)))
-            else:
-                day_sunshine = max(0, potential_sunshine * (0.9 + np.random.normal(0, 0.1)))
-            
-            # Append values to lists
-            temp_min.append(round(day_temp_min, 1))
-            temp_max.append(round(day_temp_max, 1))
-            temp_avg.append(round(day_temp_avg, 1))
-            humidity.append(round(day_humidity, 1))
-            rainfall.append(round(day_rainfall, 1))
-            wind_speed.append(round(day_wind_speed, 1))
-            sunshine_hours.append(round(day_sunshine, 1))
+    Args:
+        locations: District names from RWANDA_DISTRICTS
+        dates: DatetimeIndex of the days to simulate
+        rng: numpy Generator
         
-        # Create location-specific DataFrame
-        location_df = pd.DataFrame({
-            'date': dates,
-            'location': location,
-            'latitude': attributes['coordinates'][0],
-            'longitude': attributes['coordinates'][1],
-            'elevation_m': elevation,
-            'temp_min_c': temp_min,
-            'temp_max_c': temp_max,
-            'temp_avg_c': temp_avg,
-            'humidity_pct': humidity,
-            'rainfall_mm': rainfall,
-            'wind_speed_kmh': wind_speed,
-            'sunshine_hours': sunshine_hours
-        })
+    Returns:
+        dict: Measurement column -> array of shape (len(dates), len(locations))
+    """
+    n_days, n_locations = len(dates), len(locations)
+    shape = (n_days, n_locations)
+    
+    # Per-district attributes as row vectors so they broadcast over days
+    attrs = [RWANDA_DISTRICTS[location] for location in locations]
+    temp_offset = np.array([a['temp_offset'] for a in attrs], dtype=float)
+    temp_min_base = 15 + temp_offset  # Celsius
+    temp_max_base = 30 + temp_offset  # Celsius
+    humidity_base = 70 + np.array([a['humidity_offset'] for a in attrs], dtype=float)  # Percentage
+    rainfall_factor = np.array([a['rainfall_factor'] for a in attrs], dtype=float)
+    elevation = np.array([a['elevation'] for a in attrs], dtype=float)
+    
+    # Calendar effects as column vectors so they broadcast over districts
+    month = dates.month.to_numpy()[:, None]
+    day_of_year = dates.dayofyear.to_numpy()[:, None]
+    major_rainy = (month >= 3) & (month <= 5)
+    minor_rainy = (month >= 9) & (month <= 12)
+    is_rainy_season = major_rainy | minor_rainy
+    
+    # Seasonal temperature variations (cooler in June-August, warmer in Feb-March)
+    seasonal_temp_effect = -3 * np.sin(2 * np.pi * (day_of_year - 15) / 365)
+    
+    # Daily variation carries over from the previous day's average:
+    #   variation[t] = persistence * (avg[t-1] - min_base - max_base) / 2 + noise[t]
+    #   avg[t] = (min_base + max_base) / 2 + seasonal[t] + variation[t] + (max_spread[t] - min_spread[t]) / 2
+    # which is the linear recurrence avg[t] = a * avg[t-1] + drive[t] with a = persistence / 2
+    base_sum = temp_min_base + temp_max_base
+    temp_noise = (1 - TEMP_PERSISTENCE) * rng.normal(0, 1.5, shape)
+    min_spread = rng.uniform(0, 3, shape)
+    max_spread = rng.uniform(0, 3, shape)
+    carry = TEMP_PERSISTENCE / 2
+    drive = base_sum / 2 - carry * base_sum + seasonal_temp_effect + temp_noise + (max_spread - min_spread) / 2
+    initial_temp = base_sum / 2
+    signal = load_module('scipy.signal')
+    temp_avg, _ = signal.lfilter([1.0], [1.0, -carry], drive, axis=0, zi=(carry * initial_temp)[None, :])
+    
+    previous_temp = np.vstack([initial_temp[None, :], temp_avg[:-1]])
+    daily_temp_variation = carry * (previous_temp - base_sum) + temp_noise
+    temp_min = temp_min_base + seasonal_temp_effect + daily_temp_variation - min_spread
+    temp_max = temp_max_base + seasonal_temp_effect + daily_temp_variation + max_spread
+    
+    # Humidity - higher in rainy seasons, with persistence from the previous day
+    humidity_seasonal = np.where(is_rainy_season, 5, -5)[:, 0]
+    humidity_noise = (1 - HUMIDITY_PERSISTENCE) * rng.normal(0, 5, shape)
+    
+    # Rainfall - amount if it rains, by season; whether it rains depends on yesterday
+    gamma_shape = np.where(major_rainy, 5, np.where(minor_rainy, 3, 1))
+    gamma_scale = np.where(major_rainy, 5, np.where(minor_rainy, 4, 2))
+    rain_noise_sd = np.where(is_rainy_season, 2, 1)
+    rain_amount = np.maximum(0, rng.gamma(np.broadcast_to(gamma_shape, shape), np.broadcast_to(gamma_scale, shape))
+                             * rainfall_factor + rng.normal(0, np.broadcast_to(rain_noise_sd, shape)))
+    base_rain_probability = np.where(is_rainy_season, 0.6, 0.2)[:, 0]
+    rain_draw = rng.random(shape)
+    
+    humidity = np.empty(shape)
+    rainfall = np.empty(shape)
+    day_humidity = humidity_base
+    rained = np.zeros(n_locations, dtype=bool)
+    for day in range(n_days):
+        day_humidity = np.clip(humidity_base + humidity_seasonal[day]
+                               + HUMIDITY_PERSISTENCE * (day_humidity - humidity_base)
+                               + humidity_noise[day], 40, 100)
+        humidity[day] = day_humidity
         
-        all_locations_data.append(location_df)
+        rain_probability = np.minimum(0.9, base_rain_probability[day] + RAIN_PERSISTENCE * rained)
+        day_rainfall = np.where(rain_draw[day] < rain_probability, rain_amount[day], 0.0)
+        rainfall[day] = day_rainfall
+        rained = day_rainfall > 0
     
-    # Combine all location data
-    combined_df = pd.concat(all_locations_data, ignore_index=True)
+    # Wind speed (higher elevations tend to have higher wind speeds)
+    elevation_factor = (elevation - 1400) / 1000
+    wind_speed = np.maximum(0, rng.gamma(2, 1.5, shape) + elevation_factor + rng.normal(0, 0.5, shape))
     
-    # Add some missing values to make dataset more realistic
-    for col in combined_df.columns:
-        if col not in ['date', 'location', 'latitude', 'longitude', 'elevation_m']:
-            # Add 1% missing data
-            mask = np.random.random(size=len(combined_df)) < 0.01
-            combined_df.loc[mask, col] = np.nan
+    # Sunshine hours (negatively correlated with rainfall)
+    sunshine_mean = np.where(rainfall > 10, 0.3, np.where(rainfall > 0, 0.6, 0.9))
+    sunshine_sd = np.where((rainfall > 0) & (rainfall <= 10), 0.15, 0.1)
+    sunshine = np.maximum(0, 12 * (sunshine_mean + sunshine_sd * rng.standard_normal(shape)))
+    
+    return {
+        'temp_min_c': temp_min,
+        'temp_max_c': temp_max,
+        'temp_avg_c': (temp_min + temp_max) / 2,
+        'humidity_pct': humidity,
+        'rainfall_mm': rainfall,
+        'wind_speed_kmh': wind_speed,
+        'sunshine_hours': sunshine,
+    }
+
+
+def _location_weather_frame(locations, dates, weather, rng):
+    """Long-format DataFrame (all days of one district, then the next) with the derived columns"""
+    n_days = len(dates)
+    attrs = [RWANDA_DISTRICTS[location] for location in locations]
+    
+    df = pd.DataFrame({
+        'date': np.tile(dates.to_numpy(), len(locations)),
+        'location': np.repeat(locations, n_days),
+        'latitude': np.repeat([a['coordinates'][0] for a in attrs], n_days),
+        'longitude': np.repeat([a['coordinates'][1] for a in attrs], n_days),
+        'elevation_m': np.repeat([a['elevation'] for a in attrs], n_days),
+    })
+    for col in WEATHER_MEASUREMENT_COLUMNS:
+        values = np.round(weather[col].T.ravel(), 1)
+        # Add 1% missing data to make the dataset more realistic
+        values[rng.random(len(values)) < 0.01] = np.nan
+        df[col] = values
     
     # Add derived features
-    combined_df['month'] = combined_df['date'].dt.month
-    combined_df['day'] = combined_df['date'].dt.day
-    combined_df['day_of_year'] = combined_df['date'].dt.dayofyear
-    combined_df['year'] = combined_df['date'].dt.year
-    combined_df['is_rainy_season'] = combined_df['month'].apply(lambda x: 1 if (x >= 3 and x <= 5) or (x >= 9 and x <= 12) else 0)
+    df['month'] = np.tile(dates.month.to_numpy(), len(locations))
+    df['day'] = np.tile(dates.day.to_numpy(), len(locations))
+    df['day_of_year'] = np.tile(dates.dayofyear.to_numpy(), len(locations))
+    df['year'] = np.tile(dates.year.to_numpy(), len(locations))
+    df['is_rainy_season'] = (((df['month'] >= 3) & (df['month'] <= 5)) | (df['month'] >= 9)).astype(int)
+    return df
+
+
+def iter_location_weather_data(start_date='2022-01-01', n_days=1095, seed=None, districts_per_chunk=None):
+    """
+    Generate the synthetic weather dataset a few districts at a time
     
-    return combined_df
+    Yields DataFrames of ``districts_per_chunk`` districts (all of them if
+    None) in RWANDA_DISTRICTS order, so memory stays bounded for long
+    periods. The same seed and chunk size reproduce the same data.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start_date, periods=n_days, freq='D')
+    locations = list(RWANDA_DISTRICTS)
+    step = districts_per_chunk or len(locations)
+    for i in range(0, len(locations), step):
+        chunk = locations[i:i + step]
+        yield _location_weather_frame(chunk, dates, simulate_location_weather(chunk, dates, rng), rng)
 
-def clean_weather_data(data):
+
+def generate_location_weather_data(start_date='2022-01-01', n_days=1095, seed=None):  # ~3 years of data
     """
-    Clean and preprocess the weather data
+    Generate synthetic weather data for multiple locations in Rwanda
     """
-    # Make a copy to avoid modifying the original
-    df = data.copy()
-    
-    # Handle missing values by location and date
-    for location in df['location'].unique():
-        location_data = df[df['location'] == location]
-        
-        for col in df.columns:
-            if col not in ['date', 'location', 'latitude', 'longitude', 'elevation_m', 'month', 'day', 'day_of_year', 'year', 'is_rainy_season']:
-                # Use interpolation for time series data
-                df.loc[df['location'] == location, col] = location_data[col].interpolate(method='linear')
-    
-    # Fill any remaining missing values
-    df = df.ffill().bfill()  # Using ffill and bfill instead of deprecated method param
+    return pd.concat(iter_location_weather_data(start_date, n_days, seed=seed), ignore_index=True)
+
+
+def write_location_weather_data(path, start_date='2022-01-01', n_days=1095, seed=None, districts_per_chunk=5):
+    """
+    Stream the synthetic weather dataset to a CSV or Parquet file (by
+    extension), one chunk of districts at a time. Parquet needs pyarrow.
     
-    # Check for and remove duplicates
+    Returns:
+        int: Number of rows written
+    """
+    chunks = iter_location_weather_data(start_date, n_days, seed=seed, districts_per_chunk=districts_per_chunk)
+    rows = 0
+    
+    if path.endswith('.parquet'):
+        pa = load_module('pyarrow')
+        parquet = load_module('pyarrow.parquet')
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = parquet.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+                rows += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
+    
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        rows += len(chunk)
+    return rows
+
+# Columns that identify a row or come from its date, so they are never interpolated
+WEATHER_ID_COLUMNS = ['date', 'location', 'latitude', 'longitude', 'elevation_m', 'month', 'day', 'day_of_year',
+                      'year', 'is_rainy_season']
+
+# Prefix of the lag and rolling features -> the measurement they are computed from
+LAG_FEATURE_COLUMNS = {'temp_avg': 'temp_avg_c', 'rainfall': 'rainfall_mm', 'humidity': 'humidity_pct'}
+FEATURE_LAGS = [1, 3, 7]
+ROLLING_WINDOW = 7
+
+# Leading rows of each location without a full set of lag/rolling features
+FEATURE_WARMUP_ROWS = max(FEATURE_LAGS + [ROLLING_WINDOW])
+
+
+def _interpolate_by_location(df):
+    """Linearly interpolate the measurement columns within each location, in row order"""
+    value_columns = [col for col in df.columns if col not in WEATHER_ID_COLUMNS]
+    if value_columns:
+        df[value_columns] = df.groupby('location', sort=False)[value_columns].transform(
+            lambda values: values.interpolate(method='linear'))
+    return df
+
+
+def _add_location_features(df, location_names):
+    """
+    Sort by location and date, then add the lag, rolling and one-hot
+    location features in one grouped pass and drop each location's first
+    FEATURE_WARMUP_ROWS rows
+    """
     df = df.drop_duplicates(subset=['date', 'location'], keep='first')
-    
-    # Sort by location and date
     df = df.sort_values(['location', 'date'])
     
-    # Add lag features for key weather variables by location
-    for location in df['location'].unique():
-        location_mask = df['location'] == location
-        
-        for lag in [1, 3, 7]:
-            df.loc[location_mask, f'temp_avg_lag{lag}'] = df.loc[location_mask, 'temp_avg_c'].shift(lag)
-            df.loc[location_mask, f'rainfall_lag{lag}'] = df.loc[location_mask, 'rainfall_mm'].shift(lag)
-            df.loc[location_mask, f'humidity_lag{lag}'] = df.loc[location_mask, 'humidity_pct'].shift(lag)
-        
-        # Create rolling mean features
-        df.loc[location_mask, 'temp_avg_rolling7'] = df.loc[location_mask, 'temp_avg_c'].rolling(window=7).mean()
-        df.loc[location_mask, 'rainfall_rolling7'] = df.loc[location_mask, 'rainfall_mm'].rolling(window=7).mean()
-        df.loc[location_mask, 'humidity_rolling7'] = df.loc[location_mask, 'humidity_pct'].rolling(window=7).mean()
+    by_location = df.groupby('location', sort=False)
+    sources = list(LAG_FEATURE_COLUMNS.values())
+    features = {}
+    for lag in FEATURE_LAGS:
+        shifted = by_location[sources].shift(lag)
+        for prefix, col in LAG_FEATURE_COLUMNS.items():
+            features[f'{prefix}_lag{lag}'] = shifted[col]
+    rolling = by_location[sources].rolling(window=ROLLING_WINDOW).mean().droplevel(0)
+    for prefix, col in LAG_FEATURE_COLUMNS.items():
+        features[f'{prefix}_rolling{ROLLING_WINDOW}'] = rolling[col]
+    
+    # Categorical locations give a column for every known location, even one missing from df
+    location_dummies = pd.get_dummies(pd.Categorical(df['location'], categories=location_names), prefix='loc')
+    location_dummies.index = df.index
+    
+    df = pd.concat([df, pd.DataFrame(features, index=df.index), location_dummies], axis=1)
+    return df[by_location.cumcount() >= FEATURE_WARMUP_ROWS].reset_index(drop=True)
+
+
+def clean_weather_data(data):
+    """
+    Clean and preprocess the weather data
     
-    # Convert location to one-hot encoding for model input
-    location_dummies = pd.get_dummies(df['location'], prefix='loc')
-    df = pd.concat([df, location_dummies], axis=1)
+    Interpolates each location's missing values, fills what is left from
+    neighbouring rows, then adds lag and rolling features per location and
+    one-hot location columns. See iter_clean_weather_data for data too
+    large to clean in one go.
+    """
+    # Reset the index so the grouped results line up with the rows even if the labels repeat
+    df = _interpolate_by_location(data.reset_index(drop=True))
     
-    # Drop the first 7 rows for each location which will have NaN values due to lag/rolling features
-    rows_to_drop = []
-    for location in df['location'].unique():
-        location_indices = df[df['location'] == location].index
-        rows_to_drop.extend(location_indices[:7])
+    # Fill any remaining missing values
+    df = df.ffill().bfill()
     
-    df = df.drop(rows_to_drop).reset_index(drop=True)
+    return _add_location_features(df, sorted(df['location'].unique()))
+
+
+def iter_clean_weather_data(chunks, locations=None):
+    """
+    Clean weather data one chunk at a time, for multi-year datasets
     
-    return df
+    Args:
+        chunks: DataFrames that each hold every row of their locations, e.g.
+            from iter_location_weather_data or read_weather_data_chunks
+        locations: Every location in the dataset, for the one-hot columns
+            (default: RWANDA_DISTRICTS)
+    
+    Yields:
+        The cleaned rows of each chunk. Together they equal
+        clean_weather_data of the whole dataset, except that the locations
+        come in chunk order rather than alphabetically. Values still missing
+        after forward filling are back filled from the same chunk only.
+    """
+    location_names = sorted(locations or RWANDA_DISTRICTS)
+    last_row = None
+    for chunk in chunks:
+        df = _interpolate_by_location(chunk.reset_index(drop=True)).ffill()
+        # Forward fill across the chunk boundary like a single pass would
+        if last_row is not None:
+            df = df.fillna(last_row)
+        df = df.bfill()
+        last_row = df.iloc[-1]
+        yield _add_location_features(df, location_names)
+
+
+def read_weather_data_chunks(path, chunksize=100_000):
+    """
+    Read a weather CSV whose rows are grouped by location (as written by
+    write_location_weather_data) in chunks of whole locations
+    
+    Yields DataFrames of roughly ``chunksize`` rows or more: a chunk is
+    extended until its last location is complete.
+    """
+    pending = None
+    for chunk in pd.read_csv(path, parse_dates=['date'], chunksize=chunksize):
+        if pending is not None:
+            chunk = pd.concat([pending, chunk], ignore_index=True)
+        # The last location may continue in the next chunk
+        last_location = chunk['location'].iloc[-1]
+        is_last = (chunk['location'] == last_location).to_numpy()
+        first_of_last = len(chunk) - np.argmin(is_last[::-1]) if not is_last.all() else 0
+        if first_of_last:
+            yield chunk.iloc[:first_of_last]
+        pending = chunk.iloc[first_of_last:]
+    if pending is not None and len(pending):
+        yield pending
 
 def plot_regional_weather_patterns(data):
     """
     Plot weather patterns across different regions
     """
     # Create directory for plots if it doesn't exist
-    if not os.path.exists('plots'):
-        os.makedirs('plots')
+    os.makedirs('plots', exist_ok=True)
     
     # Plot temperature comparison across regions
     plt.figure(figsize=(15, 8))
@@ -546,9 +659,69 @@ def plot_regional_weather_patterns(data):
     plt.grid(True, linestyle='--', alpha=0.7)
     plt.savefig('plots/temperature_vs_elevation.png')
 
-def prepare_location_time_series_data(data, target_col, lookback=7):
+class LocationSequences:
+    """
+    LSTM training sequences over the rows of several locations
+    
+    The scaled feature rows of every location are kept once, contiguously
+    and in float32, and each sequence is a ``sliding_window_view`` of them:
+    sequence i is the ``lookback`` rows before its target, all from the
+    same location. Memory is proportional to the number of rows rather than
+    rows x lookback until sequences are gathered with ``arrays`` or
+    ``batches``.
     """
-    Prepare sequences for LSTM model with location features
+    
+    def __init__(self, rows, targets, window_starts, lookback):
+        self.rows = rows
+        self.targets = targets
+        self.window_starts = window_starts
+        self.lookback = lookback
+        # (n_rows - lookback + 1, lookback, n_features) view, no copy
+        if len(rows) >= lookback:
+            self.windows = np.lib.stride_tricks.sliding_window_view(rows, (lookback, rows.shape[1]))[:, 0]
+        else:
+            self.windows = np.empty((0, lookback, rows.shape[1]), dtype=rows.dtype)
+    
+    def __len__(self):
+        return len(self.window_starts)
+    
+    @property
+    def shape(self):
+        """Shape of the full X array: (sequences, lookback, features)"""
+        return (len(self), self.lookback, self.rows.shape[1])
+    
+    def arrays(self, indices=None):
+        """X (sequences, lookback, features) and y for the given sequences (all by default)"""
+        starts = self.window_starts if indices is None else self.window_starts[indices]
+        return self.windows[starts], self.targets[starts + self.lookback]
+    
+    def split(self, test_size=0.2):
+        """Sequence indices of an unshuffled train/test split, as train_test_split(shuffle=False) makes"""
+        n_test = int(np.ceil(test_size * len(self)))
+        indices = np.arange(len(self))
+        return indices[:len(self) - n_test], indices[len(self) - n_test:]
+    
+    def batches(self, batch_size, indices=None, shuffle=False, seed=None, repeat=False):
+        """
+        Yield (X, y) batches, gathering only ``batch_size`` sequences at a time
+        
+        With ``repeat=True`` the generator starts over (reshuffling when
+        ``shuffle`` is set) after every pass, as Keras' ``fit`` expects from
+        a generator used for several epochs.
+        """
+        indices = np.arange(len(self)) if indices is None else np.asarray(indices)
+        rng = np.random.default_rng(seed)
+        while True:
+            order = rng.permutation(indices) if shuffle else indices
+            for i in range(0, len(order), batch_size):
+                yield self.arrays(order[i:i + batch_size])
+            if not repeat:
+                return
+
+
+def prepare_location_sequences(data, target_col, lookback=7):
+    """
+    Scale the features and index the LSTM sequences of every location
     
     Args:
         data: DataFrame containing time series data with location information
@@ -556,8 +729,7 @@ def prepare_location_time_series_data(data, target_col, lookback=7):
         lookback: Number of previous time steps to use as input variables
     
     Returns:
-        X: Input sequences
-        y: Target values
+        sequences: LocationSequences over the scaled rows
         scaler: Fitted scaler for features
         feature_cols: List of feature column names
         location_encoder: Dictionary mapping locations to their one-hot encoded columns
@@ -586,34 +758,46 @@ def prepare_location_time_series_data(data, target_col, lookback=7):
     
     # Scale the data (excluding one-hot encoded location columns)
     numerical_cols = [col for col in feature_cols if col not in location_columns]
-    scaler = MinMaxScaler()
+    scaler = preprocessing.MinMaxScaler()
     
-    # Create a DataFrame to hold scaled data
-    scaled_df = data.copy()
-    scaled_df[numerical_cols] = scaler.fit_transform(data[numerical_cols])
+    # Rows of each location contiguous, locations in order of appearance
+    codes, _ = pd.factorize(data['location'])
+    order = np.argsort(codes, kind='stable')
+    rows = np.empty((len(data), len(feature_cols)), dtype=np.float32)
+    rows[:, :len(numerical_cols)] = scaler.fit_transform(data[numerical_cols])[order]
+    rows[:, len(numerical_cols):] = data[location_columns].to_numpy(dtype=np.float32)[order]
+    targets = data[target_col].to_numpy(dtype=np.float32)[order]
     
-    # Initialize lists for X and y
-    X_list = []
-    y_list = []
+    # Handle any NaN values
+    np.nan_to_num(rows, copy=False)
+    np.nan_to_num(targets, copy=False)
     
-    # Group by location and create sequences
-    for location in data['location'].unique():
-        location_data = scaled_df[scaled_df['location'] == location]
-        location_features = location_data[feature_cols].values
-        location_target = data[data['location'] == location][target_col].values
-        
-        # Create sequences for this location
-        for i in range(lookback, len(location_features)):
-            X_list.append(location_features[i-lookback:i])
-            y_list.append(location_target[i])
+    # A location's row i is a target once it has `lookback` rows before it
+    counts = np.bincount(codes[order])
+    row_in_location = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+    window_starts = np.flatnonzero(row_in_location >= lookback) - lookback
     
-    # Convert lists to numpy arrays
-    X = np.array(X_list)
-    y = np.array(y_list)
+    return LocationSequences(rows, targets, window_starts, lookback), scaler, feature_cols, location_encoder
+
+
+def prepare_location_time_series_data(data, target_col, lookback=7):
+    """
+    Prepare sequences for LSTM model with location features
     
-    # Handle any NaN values
-    X = np.nan_to_num(X)
-    y = np.nan_to_num(y)
+    Args:
+        data: DataFrame containing time series data with location information
+        target_col: Target column to predict
+        lookback: Number of previous time steps to use as input variables
+    
+    Returns:
+        X: Input sequences (float32)
+        y: Target values (float32)
+        scaler: Fitted scaler for features
+        feature_cols: List of feature column names
+        location_encoder: Dictionary mapping locations to their one-hot encoded columns
+    """
+    sequences, scaler, feature_cols, location_encoder = prepare_location_sequences(data, target_col, lookback)
+    X, y = sequences.arrays()
     
     print("X shape:", X.shape)
     print("y shape:", y.shape)
@@ -623,89 +807,118 @@ def prepare_location_time_series_data(data, target_col, lookback=7):
     return X, y, scaler, feature_cols, location_encoder
 
 
-def train_location_lstm_models(cleaned_data, lookback=14, units=64, epochs=20, batch_size=32):
+# Short name of each location LSTM model -> the column it predicts
+LOCATION_LSTM_TARGETS = {'temp': 'temp_avg_c', 'rainfall': 'rainfall_mm', 'humidity': 'humidity_pct'}
+
+
+def location_model_files(target_short):
+    """Names of the artifacts saved for one location LSTM target"""
+    return [
+        f'location_lstm_{target_short}_model.h5',
+        f'location_lstm_{target_short}_model.npz',
+        f'location_scaler_{target_short}.pkl',
+        f'location_features_{target_short}.txt',
+        f'location_encoder_{target_short}.pkl',
+    ]
+
+
+def train_location_lstm_model(cleaned_data, target_short, models_dir='models', lookback=14, units=64, epochs=20,
+                              batch_size=32, stream_batches=False, plots_dir='plots', verbose=1):
     """
-    Prepare data and train LSTM models for multiple weather targets (temp, rainfall, humidity)
+    Prepare data, train and save the LSTM model for one weather target
     
     Args:
         cleaned_data: DataFrame with cleaned weather data
+        target_short: Key of LOCATION_LSTM_TARGETS ('temp', 'rainfall' or 'humidity')
+        models_dir: Directory to save the model, scaler, features and encoder to
         lookback: Number of previous time steps to use
         units: Number of LSTM units
         epochs: Number of training epochs
         batch_size: Batch size for training
+        stream_batches: Feed the model batches gathered from the sequence
+            windows on the fly instead of materializing every sequence, so
+            memory grows with the batch size rather than dataset x lookback
+        plots_dir: Directory for the training history plot (None to skip it)
+        verbose: Keras progress output (0 silent, 1 progress bar, 2 one line per epoch)
     
     Returns:
-        models: Dictionary containing trained models
-        scalers: Dictionary containing fitted scalers
-        features: Dictionary containing feature lists
-        location_encoders: Dictionary containing location encoders
+        dict with the model, scaler, feature_cols, location_encoder, the
+        test MSE and the number of train and test sequences
     """
-    models = {}
-    scalers = {}
-    features = {}
-    location_encoders = {}
-    
-    # Train models for each target
-    for target_col, target_short in zip(['temp_avg_c', 'rainfall_mm', 'humidity_pct'], 
-                                       ['temp', 'rainfall', 'humidity']):
-        print(f"\nPreparing data for {target_short} prediction...")
-        
-        # Prepare data for this target
-        X, y, scaler, feature_cols, location_encoder = prepare_location_time_series_data(
-            cleaned_data, target_col=target_col, lookback=lookback)
-        
-        print(f"\nTraining LSTM model for {target_short} prediction...")
-        
-        # Split into train and test sets
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, shuffle=False)
-        
-        # Convert to float32 for TensorFlow
-        X_train = X_train.astype(np.float32)
-        y_train = y_train.astype(np.float32)
-        X_test = X_test.astype(np.float32)
-        y_test = y_test.astype(np.float32)
-        
-        # Build the LSTM model
-        model = Sequential()
-        model.add(LSTM(units=units, return_sequences=True, input_shape=(X.shape[1], X.shape[2])))
-        model.add(Dropout(0.2))
-        model.add(LSTM(units=units))
-        model.add(Dropout(0.2))
-        model.add(Dense(1))
-        
-        model.compile(optimizer='adam', loss='mse')
-        
-        # Check for NaN values
-        print("X contains NaN:", np.isnan(X_train).any())
-        print("y contains NaN:", np.isnan(y_train).any())
-        
-        # Train the model
+    # TensorFlow is only needed for training; inference runs on the exported NumPy weights
+    Sequential = load_module('tensorflow.keras.models').Sequential
+    layers = load_module('tensorflow.keras.layers')
+    LSTM, Dense, Dropout = layers.LSTM, layers.Dense, layers.Dropout
+    target_col = LOCATION_LSTM_TARGETS[target_short]
+    
+    print(f"\nPreparing data for {target_short} prediction...")
+    
+    # Prepare data for this target (float32 throughout)
+    sequences, scaler, feature_cols, location_encoder = prepare_location_sequences(
+        cleaned_data, target_col=target_col, lookback=lookback)
+    print("X shape:", sequences.shape)
+    
+    print(f"\nTraining LSTM model for {target_short} prediction...")
+    
+    # Split into train and test sets
+    train_idx, test_idx = sequences.split(test_size=0.2)
+    
+    # Build the LSTM model
+    model = Sequential()
+    model.add(LSTM(units=units, return_sequences=True, input_shape=sequences.shape[1:]))
+    model.add(Dropout(0.2))
+    model.add(LSTM(units=units))
+    model.add(Dropout(0.2))
+    model.add(Dense(1))
+    
+    model.compile(optimizer='adam', loss='mse')
+    
+    # Check for NaN values
+    print("X contains NaN:", np.isnan(sequences.rows).any())
+    print("y contains NaN:", np.isnan(sequences.targets).any())
+    
+    # Train the model
+    if stream_batches:
+        # Shuffled every epoch, like fit does with arrays
+        train_steps = -(-len(train_idx) // batch_size)
+        test_steps = -(-len(test_idx) // batch_size)
+        history = model.fit(
+            sequences.batches(batch_size, train_idx, shuffle=True, repeat=True),
+            steps_per_epoch=train_steps,
+            epochs=epochs,
+            validation_data=sequences.batches(batch_size, test_idx, repeat=True),
+            validation_steps=test_steps,
+            verbose=verbose
+        )
+        loss = model.evaluate(sequences.batches(batch_size, test_idx), steps=test_steps, verbose=0)
+    else:
+        X_train, y_train = sequences.arrays(train_idx)
+        X_test, y_test = sequences.arrays(test_idx)
         history = model.fit(
             X_train, y_train,
             epochs=epochs,
             batch_size=batch_size,
             validation_data=(X_test, y_test),
-            verbose=1
+            verbose=verbose
         )
         
         # Evaluate the model
         loss = model.evaluate(X_test, y_test, verbose=0)
-        print(f'Test MSE for {target_short}: {loss}')
-        
-        # Save model and artifacts
-        model.save(f'models/location_lstm_{target_short}_model.h5')
-        joblib.dump(scaler, f'models/location_scaler_{target_short}.pkl')
-        with open(f'models/location_features_{target_short}.txt', 'w') as f:
-            f.write(','.join(feature_cols))
-        joblib.dump(location_encoder, f'models/location_encoder_{target_short}.pkl')
-        
-        # Store in dictionaries
-        models[target_short] = model
-        scalers[target_short] = scaler
-        features[target_short] = feature_cols
-        location_encoders[target_short] = location_encoder
-        
-        # Plot training history
+    print(f'Test MSE for {target_short}: {loss}')
+    
+    # Save model and artifacts
+    os.makedirs(models_dir, exist_ok=True)
+    h5_file, npz_file, scaler_file, features_file, encoder_file = location_model_files(target_short)
+    model.save(os.path.join(models_dir, h5_file))
+    export_keras_model(model, os.path.join(models_dir, npz_file))
+    joblib.dump(scaler, os.path.join(models_dir, scaler_file))
+    with open(os.path.join(models_dir, features_file), 'w') as f:
+        f.write(','.join(feature_cols))
+    joblib.dump(location_encoder, os.path.join(models_dir, encoder_file))
+    
+    # Plot training history
+    if plots_dir:
+        os.makedirs(plots_dir, exist_ok=True)
         plt.figure(figsize=(10, 6))
         plt.plot(history.history['loss'], label='Train Loss')
         plt.plot(history.history['val_loss'], label='Validation Loss')
@@ -714,101 +927,229 @@ def train_location_lstm_models(cleaned_data, lookback=14, units=64, epochs=20, b
         plt.ylabel('Loss (MSE)')
         plt.legend()
         plt.grid(True)
-        plt.savefig(f'plots/{target_short}_training_history.png')
+        plt.savefig(os.path.join(plots_dir, f'{target_short}_training_history.png'))
+        plt.close()
     
-    return models, scalers, features, location_encoders
+    return {
+        'model': model,
+        'scaler': scaler,
+        'feature_cols': feature_cols,
+        'location_encoder': location_encoder,
+        'test_mse': float(loss),
+        'train_sequences': len(train_idx),
+        'test_sequences': len(test_idx),
+    }
 
-def predict_weather_by_location(location, recent_data, target, model, scaler, features, 
-                             location_encoder, lookback=14, days_ahead=7):
+
+def train_location_lstm_models(cleaned_data, lookback=14, units=64, epochs=20, batch_size=32, stream_batches=False):
     """
-    Make weather predictions for a specific location
+    Prepare data and train LSTM models for multiple weather targets (temp, rainfall, humidity)
+    
+    Trains the targets one after another in this process and saves them to
+    the relative ``models/`` directory; the train_weather_models management
+    command trains them in parallel into a versioned directory instead.
+    
+    Args:
+        cleaned_data: DataFrame with cleaned weather data
+        lookback: Number of previous time steps to use
+        units: Number of LSTM units
+        epochs: Number of training epochs
+        batch_size: Batch size for training
+        stream_batches: Train from batches gathered on the fly (see train_location_lstm_model)
+    
+    Returns:
+        models: Dictionary containing trained models
+        scalers: Dictionary containing fitted scalers
+        features: Dictionary containing feature lists
+        location_encoders: Dictionary containing location encoders
     """
-    import pandas as pd
-    import numpy as np
-    from datetime import timedelta
+    models = {}
+    scalers = {}
+    features = {}
+    location_encoders = {}
     
-    # Filter data for the specified location
-    location_data = recent_data[recent_data['location'] == location].copy()
+    # Train models for each target
+    for target_short in LOCATION_LSTM_TARGETS:
+        result = train_location_lstm_model(cleaned_data, target_short, lookback=lookback, units=units,
+                                           epochs=epochs, batch_size=batch_size, stream_batches=stream_batches)
+        
+        # Store in dictionaries
+        models[target_short] = result['model']
+        scalers[target_short] = result['scaler']
+        features[target_short] = result['feature_cols']
+        location_encoders[target_short] = result['location_encoder']
     
-    if len(location_data) < lookback:
-        raise ValueError(f"Not enough historical data for location {location}. Need at least {lookback} days.")
+    return models, scalers, features, location_encoders
+
+def _scale_rows(scaler, values):
+    """Scale raw feature rows with a fitted MinMaxScaler without building a DataFrame."""
+    if hasattr(scaler, 'scale_') and hasattr(scaler, 'min_'):
+        scaled = values * scaler.scale_ + scaler.min_
+        if getattr(scaler, 'clip', False):
+            np.clip(scaled, scaler.feature_range[0], scaler.feature_range[1], out=scaled)
+        return scaled
+    return scaler.transform(values)
+
+
+def predict_weather_by_locations(locations, recent_data, target, model, scaler, features,
+                                 lookback=14, days_ahead=7):
+    """
+    Make iterative weather predictions for several locations at once
+    
+    The lookback windows of all locations live in one preallocated array of
+    shape (locations, lookback + days_ahead, features). Every new day is
+    scaled once when it is written, and each step feeds the current window
+    of every location to the model in a single call.
     
-    # Get the most recent data
-    recent_location_data = location_data.iloc[-lookback:].copy()
+    Args:
+        locations: Names of the locations to predict for
+        recent_data: Cleaned weather data with at least `lookback` days per location
+        target: Target column the model predicts (e.g. 'temp_avg_c')
+        model: Trained model taking (batch, lookback, features) inputs
+        scaler: Scaler fitted on the numerical (non 'loc_') features
+        features: Ordered list of model feature names
+        lookback: Number of previous days the model looks at
+        days_ahead: Number of days to forecast
     
-    # Prepare predictions list
-    predictions = []
-    current_data = recent_location_data.copy()
+    Returns:
+        numpy array of shape (len(locations), days_ahead) with the predictions
+    """
+    locations = list(locations)
+    n_locations = len(locations)
+    n_features = len(features)
     
     # Split features into numerical and one-hot
-    numerical_cols = [col for col in features if not col.startswith('loc_')]
+    numerical_idx = np.array([i for i, col in enumerate(features) if not col.startswith('loc_')])
+    
+    # Raw values of each location's most recent `lookback` days
+    raw_window = np.empty((n_locations, lookback, n_features), dtype=np.float64)
+    last_dates = []
+    grouped = recent_data.groupby('location', sort=False)
+    for i, location in enumerate(locations):
+        try:
+            location_data = grouped.get_group(location)
+        except KeyError:
+            location_data = recent_data.iloc[:0]
+        if len(location_data) < lookback:
+            raise ValueError(f"Not enough historical data for location {location}. Need at least {lookback} days.")
+        recent_location_data = location_data.iloc[-lookback:]
+        raw_window[i] = recent_location_data[features].to_numpy(dtype=np.float64)
+        last_dates.append(recent_location_data['date'].iloc[-1])
+    
+    # Preallocated window buffer; each row is scaled exactly once
+    window = np.zeros((n_locations, lookback + days_ahead, n_features), dtype=np.float32)
+    window[:, :lookback] = raw_window
+    window[:, :lookback, numerical_idx] = _scale_rows(
+        scaler, raw_window[:, :, numerical_idx].reshape(-1, len(numerical_idx))
+    ).reshape(n_locations, lookback, len(numerical_idx))
+    
+    column = {col: i for i, col in enumerate(features)}
+    lag_sources = [(lag, source) for lag, source in [('temp_avg_lag1', 'temp_avg_c'),
+                                                     ('rainfall_lag1', 'rainfall_mm'),
+                                                     ('humidity_lag1', 'humidity_pct')]
+                   if lag in column and source in column]
+    
+    last_day = raw_window[:, -1].copy()
+    dates = pd.DatetimeIndex(last_dates)
+    predictions = np.empty((n_locations, days_ahead), dtype=np.float64)
     
     for day in range(days_ahead):
-        # Scale the numerical features
-        current_data[numerical_cols] = scaler.transform(current_data[numerical_cols])
-        
-        # Get the input sequence and ensure it's float32
-        X_pred = current_data[features].values
-        X_pred = np.asarray(X_pred, dtype=np.float32)  # Convert to float32
-        X_pred = X_pred.reshape(1, lookback, len(features))
+        # Make prediction for every location from its current window
+        X_pred = window[:, day:day + lookback]
+        next_day_pred = np.asarray(model.predict_on_batch(X_pred)).reshape(n_locations)
+        predictions[:, day] = next_day_pred
         
-        # Make prediction
-        next_day_pred = model.predict(X_pred, verbose=0)[0][0]
-        predictions.append(next_day_pred)
+        if day == days_ahead - 1:
+            break
         
-        # Create next day's data for iterative prediction
-        last_day = current_data.iloc[-1].copy()
+        # Create next day's raw row from the last one
         next_day = last_day.copy()
-        
-        # Increment date
-        next_day['date'] = last_day['date'] + timedelta(days=1)
+        dates = dates + pd.Timedelta(days=1)
         
         # Update time-based features
-        next_day['month'] = next_day['date'].month
-        next_day['day'] = next_day['date'].day
-        next_day['day_of_year'] = next_day['date'].timetuple().tm_yday
-        next_day['year'] = next_day['date'].year
+        if 'month' in column:
+            next_day[:, column['month']] = dates.month
+        if 'day_of_year' in column:
+            next_day[:, column['day_of_year']] = dates.dayofyear
         
         # Update target with prediction
-        next_day[target] = next_day_pred
+        next_day[:, column[target]] = next_day_pred
         
         # Update lag features
-        next_day['temp_avg_lag1'] = last_day['temp_avg_c']
-        next_day['rainfall_lag1'] = last_day['rainfall_mm']
-        next_day['humidity_lag1'] = last_day['humidity_pct']
+        for lag, source in lag_sources:
+            next_day[:, column[lag]] = last_day[:, column[source]]
         
-        # Add the new row to current data and remove oldest
-        current_data = pd.concat([current_data.iloc[1:], pd.DataFrame([next_day])])
+        # Scale the new row into the window
+        row = window[:, lookback + day]
+        row[:] = next_day
+        row[:, numerical_idx] = _scale_rows(scaler, next_day[:, numerical_idx])
+        last_day = next_day
     
     return predictions
 
 
+def predict_weather_by_location(location, recent_data, target, model, scaler, features, 
+                             location_encoder, lookback=14, days_ahead=7):
+    """
+    Make weather predictions for a specific location
+    """
+    predictions = predict_weather_by_locations(
+        [location], recent_data, target, model, scaler, features,
+        lookback=lookback, days_ahead=days_ahead
+    )
+    return list(predictions[0])
+
+
+
+def load_location_model(models_dir, target_short):
+    """
+    Load a location LSTM model from its exported NumPy weights, falling back
+    to the Keras .h5 file (which needs TensorFlow) if it was never exported
+    """
+    npz_path = f'{models_dir}/location_lstm_{target_short}_model.npz'
+    if os.path.exists(npz_path):
+        return NumpyLSTMModel.load(npz_path)
+    
+    load_model = load_module('tensorflow.keras.models').load_model
+    MeanSquaredError = load_module('tensorflow.keras.losses').MeanSquaredError
+    logger.warning("%s not found, loading the Keras model (run export_lstm_weights)", npz_path)
+    return load_model(
+        f'{models_dir}/location_lstm_{target_short}_model.h5',
+        custom_objects={'mse': MeanSquaredError()}
+    )
+
 
 def load_models_and_predict(location, recent_data_file, models_dir='models', days_to_predict=7):
     """
-    Load saved models and make predictions for a specific location
+    Load saved models and make predictions for one or more locations
     
     Args:
-        location: Name of the location to predict for
+        location: Name of the location to predict for, a list of names, or
+            None for every location in the recent data
         recent_data_file: CSV file with recent weather data
         models_dir: Directory containing saved models
         days_to_predict: Number of days to forecast
     
     Returns:
-        DataFrame with predictions
+        DataFrame with predictions (one block of rows per location)
     """
     # Read recent data
     recent_data = pd.read_csv(recent_data_file, parse_dates=['date'])
+    recent_data = recent_data.sort_values(['location', 'date'], kind='stable')
+    
+    if location is None:
+        locations = list(recent_data['location'].unique())
+    elif isinstance(location, str):
+        locations = [location]
+    else:
+        locations = list(location)
     
     predictions = {}
     
     for target_short, target_full in zip(['temp', 'rainfall', 'humidity'], 
                                         ['temp_avg_c', 'rainfall_mm', 'humidity_pct']):
         # Load model
-        model = load_model(
-            f'{models_dir}/location_lstm_{target_short}_model.h5',
-            custom_objects={'mse': MeanSquaredError()}
-        )
+        model = load_location_model(models_dir, target_short)
         
         # Load scaler
         scaler = joblib.load(f'{models_dir}/location_scaler_{target_short}.pkl')
@@ -817,28 +1158,40 @@ def load_models_and_predict(location, recent_data_file, models_dir='models', day
         with open(f'{models_dir}/location_features_{target_short}.txt', 'r') as f:
             features = f.read().split(',')
         
-        # Load location encoder
-        location_encoder = joblib.load(f'{models_dir}/location_encoder_{target_short}.pkl')
-        
-        # Make predictions
-        target_preds = predict_weather_by_location(
-            location, recent_data, target_full,
-            model, scaler, features, location_encoder,
+        # Make predictions for all locations in one batched rollout
+        predictions[target_short] = predict_weather_by_locations(
+            locations, recent_data, target_full,
+            model, scaler, features,
             lookback=14, days_ahead=days_to_predict
         )
-        
-        predictions[f'{target_short}_pred'] = target_preds
     
     # Create prediction DataFrame
-    pred_df = pd.DataFrame({
-        'date': [recent_data['date'].max() + timedelta(days=i+1) for i in range(days_to_predict)],
-        'location': location,
-        'temp_avg_c_pred': predictions['temp_pred'],
-        'rainfall_mm_pred': predictions['rainfall_pred'],
-        'humidity_pct_pred': predictions['humidity_pred']
-    })
+    start_dates = recent_data.groupby('location')['date'].max()
+    frames = []
+    for i, loc in enumerate(locations):
+        frames.append(pd.DataFrame({
+            'date': [start_dates[loc] + timedelta(days=d+1) for d in range(days_to_predict)],
+            'location': loc,
+            'temp_avg_c_pred': predictions['temp'][i],
+            'rainfall_mm_pred': predictions['rainfall'][i],
+            'humidity_pct_pred': predictions['humidity'][i]
+        }))
+    
+    return pd.concat(frames, ignore_index=True)
+
+def get_forecast(location, seed=None, start_date=None):
+    """
+    Generate the structured yearly forecast summary for a location
     
-    return pred_df
+    Args:
+        location (str): Name of the district in Rwanda
+        seed: Seed for the random generator
+        start_date: First forecast day (defaults to now)
+        
+    Returns:
+        WeatherForecastSummary: Seasonal and monthly forecast values
+    """
+    return summarize_forecast(forecast_weather_yearly(location, seed=seed, start_date=start_date))
 
 def get_forecast_summary(location):
     """
@@ -851,85 +1204,155 @@ def get_forecast_summary(location):
         str: Forecast summary
     """
     try:
-        # Generate yearly forecast for the location
-        forecast_df = forecast_weather_yearly(location)
-        
-        # Use the existing seasonal summary function
-        summary = get_seasonal_forecast_summary(forecast_df)
-        
-        return summary
+        return get_forecast(location).to_text()
     except Exception as e:
         return f"Error generating forecast summary: {str(e)}"
 
+# Bump when the forecast simulation changes (part of the forecast cache key)
+FORECAST_MODEL_VERSION = 'sim-1'
+
+# Lookup tables for the vectorized forecast (index = month number)
+MONTH_NAMES = np.array(['', 'January', 'February', 'March', 'April', 'May', 'June',
+                        'July', 'August', 'September', 'October', 'November', 'December'], dtype=object)
+SEASON_BY_MONTH = np.array([''] + ['Minor Dry Season'] * 2 + ['Major Rainy Season'] * 3 +
+                           ['Major Dry Season'] * 3 + ['Minor Rainy Season'] * 4, dtype=object)
+
+DEFAULT_DISTRICT_ATTRIBUTES = {
+    'temp_offset': 0,
+    'rainfall_factor': 1.0,
+    'humidity_offset': 0,
+    'elevation': 1500
+}
+
+
+def _forecast_noise(rng, shape, gamma_shape, gamma_scale):
+    """Temperature, rainfall and humidity draws of one generator, in the order every forecast makes them"""
+    return (rng.normal(0, 1, shape),
+            rng.gamma(gamma_shape, gamma_scale, shape),
+            rng.normal(0, 3, shape))
+
+
+def forecast_weather_arrays(locations, days_to_predict=365, seed=None, start_date=None, seeds=None):
+    """
+    Simulate daily forecasts for several locations at once
+    
+    Args:
+        locations: List of district names (unknown names use default attributes)
+        days_to_predict: Number of days to forecast
+        seed: Seed for the random generator (None for a fresh, unseeded draw)
+        start_date: First forecast day (defaults to now)
+        seeds: One seed per location instead of seed; each location's row is
+            then drawn from its own generator and equals the single-location
+            forecast with that seed
+        
+    Returns:
+        dict: 'dates' and the calendar columns as 1-D arrays of length
+        days_to_predict; 'temperature_c', 'rainfall_mm' and 'humidity_pct'
+        as 2-D arrays of shape (len(locations), days_to_predict)
+    """
+    n_locations = len(locations)
+    if seeds is not None and len(seeds) != n_locations:
+        raise ValueError(f"Expected {n_locations} seeds, got {len(seeds)}")
+    
+    dates = pd.date_range(start_date or datetime.now(), periods=days_to_predict, freq='D')
+    month = dates.month.to_numpy(dtype=np.int64)
+    day_of_year = dates.dayofyear.to_numpy(dtype=np.int64)
+    
+    # Per-location attributes as column vectors so they broadcast over days
+    attrs = [RWANDA_DISTRICTS.get(location, DEFAULT_DISTRICT_ATTRIBUTES) for location in locations]
+    temp_offset = np.array([a.get('temp_offset', 0) for a in attrs], dtype=float)[:, None]
+    rainfall_factor = np.array([a.get('rainfall_factor', 1.0) for a in attrs], dtype=float)[:, None]
+    humidity_offset = np.array([a.get('humidity_offset', 0) for a in attrs], dtype=float)[:, None]
+    
+    # Rainfall patterns - two rainy seasons in Rwanda
+    # Major rainy season: March-May, minor rainy season: September-December
+    major_rainy = (month >= 3) & (month <= 5)
+    minor_rainy = month >= 9
+    is_rainy_season = major_rainy | minor_rainy
+    gamma_shape = np.where(major_rainy, 5, np.where(minor_rainy, 3, 1))
+    gamma_scale = np.where(major_rainy, 3, np.where(minor_rainy, 2, 1))
+    
+    if seeds is None:
+        temp_noise, rainfall_draw, humidity_noise = _forecast_noise(
+            np.random.default_rng(seed), (n_locations, days_to_predict), gamma_shape, gamma_scale)
+    else:
+        # Only the draws are made one location at a time; everything else stays vectorized
+        noise = np.empty((3, n_locations, days_to_predict))
+        for row, location_seed in enumerate(seeds):
+            noise[:, row] = _forecast_noise(np.random.default_rng(location_seed), days_to_predict,
+                                            gamma_shape, gamma_scale)
+        temp_noise, rainfall_draw, humidity_noise = noise
+    
+    # Seasonal temperature variations
+    seasonal_temp_effect = -3 * np.sin(2 * np.pi * (day_of_year - 15) / 365)
+    temperature = 22 + temp_offset + seasonal_temp_effect + temp_noise
+    
+    rainfall = np.maximum(0, rainfall_draw * rainfall_factor)
+    
+    # Humidity
+    humidity_seasonal = np.where(is_rainy_season, 5, -5)
+    humidity = np.clip(70 + humidity_offset + humidity_seasonal + humidity_noise, 40, 100)
+    
+    return {
+        'dates': dates,
+        'month': month,
+        'day': dates.day.to_numpy(dtype=np.int64),
+        'year': dates.year.to_numpy(dtype=np.int64),
+        'day_of_year': day_of_year,
+        'temperature_c': np.round(temperature, 1),
+        'rainfall_mm': np.round(rainfall, 1),
+        'humidity_pct': np.round(humidity, 1),
+    }
+
+
+def _forecast_frame(arrays, locations):
+    """Build the long-format forecast DataFrame (one row per location and day)"""
+    n_locations = len(locations)
+    month = np.tile(arrays['month'], n_locations)
+    
+    return pd.DataFrame({
+        'date': np.tile(arrays['dates'].to_numpy(), n_locations),
+        'location': np.repeat(np.asarray(locations, dtype=object), len(arrays['dates'])),
+        'temperature_c': arrays['temperature_c'].ravel(),
+        'rainfall_mm': arrays['rainfall_mm'].ravel(),
+        'humidity_pct': arrays['humidity_pct'].ravel(),
+        'month': month,
+        'month_name': MONTH_NAMES[month],
+        'day': np.tile(arrays['day'], n_locations),
+        'year': np.tile(arrays['year'], n_locations),
+        'day_of_year': np.tile(arrays['day_of_year'], n_locations),
+        'season': SEASON_BY_MONTH[month]
+    })
+
+
 def forecast_weather_yearly(location, recent_data_file='data/rwanda_locations_weather_cleaned.csv', 
-                           models_dir='models', days_to_predict=365):
+                           models_dir='models', days_to_predict=365, seed=None, start_date=None):
     """
     Simulate forecast data for a specific location in Rwanda for testing
     This is a simplified version for demonstration since we don't have the actual models
     """
-    # Create date range for the next year
-    start_date = datetime.now()
-    dates = [start_date + timedelta(days=i) for i in range(days_to_predict)]
-    
-    # Get district attributes if available, otherwise use defaults
-    district_attrs = RWANDA_DISTRICTS.get(location, {
-        'temp_offset': 0,
-        'rainfall_factor': 1.0,
-        'humidity_offset': 0,
-        'elevation': 1500
-    })
-    
-    # Base values adjusted for location
-    temp_offset = district_attrs.get('temp_offset', 0)
-    rainfall_factor = district_attrs.get('rainfall_factor', 1.0)
-    humidity_offset = district_attrs.get('humidity_offset', 0)
+    arrays = forecast_weather_arrays([location], days_to_predict, seed=seed, start_date=start_date)
+    return _forecast_frame(arrays, [location])
+
+
+def forecast_weather_batch(locations=None, days_to_predict=365, seed=None, start_date=None, seeds=None):
+    """
+    Simulate forecasts for many districts in one vectorized call
     
-    # Create simulated forecast data
-    data = []
-    for date in dates:
-        month = date.month
-        day_of_year = date.timetuple().tm_yday
-        
-        # Seasonal temperature variations
-        seasonal_temp_effect = -3 * np.sin(2 * np.pi * (day_of_year - 15) / 365)
-        
-        # Calculate temperature
-        base_temp = 22 + temp_offset
-        day_temp = base_temp + seasonal_temp_effect + np.random.normal(0, 1)
-        
-        # Rainfall patterns - two rainy seasons in Rwanda
-        # Major rainy season: March-May
-        # Minor rainy season: September-December
-        is_rainy_season = (month >= 3 and month <= 5) or (month >= 9 and month <= 12)
-        
-        if is_rainy_season:
-            if month >= 3 and month <= 5:  # Major rainy season
-                day_rainfall = max(0, np.random.gamma(5, 3) * rainfall_factor)
-            else:  # Minor rainy season (Sep-Dec)
-                day_rainfall = max(0, np.random.gamma(3, 2) * rainfall_factor)
-        else:  # Dry season
-            day_rainfall = max(0, np.random.gamma(1, 1) * rainfall_factor)
-        
-        # Calculate humidity
-        base_humidity = 70 + humidity_offset
-        humidity_seasonal = 5 if is_rainy_season else -5
-        day_humidity = min(100, max(40, base_humidity + humidity_seasonal + np.random.normal(0, 3)))
+    Args:
+        locations: District names (defaults to all RWANDA_DISTRICTS)
+        days_to_predict: Number of days to forecast
+        seed: Seed for the random generator
+        start_date: First forecast day (defaults to now)
+        seeds: One seed per location instead of seed (see forecast_weather_arrays)
         
-        data.append({
-            'date': date,
-            'location': location,
-            'temperature_c': round(day_temp, 1),
-            'rainfall_mm': round(day_rainfall, 1),
-            'humidity_pct': round(day_humidity, 1),
-            'month': month,
-            'month_name': date.strftime('%B'),
-            'day': date.day,
-            'year': date.year,
-            'day_of_year': day_of_year,
-            'season': get_season(month)
-        })
-    
-    return pd.DataFrame(data)
+    Returns:
+        DataFrame with the same columns as forecast_weather_yearly, one
+        block of rows per location
+    """
+    locations = list(RWANDA_DISTRICTS.keys()) if locations is None else list(locations)
+    arrays = forecast_weather_arrays(locations, days_to_predict, seed=seed, start_date=start_date, seeds=seeds)
+    return _forecast_frame(arrays, locations)
 
 def get_season(month):
     """Define Rwanda's seasons"""
@@ -942,15 +1365,170 @@ def get_season(month):
     else:  # 1, 2
         return 'Minor Dry Season'
 
-def get_seasonal_forecast_summary(forecast_df):
+# Seasons in display order, with the keys used by the API and the WeatherData model
+SEASON_KEYS = {
+    'Minor Dry Season': 'minor_dry',
+    'Major Rainy Season': 'major_rainy',
+    'Major Dry Season': 'major_dry',
+    'Minor Rainy Season': 'minor_rainy'
+}
+
+# Alternative season names accepted from clients
+SEASON_ALIASES = {
+    'short_dry': 'Minor Dry Season',
+    'long_rainy': 'Major Rainy Season',
+    'long_dry': 'Major Dry Season',
+    'short_rainy': 'Minor Rainy Season'
+}
+
+
+def describe_rainfall(rain_total):
+    """Characterize a seasonal rainfall total"""
+    if rain_total < 50:
+        return "Very dry"
+    elif rain_total < 200:
+        return "Relatively dry"
+    elif rain_total < 400:
+        return "Moderate rainfall"
+    elif rain_total < 600:
+        return "Wet"
+    return "Very wet"
+
+
+@dataclass(frozen=True)
+class SeasonForecast:
+    """Forecast statistics for one season (values rounded to 1 decimal)"""
+    season: str
+    avg_temperature: float
+    min_temperature: float
+    max_temperature: float
+    total_rainfall: float
+    avg_rainfall_per_day: float
+    max_rainfall_per_day: float
+    humidity: float
+    
+    @property
+    def rainfall_description(self):
+        return describe_rainfall(self.total_rainfall)
+    
+    def as_dict(self):
+        return {
+            'avg_temperature': self.avg_temperature,
+            'min_temperature': self.min_temperature,
+            'max_temperature': self.max_temperature,
+            'total_rainfall': self.total_rainfall,
+            'avg_rainfall_per_day': self.avg_rainfall_per_day,
+            'max_rainfall_per_day': self.max_rainfall_per_day,
+            'humidity': self.humidity
+        }
+
+
+@dataclass(frozen=True)
+class MonthForecast:
+    """Forecast averages for one calendar month (values rounded to 1 decimal)"""
+    month: int
+    month_name: str
+    temperature: float
+    rainfall: float
+    humidity: float
+    
+    def as_dict(self):
+        return {
+            'temperature': self.temperature,
+            'rainfall': self.rainfall,
+            'humidity': self.humidity
+        }
+
+
+@dataclass(frozen=True)
+class WeatherForecastSummary:
+    """Seasonal and monthly summary of a yearly forecast for one location"""
+    location: str
+    seasons: tuple
+    months: tuple
+    
+    def season(self, season_name):
+        """
+        Look up a season by display name ('Major Rainy Season'), API key
+        ('major_rainy') or alias ('long_rainy'). Returns None if unknown.
+        """
+        display_name = SEASON_ALIASES.get(season_name, season_name)
+        for season in self.seasons:
+            if season.season == display_name or SEASON_KEYS[season.season] == season_name:
+                return season
+        return None
+    
+    def seasonal_data(self, season_name):
+        """Statistics for one season as a dict (empty if the season is unknown)"""
+        season = self.season(season_name)
+        return season.as_dict() if season else {}
+    
+    def monthly_data(self, month_names=None):
+        """Monthly averages keyed by month name, optionally limited to some months"""
+        return {
+            month.month_name: month.as_dict()
+            for month in self.months
+            if month_names is None or month.month_name in month_names
+        }
+    
+    def to_dict(self):
+        return {
+            'location': self.location,
+            'seasonal_data': {
+                SEASON_KEYS[season.season]: {
+                    'temperature': season.avg_temperature,
+                    'min_temperature': season.min_temperature,
+                    'max_temperature': season.max_temperature,
+                    'rainfall': season.total_rainfall,
+                    'avg_rainfall_per_day': season.avg_rainfall_per_day,
+                    'max_rainfall_per_day': season.max_rainfall_per_day,
+                    'humidity': season.humidity,
+                    'description': season.rainfall_description
+                }
+                for season in self.seasons
+            },
+            'monthly_data': self.monthly_data()
+        }
+    
+    def to_text(self):
+        """Render the summary as the plain-text annual forecast report"""
+        # Create summary text
+        summary = f"Annual Weather Forecast for {self.location}, Rwanda\n"
+        summary += "=" * 50 + "\n\n"
+        
+        # Seasonal summary
+        summary += "SEASONAL FORECAST SUMMARY\n"
+        summary += "-" * 30 + "\n\n"
+        
+        for season in self.seasons:
+            summary += f"{season.season}:\n"
+            summary += f"  Temperature: {season.avg_temperature}°C (Range: {season.min_temperature}°C to {season.max_temperature}°C)\n"
+            summary += (f"  Rainfall: {season.rainfall_description} - Total: {season.total_rainfall}mm, "
+                        f"Avg: {season.avg_rainfall_per_day}mm/day, Max: {season.max_rainfall_per_day}mm/day\n")
+            summary += f"  Humidity: {season.humidity}%\n\n"
+        
+        # Monthly breakdown
+        summary += "MONTHLY FORECAST BREAKDOWN\n"
+        summary += "-" * 30 + "\n\n"
+        
+        for month in self.months:
+            summary += f"{month.month_name}:\n"
+            summary += f"  Avg. Temperature: {month.temperature}°C\n"
+            summary += f"  Total Rainfall: {month.rainfall}mm\n"
+            summary += f"  Avg. Humidity: {month.humidity}%\n\n"
+        
+        return summary
+
+
+def summarize_forecast(forecast_df):
     """
-    Generate a seasonal summary from forecast data
+    Summarize forecast data by season and month
     
     Args:
         forecast_df: DataFrame with yearly forecast data
         
     Returns:
-        str: Seasonal forecast summary
+        WeatherForecastSummary: Seasonal and monthly forecast values
     """
     location = forecast_df['location'].iloc[0]
     
@@ -968,146 +1546,126 @@ def get_seasonal_forecast_summary(forecast_df):
         'humidity_pct': 'mean'
     }).round(1)
     
-    # Create summary text
-    summary = f"Annual Weather Forecast for {location}, Rwanda\n"
-    summary += "=" * 50 + "\n\n"
+    seasons = tuple(
+        SeasonForecast(
+            season=season,
+            avg_temperature=float(seasonal_summary.loc[season, ('temperature_c', 'mean')]),
+            min_temperature=float(seasonal_summary.loc[season, ('temperature_c', 'min')]),
+            max_temperature=float(seasonal_summary.loc[season, ('temperature_c', 'max')]),
+            total_rainfall=float(seasonal_summary.loc[season, ('rainfall_mm', 'sum')]),
+            avg_rainfall_per_day=float(seasonal_summary.loc[season, ('rainfall_mm', 'mean')]),
+            max_rainfall_per_day=float(seasonal_summary.loc[season, ('rainfall_mm', 'max')]),
+            humidity=float(seasonal_summary.loc[season, ('humidity_pct', 'mean')])
+        )
+        for season in SEASON_KEYS
+        if season in seasonal_summary.index
+    )
     
-    # Seasonal summary
-    summary += "SEASONAL FORECAST SUMMARY\n"
-    summary += "-" * 30 + "\n\n"
+    # Sorted by month number for chronological display
+    months = tuple(
+        MonthForecast(
+            month=int(month_num),
+            month_name=month_name,
+            temperature=float(row['temperature_c']),
+            rainfall=float(row['rainfall_mm']),
+            humidity=float(row['humidity_pct'])
+        )
+        for (month_num, month_name), row in monthly_summary.sort_index().iterrows()
+    )
     
-    for season in ['Minor Dry Season', 'Major Rainy Season', 'Major Dry Season', 'Minor Rainy Season']:
-        if season in seasonal_summary.index:
-            summary += f"{season}:\n"
-            
-            # Temperature
-            temp_mean = seasonal_summary.loc[season, ('temperature_c', 'mean')]
-            temp_min = seasonal_summary.loc[season, ('temperature_c', 'min')]
-            temp_max = seasonal_summary.loc[season, ('temperature_c', 'max')]
-            summary += f"  Temperature: {temp_mean}°C (Range: {temp_min}°C to {temp_max}°C)\n"
-            
-            # Rainfall
-            rain_total = seasonal_summary.loc[season, ('rainfall_mm', 'sum')]
-            rain_mean = seasonal_summary.loc[season, ('rainfall_mm', 'mean')]
-            rain_max = seasonal_summary.loc[season, ('rainfall_mm', 'max')]
-            
-            # Characterize the rainfall
-            if rain_total < 50:
-                rain_desc = "Very dry"
-            elif rain_total < 200:
-                rain_desc = "Relatively dry"
-            elif rain_total < 400:
-                rain_desc = "Moderate rainfall"
-            elif rain_total < 600:
-                rain_desc = "Wet"
-            else:
-                rain_desc = "Very wet"
-                
-            summary += f"  Rainfall: {rain_desc} - Total: {rain_total}mm, Avg: {rain_mean}mm/day, Max: {rain_max}mm/day\n"
-            
-            # Humidity
-            humidity_mean = seasonal_summary.loc[season, ('humidity_pct', 'mean')]
-            summary += f"  Humidity: {humidity_mean}%\n\n"
-    
-    # Monthly breakdown
-    summary += "MONTHLY FORECAST BREAKDOWN\n"
-    summary += "-" * 30 + "\n\n"
-    
-    # Sort by month number for chronological display
-    for month_num, month_group in sorted(monthly_summary.groupby(level=0)):
-        month_name = month_group.index[0][1]
-        temp = month_group['temperature_c'].values[0]
-        rainfall = month_group['rainfall_mm'].values[0]
-        humidity = month_group['humidity_pct'].values[0]
-        
-        summary += f"{month_name}:\n"
-        summary += f"  Avg. Temperature: {temp}°C\n"
-        summary += f"  Total Rainfall: {rainfall}mm\n"
-        summary += f"  Avg. Humidity: {humidity}%\n\n"
+    return WeatherForecastSummary(location=location, seasons=seasons, months=months)
+
+
+def get_seasonal_forecast_summary(forecast_df):
+    """
+    Generate a seasonal summary from forecast data
     
-    return summary
+    Args:
+        forecast_df: DataFrame with yearly forecast data
+        
+    Returns:
+        str: Seasonal forecast summary
+    """
+    return summarize_forecast(forecast_df).to_text()
+
+# Period of the district comparison tables -> the columns their rows are grouped by
+DISTRICT_COMPARISON_PERIODS = {
+    'monthly': ['location', 'month', 'month_name'],
+    'seasonal': ['location', 'season'],
+    'yearly': ['location'],
+}
 
-def generate_district_comparison_report():
+
+def summarize_district_forecasts(combined_forecast):
     """
-    Generate a comparison report of all districts across different time periods
+    Monthly, seasonal and yearly temperature, rainfall and humidity of every
+    district in a forecast_weather_batch frame (rainfall summed, the others
+    averaged, rounded to 1 decimal)
     """
-    # Dictionary to store forecasts for all districts
-    all_districts_forecasts = {}
-    
-    # Generate forecasts for all districts
-    for district in RWANDA_DISTRICTS.keys():
-        print(f"Generating forecast for {district}...")
-        all_districts_forecasts[district] = forecast_weather_yearly(district)
-    
-    # Combine all forecasts into a single DataFrame
-    combined_forecast = pd.concat(all_districts_forecasts.values())
-    
-    # Monthly averages across all districts
-    monthly_district_avg = combined_forecast.groupby(['location', 'month', 'month_name']).agg({
+    aggregations = {
         'temperature_c': 'mean',
         'rainfall_mm': 'sum',
         'humidity_pct': 'mean'
-    }).round(1).reset_index()
-    
-    # Seasonal averages across all districts
-    seasonal_district_avg = combined_forecast.groupby(['location', 'season']).agg({
-        'temperature_c': 'mean',
-        'rainfall_mm': 'sum',
-        'humidity_pct': 'mean'
-    }).round(1).reset_index()
-    
-    # Yearly averages across all districts
-    yearly_district_avg = combined_forecast.groupby(['location']).agg({
-        'temperature_c': 'mean',
-        'rainfall_mm': 'sum',
-        'humidity_pct': 'mean'
-    }).round(1).reset_index()
-    
-    # Generate CSV files
-    monthly_district_avg.to_csv('reports/monthly_district_weather_avg.csv', index=False)
-    seasonal_district_avg.to_csv('reports/seasonal_district_weather_avg.csv', index=False)
-    yearly_district_avg.to_csv('reports/yearly_district_weather_avg.csv', index=False)
-    
+    }
     return {
-        'monthly': monthly_district_avg,
-        'seasonal': seasonal_district_avg,
-        'yearly': yearly_district_avg
+        period: combined_forecast.groupby(keys).agg(aggregations).round(1).reset_index()
+        for period, keys in DISTRICT_COMPARISON_PERIODS.items()
     }
 
-def create_comparison_visualizations(district_data):
+
+def generate_district_comparison_report(forecast_date=None):
     """
-    Create visualizations comparing weather patterns across districts
+    Generate a comparison report of all districts across different time periods,
+    from the same seeded forecasts as the district comparison endpoint
+    (forecast_date defaults to today)
     """
-    yearly_data = district_data['yearly']
-    seasonal_data = district_data['seasonal']
-    monthly_data = district_data['monthly']
+    from django.utils import timezone
+    from .district_comparison import district_forecasts
     
-    # 1. Temperature comparison across districts (yearly average)
+    # Generate forecasts for all districts in one call
+    print(f"Generating forecasts for {len(RWANDA_DISTRICTS)} districts...")
+    district_data = summarize_district_forecasts(district_forecasts(forecast_date or timezone.localdate()))
+    
+    # Generate CSV files
+    os.makedirs('reports', exist_ok=True)
+    district_data['monthly'].to_csv('reports/monthly_district_weather_avg.csv', index=False)
+    district_data['seasonal'].to_csv('reports/seasonal_district_weather_avg.csv', index=False)
+    district_data['yearly'].to_csv('reports/yearly_district_weather_avg.csv', index=False)
+    
+    return district_data
+
+def _plot_district_temperature(district_data):
+    """Average annual temperature of every district"""
     plt.figure(figsize=(14, 10))
-    yearly_sorted = yearly_data.sort_values(by='temperature_c', ascending=False)
+    yearly_sorted = district_data['yearly'].sort_values(by='temperature_c', ascending=False)
     sns.barplot(x='location', y='temperature_c', data=yearly_sorted)
     plt.title('Average Annual Temperature by District')
     plt.xlabel('District')
     plt.ylabel('Temperature (°C)')
     plt.xticks(rotation=90)
     plt.tight_layout()
-    plt.savefig('plots/district_temperature_comparison.png')
-    
-    # 2. Total annual rainfall comparison
+
+
+def _plot_district_rainfall(district_data):
+    """Total annual rainfall of every district"""
     plt.figure(figsize=(14, 10))
-    yearly_sorted = yearly_data.sort_values(by='rainfall_mm', ascending=False)
+    yearly_sorted = district_data['yearly'].sort_values(by='rainfall_mm', ascending=False)
     sns.barplot(x='location', y='rainfall_mm', data=yearly_sorted)
     plt.title('Total Annual Rainfall by District')
     plt.xlabel('District')
     plt.ylabel('Rainfall (mm)')
     plt.xticks(rotation=90)
     plt.tight_layout()
-    plt.savefig('plots/district_rainfall_comparison.png')
-    
-    # 3. Seasonal temperature patterns across provinces
-    # First, add province information
-    province_map = {district: data['province'] for district, data in RWANDA_DISTRICTS.items()}
-    seasonal_data['province'] = seasonal_data['location'].map(province_map)
+
+
+def _province_map():
+    return {district: data['province'] for district, data in RWANDA_DISTRICTS.items()}
+
+
+def _plot_seasonal_temperature_by_province(district_data):
+    """Seasonal temperature patterns across provinces"""
+    seasonal_data = district_data['seasonal'].assign(
+        province=district_data['seasonal']['location'].map(_province_map()))
     
     plt.figure(figsize=(14, 10))
     season_order = ['Minor Dry Season', 'Major Rainy Season', 'Major Dry Season', 'Minor Rainy Season']
@@ -1117,14 +1675,14 @@ def create_comparison_visualizations(district_data):
     plt.ylabel('Average Temperature (°C)')
     plt.legend(title='Province')
     plt.tight_layout()
-    plt.savefig('plots/seasonal_temperature_by_province.png')
-    
-    # 4. Monthly rainfall patterns across provinces
-    monthly_data['province'] = monthly_data['location'].map(province_map)
+
+
+def _plot_monthly_rainfall_by_province(district_data):
+    """Monthly rainfall patterns across provinces"""
+    monthly_data = district_data['monthly'].assign(
+        province=district_data['monthly']['location'].map(_province_map()))
     
     plt.figure(figsize=(16, 10))
-    month_order = ['January', 'February', 'March', 'April', 'May', 'June', 
-                  'July', 'August', 'September', 'October', 'November', 'December']
     sns.lineplot(x='month_name', y='rainfall_mm', hue='province', data=monthly_data, 
            style='province', markers=True, errorbar=None)
     plt.title('Monthly Rainfall Patterns by Province')
@@ -1133,14 +1691,39 @@ def create_comparison_visualizations(district_data):
     plt.xticks(rotation=45)
     plt.legend(title='Province')
     plt.tight_layout()
-    plt.savefig('plots/monthly_rainfall_by_province.png')
+
+
+# Chart type -> (plot function, file name) of the district comparison charts
+COMPARISON_CHARTS = {
+    'temperature': (_plot_district_temperature, 'district_temperature_comparison'),
+    'rainfall': (_plot_district_rainfall, 'district_rainfall_comparison'),
+    'seasonal': (_plot_seasonal_temperature_by_province, 'seasonal_temperature_by_province'),
+    'monthly': (_plot_monthly_rainfall_by_province, 'monthly_rainfall_by_province'),
+}
+
+
+def render_comparison_chart(district_data, chart_type, output, fmt=None):
+    """
+    Draw one district comparison chart (see COMPARISON_CHARTS) and save it
+    to a path or file object, as PNG unless fmt (e.g. 'svg') says otherwise
+    """
+    plot, _ = COMPARISON_CHARTS[chart_type]
+    plot(district_data)
+    plt.savefig(output, format=fmt)
+    plt.close()
+
+
+def create_comparison_visualizations(district_data):
+    """
+    Create visualizations comparing weather patterns across districts
+    """
+    os.makedirs('plots', exist_ok=True)
     
-    return {
-        'temperature': 'plots/district_temperature_comparison.png',
-        'rainfall': 'plots/district_rainfall_comparison.png',
-        'seasonal': 'plots/seasonal_temperature_by_province.png',
-        'monthly': 'plots/monthly_rainfall_by_province.png'
-    }
+    plot_paths = {}
+    for chart_type, (_, name) in COMPARISON_CHARTS.items():
+        plot_paths[chart_type] = f'plots/{name}.png'
+        render_comparison_chart(district_data, chart_type, plot_paths[chart_type])
+    return plot_paths
 
 
 def print_comparative_report(district_data):
@@ -1210,21 +1793,8 @@ def print_comparative_report(district_data):
     print("="*80 + "\n")
     
     
-def visualize_yearly_forecast(forecast_df, output_dir='plots'):
-    """
-    Create visualizations for yearly weather forecast
-    
-    Args:
-        forecast_df: DataFrame with yearly forecast
-        output_dir: Directory to save plots
-    """
-    location = forecast_df['location'].iloc[0]
-    
-    # Create output directory if it doesn't exist
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-    
-    # 1. Temperature throughout the year
+def _plot_annual_temperature(forecast_df, location):
+    """Temperature throughout the year, with the seasons shaded"""
     plt.figure(figsize=(15, 6))
     plt.plot(forecast_df['date'], forecast_df['temperature_c'], 'r-')
     plt.title(f'Annual Temperature Forecast for {location}')
@@ -1252,10 +1822,10 @@ def visualize_yearly_forecast(forecast_df, output_dir='plots'):
     legend_elements = [Patch(facecolor=color, alpha=0.2, label=season)
                       for season, color in season_colors.items()]
     plt.legend(handles=legend_elements, loc='upper right')
-        
-    plt.savefig(f'{output_dir}/{location}_annual_temperature.png')
-    
-    # 2. Monthly rainfall
+
+
+def _plot_monthly_rainfall(forecast_df, location):
+    """Monthly rainfall, colored by season"""
     monthly_rain = forecast_df.groupby(['month_name', 'month'])['rainfall_mm'].sum().reset_index()
     monthly_rain = monthly_rain.sort_values('month')  # Sort by month number for chronological order
     
@@ -1290,9 +1860,10 @@ def visualize_yearly_forecast(forecast_df, output_dir='plots'):
     plt.legend(handles=legend_elements, loc='upper right')
     
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/{location}_monthly_rainfall.png')
-    
-    # 3. Seasonal comparison - multiple metrics
+
+
+def _plot_seasonal_comparison(forecast_df, location):
+    """Seasonal comparison - multiple metrics"""
     seasonal_data = forecast_df.groupby('season').agg({
         'temperature_c': 'mean',
         'rainfall_mm': 'sum',
@@ -1321,11 +1892,12 @@ def visualize_yearly_forecast(forecast_df, output_dir='plots'):
     plt.title(f'Seasonal Weather Comparison for {location}')
     plt.xticks(rotation=45)
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/{location}_seasonal_comparison.png')
-    
-    # 4. Daily rainfall heatmap by month
+
+
+def _plot_rainfall_heatmap(forecast_df, location):
+    """Daily rainfall heatmap by month"""
     # Create a pivot with day of month vs month
-    forecast_df['day_of_month'] = forecast_df['date'].dt.day
+    forecast_df = forecast_df.assign(day_of_month=forecast_df['date'].dt.day)
     rainfall_pivot = forecast_df.pivot_table(
         values='rainfall_mm', 
         index='day_of_month',
@@ -1344,15 +1916,50 @@ def visualize_yearly_forecast(forecast_df, output_dir='plots'):
     sns.heatmap(rainfall_pivot, cmap='Blues', vmin=0, vmax=max(20, rainfall_pivot.max().max()))
     plt.title(f'Daily Rainfall Pattern Forecast for {location}')
     plt.ylabel('Day of Month')
-    plt.savefig(f'{output_dir}/{location}_rainfall_heatmap.png')
+
+
+# Chart type -> (plot function, file name suffix) of the yearly forecast charts
+YEARLY_FORECAST_CHARTS = {
+    'temperature': (_plot_annual_temperature, 'annual_temperature'),
+    'rainfall': (_plot_monthly_rainfall, 'monthly_rainfall'),
+    'seasonal': (_plot_seasonal_comparison, 'seasonal_comparison'),
+    'heatmap': (_plot_rainfall_heatmap, 'rainfall_heatmap'),
+}
+
+
+def render_yearly_forecast_chart(forecast_df, chart_type, output, fmt=None):
+    """
+    Draw one yearly forecast chart (see YEARLY_FORECAST_CHARTS) for the
+    location of forecast_df and save it to a path or file object, as PNG
+    unless fmt (e.g. 'svg') says otherwise
+    """
+    plot, _ = YEARLY_FORECAST_CHARTS[chart_type]
+    plot(forecast_df, forecast_df['location'].iloc[0])
+    plt.savefig(output, format=fmt)
+    plt.close()
+
+
+def visualize_yearly_forecast(forecast_df, output_dir='plots'):
+    """
+    Create visualizations for yearly weather forecast
+    
+    Args:
+        forecast_df: DataFrame with yearly forecast
+        output_dir: Directory to save plots
+    """
+    location = forecast_df['location'].iloc[0]
+    
+    # Create output directory if it doesn't exist
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
     
     # Return file paths for all generated images
-    return {
-        'temperature': f'{output_dir}/{location}_annual_temperature.png',
-        'rainfall': f'{output_dir}/{location}_monthly_rainfall.png',
-        'seasonal': f'{output_dir}/{location}_seasonal_comparison.png',
-        'heatmap': f'{output_dir}/{location}_rainfall_heatmap.png'
-    }
+    plot_paths = {}
+    for chart_type, (_, suffix) in YEARLY_FORECAST_CHARTS.items():
+        plot_paths[chart_type] = f'{output_dir}/{location}_{suffix}.png'
+        render_yearly_forecast_chart(forecast_df, chart_type, plot_paths[chart_type])
+    return plot_paths
+
 
 def get_district_climate_insights(location):
     """
@@ -0,0 +1,255 @@
+import logging
+import mmap
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from django.conf import settings
+from joblib import load
+
+logger = logging.getLogger(__name__)
+
+MODEL_SUFFIX = '_model.joblib'
+
+
+def _is_mapped(array):
+    """Whether an array's data lives in a memory-mapped file."""
+    while isinstance(array, np.ndarray):
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return isinstance(array, mmap.mmap)
+
+
+def model_memory_bytes(obj):
+    """
+    Estimate the memory held by a loaded model as (private_bytes, mapped_bytes).
+
+    Walks the object graph summing ``sys.getsizeof`` and numpy buffers.
+    Extension types without a ``__dict__`` (e.g. scikit-learn trees) are
+    walked through ``__getstate__``, which exposes their node arrays.
+    Arrays backed by a memory-mapped file are counted as mapped, since those
+    pages are shared with other processes mapping the same file.
+    """
+    private = mapped = 0
+    seen = set()
+    # __getstate__ returns fresh objects; keep them alive so ids are not reused
+    visited = []
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        visited.append(item)
+
+        if isinstance(item, np.ndarray):
+            if _is_mapped(item):
+                mapped += item.nbytes
+            else:
+                private += sys.getsizeof(item) if item.flags.owndata else sys.getsizeof(item) + item.nbytes
+            if item.dtype.hasobject:
+                stack.extend(item.ravel())
+            continue
+
+        private += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif isinstance(item, (str, bytes, int, float, bool, type)) or item is None:
+            continue
+        elif hasattr(item, '__dict__'):
+            stack.append(item.__dict__)
+        else:
+            try:
+                stack.append(item.__getstate__())
+            except Exception:
+                pass
+    return private, mapped
+
+
+@dataclass
+class SoilModelBundle:
+    """Every crop requirement model of one soil type, loaded together."""
+    soil_type: str
+    models: dict
+    file_bytes: int
+    resident_bytes: int
+    mapped_bytes: int
+    load_seconds: float
+    mmap_mode: Optional[str]
+    hits: int = 0
+
+    def stats(self):
+        return {
+            'soil_type': self.soil_type,
+            'model_count': len(self.models),
+            'file_bytes': self.file_bytes,
+            'resident_bytes': self.resident_bytes,
+            'mapped_bytes': self.mapped_bytes,
+            'load_seconds': round(self.load_seconds, 6),
+            'mmap_mode': self.mmap_mode,
+            'hits': self.hits,
+        }
+
+
+class SoilBundleCache:
+    """
+    LRU cache of per-soil-type model bundles with a byte budget.
+
+    A bundle is every ``<target>_model.joblib`` in a soil directory. When the
+    resident size of the cached bundles goes over ``max_bytes`` the least
+    recently used soil types are evicted (the newest bundle is always kept).
+    Resident size is estimated by walking the loaded models (see
+    ``model_memory_bytes``).
+
+    With ``mmap_mode='r'`` the numpy arrays stored in the joblib files are
+    memory-mapped instead of copied, so forked workers share those pages.
+    Mapped bytes are reported separately and do not count against the budget.
+    """
+
+    def __init__(self, models_dir, max_bytes=None, mmap_mode=None):
+        self.models_dir = models_dir
+        self.max_bytes = max_bytes
+        self.mmap_mode = mmap_mode
+        self._bundles = OrderedDict()
+        # soil type -> Future of the load in progress
+        self._loading = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _budget(self):
+        if self.max_bytes is not None:
+            return self.max_bytes
+        return getattr(settings, 'WEATHER_SOIL_BUNDLE_CACHE_BYTES', 256 * 1024 * 1024)
+
+    def _mmap_mode(self):
+        if self.mmap_mode is not None:
+            return self.mmap_mode
+        return 'r' if getattr(settings, 'WEATHER_SOIL_BUNDLE_MMAP', False) else None
+
+    def targets(self, soil_type):
+        """List the target names that have a model file for a soil type."""
+        soil_dir = os.path.join(self.models_dir, soil_type)
+        if not os.path.isdir(soil_dir):
+            return []
+        return sorted(f[:-len(MODEL_SUFFIX)] for f in os.listdir(soil_dir) if f.endswith(MODEL_SUFFIX))
+
+    def _load_bundle(self, soil_type):
+        targets = self.targets(soil_type)
+        if not targets:
+            raise FileNotFoundError(f"No models found for soil type '{soil_type}' in {self.models_dir}")
+
+        mmap_mode = self._mmap_mode()
+        paths = {target: os.path.join(self.models_dir, soil_type, f"{target}{MODEL_SUFFIX}") for target in targets}
+        file_bytes = sum(os.path.getsize(path) for path in paths.values())
+
+        start = time.perf_counter()
+        models = {target: load(path, mmap_mode=mmap_mode) for target, path in paths.items()}
+        elapsed = time.perf_counter() - start
+        resident_bytes, mapped_bytes = model_memory_bytes(models)
+
+        logger.info("Loaded %d %s models in %.2fs (%d bytes resident)",
+                    len(models), soil_type, elapsed, resident_bytes)
+        return SoilModelBundle(soil_type, models, file_bytes, resident_bytes, mapped_bytes, elapsed, mmap_mode)
+
+    def _evict(self):
+        budget = self._budget()
+        while len(self._bundles) > 1 and self.resident_bytes() > budget:
+            soil_type, _ = self._bundles.popitem(last=False)
+            self.evictions += 1
+            logger.info("Evicted %s models from the soil bundle cache", soil_type)
+
+    def get(self, soil_type):
+        """
+        Return the bundle for a soil type, loading it (and evicting others) on a miss.
+
+        Bundles load outside the cache lock, so lookups of other soil types
+        are not held up; concurrent misses for the same soil type wait on
+        the one load already in progress.
+        """
+        with self._lock:
+            bundle = self._bundles.get(soil_type)
+            if bundle is not None:
+                self._bundles.move_to_end(soil_type)
+                bundle.hits += 1
+                self.hits += 1
+                return bundle
+
+            self.misses += 1
+            loading = self._loading.get(soil_type)
+            owner = loading is None
+            if owner:
+                loading = self._loading[soil_type] = Future()
+        if not owner:
+            return loading.result()
+
+        try:
+            bundle = self._load_bundle(soil_type)
+        except BaseException as e:
+            with self._lock:
+                del self._loading[soil_type]
+            loading.set_exception(e)
+            raise
+
+        with self._lock:
+            self._bundles[soil_type] = bundle
+            self._evict()
+            del self._loading[soil_type]
+        loading.set_result(bundle)
+        return bundle
+
+    def get_model(self, soil_type, target):
+        """Return one model of a soil type's bundle, e.g. ('loamy', 'adjusted_nitrogen')."""
+        models = self.get(soil_type).models
+        if target not in models:
+            path = os.path.join(self.models_dir, soil_type, f"{target}{MODEL_SUFFIX}")
+            raise FileNotFoundError(f"Model file not found: {path}")
+        return models[target]
+
+    def warm_up(self, soil_types):
+        """Load bundles in order until the byte budget is used up. Returns the number cached."""
+        for soil_type in soil_types:
+            try:
+                self.get(soil_type)
+            except Exception as e:
+                logger.warning("Could not preload %s models: %s", soil_type, e)
+                continue
+            if self.resident_bytes() >= self._budget():
+                break
+        return len(self._bundles)
+
+    def resident_bytes(self):
+        return sum(bundle.resident_bytes for bundle in self._bundles.values())
+
+    def clear(self):
+        with self._lock:
+            self._bundles.clear()
+
+    def stats(self):
+        with self._lock:
+            bundles = [bundle.stats() for bundle in self._bundles.values()]
+            lookups = self.hits + self.misses
+            return {
+                'bundles': len(bundles),
+                'resident_bytes': sum(b['resident_bytes'] for b in bundles),
+                'mapped_bytes': sum(b['mapped_bytes'] for b in bundles),
+                'max_bytes': self._budget(),
+                'mmap_mode': self._mmap_mode(),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                # Least recently used first
+                'soil_types': bundles,
+            }
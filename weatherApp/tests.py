@@ -1,3 +1,1033 @@
-from django.test import TestCase
+import contextlib
+import contextvars
+import importlib.util
+import io
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import joblib
+import numpy as np
+import pandas as pd
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from sklearn.base import clone
+
+from .advisory import run_stages
+from .advisory_matrix import advisory_model_version, lookup_advisory, score_matrix_group
+from .lstm_numpy import NumpyLSTMModel
+from .crop_catalog import CROP_DATASET_PATH, CropCatalog
+from .lazy_imports import load_module
+from .district_comparison import build_district_comparison, district_forecasts, load_district_comparison
+from .forecast_cache import ForecastCache, forecast_seed
+from .forecast_charts import prune_forecast_charts, run_pending_charts
+from .location_index import LocationIndex, location_index
+from . import location_predictions
+from .location_predictions import LOCATION_MODEL_ARTIFACTS, LocationPredictionTable, location_model_version
+from .model_registry import (LOCATION_ARTIFACTS, WEATHER_MODEL_RUNS_DIR, ModelRegistry, ModelVersion, list_soil_types,
+                             models_dir, registry)
+from .model_resolution import ModelResolutionTable
+from .models import AdvisoryMatrixEntry, ForecastChart, LocationPrediction
+from .predict_crop_requirements import predict_crop_requirements, predict_crop_requirements_batch, resolve_soil_type
+from .predict_locationl_altitude import predict_altitude
+from . import predict_soil_type
+from .predict_soil_type import (SOIL_DATASET_PATH, SOIL_FEATURE_COLUMNS, dataset_sha256, get_soil_preprocessor_artifact,
+                                predict_soil_texture)
+from .predict_weather import (RWANDA_DISTRICTS, SEASON_KEYS, clean_weather_data, forecast_weather_batch,
+                              forecast_weather_yearly, generate_district_comparison_report,
+                              generate_location_weather_data, get_forecast, get_seasonal_forecast_summary,
+                              iter_clean_weather_data, predict_weather_by_locations, prepare_location_sequences,
+                              read_weather_data_chunks, summarize_district_forecasts, summarize_forecast,
+                              write_location_weather_data)
+from .soil_bundles import SoilBundleCache
+from .tracing import RequestTracingMiddleware, trace_stage
+from .views import get_district_comparison, get_forecast_charts, get_soil_texture, weather_record_fields
+from . import warmup
+from .warmup import memory_usage, prepare_for_fork, warm_up, warm_up_report
+from .weather_training import THREAD_ENV_VARS, thread_env
+from weatherDataApp.models import WeatherData
+
+
+def dense(matrix):
+    return matrix.toarray() if hasattr(matrix, 'toarray') else np.asarray(matrix)
+
+
+def refit_and_predict_soil_texture(dataset, district, sector):
+    """The original inference path: refit the preprocessor on every call."""
+    sector_data = dataset[(dataset['District'] == district) & (dataset['Sector'] == sector)]
+    input_data = pd.DataFrame({
+        'District': [district],
+        'Latitude': [sector_data['Latitude'].mean()],
+        'Longitude': [sector_data['Longitude'].mean()],
+    })
+    preprocessor = clone(registry.get('soil_preprocessor'))
+    preprocessor.fit(dataset[SOIL_FEATURE_COLUMNS])
+    X_processed = preprocessor.transform(input_data)
+    prediction = registry.get('soil_texture_model').predict(X_processed)[0]
+    return X_processed, prediction.lower()
+
+
+def clean_weather_data_by_location_loops(data):
+    """The original clean_weather_data: one masked pass over the frame per location and step."""
+    df = data.copy()
+    for location in df['location'].unique():
+        location_data = df[df['location'] == location]
+        for col in df.columns:
+            if col not in ['date', 'location', 'latitude', 'longitude', 'elevation_m', 'month', 'day',
+                           'day_of_year', 'year', 'is_rainy_season']:
+                df.loc[df['location'] == location, col] = location_data[col].interpolate(method='linear')
+    df = df.ffill().bfill()
+    df = df.drop_duplicates(subset=['date', 'location'], keep='first')
+    df = df.sort_values(['location', 'date'])
+    for location in df['location'].unique():
+        location_mask = df['location'] == location
+        for lag in [1, 3, 7]:
+            df.loc[location_mask, f'temp_avg_lag{lag}'] = df.loc[location_mask, 'temp_avg_c'].shift(lag)
+            df.loc[location_mask, f'rainfall_lag{lag}'] = df.loc[location_mask, 'rainfall_mm'].shift(lag)
+            df.loc[location_mask, f'humidity_lag{lag}'] = df.loc[location_mask, 'humidity_pct'].shift(lag)
+        df.loc[location_mask, 'temp_avg_rolling7'] = df.loc[location_mask, 'temp_avg_c'].rolling(window=7).mean()
+        df.loc[location_mask, 'rainfall_rolling7'] = df.loc[location_mask, 'rainfall_mm'].rolling(window=7).mean()
+        df.loc[location_mask, 'humidity_rolling7'] = df.loc[location_mask, 'humidity_pct'].rolling(window=7).mean()
+    df = pd.concat([df, pd.get_dummies(df['location'], prefix='loc')], axis=1)
+    rows_to_drop = []
+    for location in df['location'].unique():
+        rows_to_drop.extend(df[df['location'] == location].index[:7])
+    return df.drop(rows_to_drop).reset_index(drop=True)
+
+
+class SoilPreprocessorParityTests(SimpleTestCase):
+    def test_frozen_preprocessor_matches_refit_for_every_sector(self):
+        dataset = pd.read_csv(SOIL_DATASET_PATH)
+        pairs = dataset[['District', 'Sector']].drop_duplicates()
+        self.assertEqual(len(pairs), 414)
+
+        frozen = get_soil_preprocessor_artifact()['preprocessor']
+
+        for district, sector in pairs.itertuples(index=False):
+            with self.subTest(district=district, sector=sector):
+                expected_features, expected = refit_and_predict_soil_texture(dataset, district, sector)
+
+                sector_data = dataset[(dataset['District'] == district) & (dataset['Sector'] == sector)]
+                features = frozen.transform(pd.DataFrame({
+                    'District': [district],
+                    'Latitude': [sector_data['Latitude'].mean()],
+                    'Longitude': [sector_data['Longitude'].mean()],
+                }))
+                np.testing.assert_array_equal(dense(features), dense(expected_features))
+
+                with contextlib.redirect_stdout(io.StringIO()):
+                    self.assertEqual(predict_soil_texture(district, sector), expected)
+
+    def test_artifact_fitted_on_another_dataset_is_refit(self):
+        frozen = get_soil_preprocessor_artifact()
+        self.assertEqual(frozen['dataset_sha256'], dataset_sha256())
+
+        stale = {**frozen, 'version': 'stale', 'dataset_sha256': '0' * 64}
+        registry_get = registry.get
+        with mock.patch.object(registry, 'get', lambda name: stale if name == 'soil_preprocessor_fitted'
+                               else registry_get(name)), \
+                mock.patch.multiple(predict_soil_type, _built_artifact=None, _checked_artifact=None), \
+                self.assertLogs('weatherApp.predict_soil_type', 'WARNING') as logs:
+            artifact = get_soil_preprocessor_artifact()
+            self.assertIs(get_soil_preprocessor_artifact(), artifact)
+        self.assertEqual(artifact['dataset_sha256'], dataset_sha256())
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn('stale', logs.output[0])
+
+
+class ModelRegistryTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.models_dir = tmp.name
+        for name, value in [('altitude_mapping', {'Gasabo': 'mid'}), ('district_encoder', ['Gasabo', 'Huye'])]:
+            joblib.dump(value, os.path.join(self.models_dir, LOCATION_ARTIFACTS[name]))
+
+    def test_artifacts_are_loaded_once_and_shared(self):
+        models = ModelRegistry(self.models_dir)
+        mapping = models.get('altitude_mapping')
+        self.assertEqual(mapping, {'Gasabo': 'mid'})
+        with mock.patch('weatherApp.model_registry.load') as load:
+            self.assertIs(models.get('altitude_mapping'), mapping)
+        load.assert_not_called()
+
+        with self.assertRaises(KeyError):
+            models.get('crystal_ball')
+        with self.assertRaises(FileNotFoundError):
+            models.get('altitude_model')
+        self.assertIs(registry.get('district_encoder'), registry.get('district_encoder'))
+
+    def test_summary_totals_the_loaded_artifacts(self):
+        models = ModelRegistry(self.models_dir)
+        self.assertEqual(models.summary()['artifact_count'], 0)
+        models.get('altitude_mapping')
+        models.get('district_encoder')
+
+        summary = models.summary()
+        self.assertEqual([s['artifact'] for s in summary['artifacts']], ['altitude_mapping', 'district_encoder'])
+        self.assertEqual(summary['artifact_count'], 2)
+        self.assertEqual(summary['total_file_bytes'], sum(
+            os.path.getsize(os.path.join(self.models_dir, LOCATION_ARTIFACTS[name]))
+            for name in ['altitude_mapping', 'district_encoder']))
+        self.assertEqual(summary['artifacts'][0]['path'], LOCATION_ARTIFACTS['altitude_mapping'])
+        self.assertGreater(summary['total_memory_bytes'], 0)
+        self.assertEqual(summary['soil_bundles'], models.soil_bundles.stats())
+
+    def test_fingerprint_follows_the_file_contents(self):
+        models = ModelRegistry(self.models_dir)
+        fingerprint = models.fingerprint(['district_encoder', 'altitude_mapping'])
+        self.assertEqual(len(fingerprint), 16)
+        self.assertEqual(models.fingerprint(['altitude_mapping', 'district_encoder']), fingerprint)
+        # Missing artifacts are skipped
+        self.assertEqual(models.fingerprint(['altitude_mapping', 'district_encoder', 'altitude_model']), fingerprint)
+
+        joblib.dump({'Gasabo': 'high'}, os.path.join(self.models_dir, LOCATION_ARTIFACTS['altitude_mapping']))
+        self.assertNotEqual(models.fingerprint(['altitude_mapping', 'district_encoder']), fingerprint)
+        self.assertNotEqual(models.fingerprint(['altitude_mapping'], extra_paths=[SOIL_DATASET_PATH]),
+                            models.fingerprint(['altitude_mapping']))
+
+
+class LocationIndexTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.soil_path = os.path.join(tmp.name, 'soil.csv')
+        self.sectors_path = os.path.join(tmp.name, 'sectors.csv')
+        pd.DataFrame({
+            'District': ['Gasabo', 'Gasabo', 'Gasabo', 'Huye'],
+            'Sector': ['Remera', 'Remera', 'Kimironko', 'Tumba'],
+            'Latitude': [-1.9, -2.1, -1.95, -2.6],
+            'Longitude': [30.1, 30.3, 30.12, 29.7],
+        }).to_csv(self.soil_path, index=False)
+        # Remera is already in the soil dataset; only Bumbogo should be added from here
+        pd.DataFrame({
+            'District': ['Gasabo', 'Gasabo'],
+            'Sector': ['Bumbogo', 'Remera'],
+            'Latitude': [-1.85, -5.0],
+            'Longitude': [30.15, 35.0],
+        }).to_csv(self.sectors_path, index=False)
+        self.index = LocationIndex(self.soil_path, self.sectors_path)
+
+    def test_lookup_ignores_case_and_whitespace(self):
+        record = self.index.lookup('  GASABO ', 'remera')
+        self.assertEqual((record.district, record.sector), ('Gasabo', 'Remera'))
+        self.assertAlmostEqual(record.latitude, -2.0)
+        self.assertAlmostEqual(record.longitude, 30.2)
+        self.assertIs(self.index.lookup('gasabo', 'Remera'), record)
+        self.assertEqual(self.index.lookup('Gasabo', 'Bumbogo').latitude, -1.85)
+        self.assertEqual(self.index.canonical_district('hUyE'), 'Huye')
+        self.assertEqual(len(self.index), 4)
+
+    def test_sectors_are_listed_per_district(self):
+        self.assertEqual(self.index.districts(), ['Gasabo', 'Huye'])
+        self.assertEqual(self.index.sectors('gasabo'), ['Bumbogo', 'Kimironko', 'Remera'])
+        self.assertEqual(self.index.sectors(' Huye'), ['Tumba'])
+        self.assertEqual([(r.district, r.sector) for r in self.index.records()],
+                         [('Gasabo', 'Bumbogo'), ('Gasabo', 'Kimironko'), ('Gasabo', 'Remera'), ('Huye', 'Tumba')])
+
+    def test_unknown_district_or_sector(self):
+        self.assertIsNone(self.index.lookup('Atlantis', 'Remera'))
+        self.assertIsNone(self.index.lookup('Gasabo', 'Tumba'))
+        self.assertIsNone(self.index.canonical_district('Atlantis'))
+        self.assertEqual(self.index.sectors('Atlantis'), [])
+
+    def test_records_carry_the_encoder_ids(self):
+        district_encoder = registry.get('district_encoder')
+        sector_encoder = registry.get('sector_encoder')
+        for record in location_index.records()[:20]:
+            with self.subTest(district=record.district, sector=record.sector):
+                self.assertEqual(record.district_encoded, district_encoder.transform([record.district])[0])
+                self.assertEqual(record.sector_encoded, sector_encoder.transform([record.sector])[0])
+
+
+class WarmUpTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(warmup, '_last_report', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @override_settings(WEATHER_PRELOAD_MODELS=True, WEATHER_WARM_UP_PREDICTIONS=True)
+    def test_warm_up_before_fork_loads_models_then_closes_connections(self):
+        steps_at_close = []
+        with mock.patch.object(warmup, 'connections') as connections, mock.patch('gc.freeze') as freeze, \
+                self.assertNoLogs('weatherApp.warmup', 'WARNING'):
+            connections.close_all.side_effect = lambda: steps_at_close.append(dict(warmup._last_report['steps']))
+            report = warm_up(before_fork=True)
+
+        loaded = {stats['artifact'] for stats in registry.stats()}
+        self.assertTrue(set(LOCATION_ARTIFACTS) <= loaded, loaded)
+        self.assertIn('predict_soil_texture', report['steps'])
+        self.assertIn('predict_altitude', report['steps'])
+        self.assertTrue(any(step.startswith('predict_crop_requirements[') for step in report['steps']))
+
+        # The connections are closed once, after every model and synthetic prediction ran
+        connections.close_all.assert_called_once_with()
+        self.assertEqual(steps_at_close, [report['steps']])
+        freeze.assert_called_once_with()
+        self.assertTrue(report['before_fork'])
+        self.assertIs(warm_up_report()['warm_up'], report)
+
+    @override_settings(WEATHER_PRELOAD_MODELS=True, WEATHER_WARM_UP_PREDICTIONS=False)
+    def test_warm_up_without_fork_keeps_connections(self):
+        with mock.patch.object(warmup, 'connections') as connections, mock.patch('gc.freeze') as freeze:
+            report = warm_up()
+        connections.close_all.assert_not_called()
+        freeze.assert_not_called()
+        self.assertFalse(report['before_fork'])
+        self.assertFalse(any(step.startswith('predict_') for step in report['steps']))
+
+    @override_settings(WEATHER_PRELOAD_MODELS=False)
+    def test_warm_up_is_skipped_when_preloading_is_off(self):
+        with mock.patch.object(registry, 'warm_up') as registry_warm_up:
+            self.assertIsNone(warm_up(before_fork=True))
+        registry_warm_up.assert_not_called()
+
+    def test_prepare_for_fork_marks_the_report(self):
+        warmup._last_report = {'before_fork': False, 'frozen_objects': 0}
+        with mock.patch.object(warmup, 'connections') as connections, mock.patch('gc.freeze') as freeze, \
+                mock.patch('gc.get_freeze_count', return_value=123):
+            prepare_for_fork()
+        connections.close_all.assert_called_once_with()
+        freeze.assert_called_once_with()
+        self.assertEqual(warmup._last_report, {'before_fork': True, 'frozen_objects': 123})
+
+    def test_memory_usage_splits_shared_and_private_pages(self):
+        smaps = ("55d0c0000000-7ffd00000000 ---p 00000000 00:00 0  [rollup]\n"
+                 "Rss:                1000 kB\nPss:                 600 kB\n"
+                 "Shared_Clean:        300 kB\nShared_Dirty:        100 kB\n"
+                 "Private_Clean:       200 kB\nPrivate_Dirty:       400 kB\n")
+        with mock.patch('builtins.open', mock.mock_open(read_data=smaps)):
+            usage = memory_usage()
+        self.assertEqual(usage, {'rss_bytes': 1024000, 'pss_bytes': 614400,
+                                 'shared_bytes': 409600, 'private_bytes': 614400})
+
+        with mock.patch('builtins.open', side_effect=FileNotFoundError):
+            self.assertIsNone(memory_usage())
+
+
+class LocationPredictionTests(TestCase):
+    def setUp(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            call_command('materialize_location_predictions')
+        record = location_index.records()[0]
+        self.district, self.sector = record.district, record.sector
+
+    def test_lookup_ignores_case_and_matches_live_prediction(self):
+        table = LocationPredictionTable(refresh_seconds=300)
+        soil_type, altitude = table.lookup(f' {self.district.upper()} ', self.sector.lower())
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(soil_type, predict_soil_texture(self.district, self.sector))
+            self.assertEqual(altitude, predict_altitude(self.district, self.sector))
+
+    def test_miss_falls_back_to_live_prediction_after_refresh(self):
+        table = LocationPredictionTable(refresh_seconds=300)
+        soil_type, _ = table.lookup(self.district, self.sector)
+        LocationPrediction.objects.filter(district=self.district, sector=self.sector).delete()
+
+        # Served from the process-local copy until it is older than refresh_seconds
+        table._loaded_at -= 299
+        self.assertEqual(table.lookup(self.district, self.sector)[0], soil_type)
+        table._loaded_at -= 2
+        self.assertIsNone(table.lookup(self.district, self.sector))
+
+        with mock.patch('weatherApp.views.location_predictions', table), \
+                mock.patch('weatherApp.views.predict_soil_texture', wraps=predict_soil_texture) as live, \
+                contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(get_soil_texture(self.district, self.sector), soil_type)
+        live.assert_called_once_with(self.district, self.sector)
+
+    def test_model_version_follows_changed_datasets(self):
+        version = location_predictions._model_version
+        self.addCleanup(version.clear)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'sectors.csv')
+            with open(path, 'w') as f:
+                f.write('District,Sector\nGasabo,Remera\n')
+            with mock.patch.object(version, 'files', lambda: (LOCATION_MODEL_ARTIFACTS, [path])), \
+                    mock.patch.object(version, 'check_seconds', 0):
+                version.clear()
+                first = location_model_version()
+                self.assertEqual(location_model_version(), first)
+
+                with open(path, 'a') as f:
+                    f.write('Gasabo,Kimironko\n')
+                self.assertNotEqual(location_model_version(), first)
+
+
+class CropRequirementBatchTests(SimpleTestCase):
+    def test_batch_matches_single_predictions_in_input_order(self):
+        items = [
+            {'crop': crop, 'soil_type': soil_type, 'altitude': altitude, 'season': season}
+            for crop in ['Maize', 'beans', 'Maiz', 'Unknown crop']
+            for soil_type in ['loamy', 'gleysol']
+            for altitude in ['low', 'middle']
+            for season in ['long_rainy', 'short_dry', 'monsoon']
+        ]
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = []
+            for item in items:
+                result = predict_crop_requirements(item['crop'], item['soil_type'], item['altitude'], item['season'])
+                expected.append(result if isinstance(result, dict) else result.data)
+            results = predict_crop_requirements_batch(items)
+
+        self.assertEqual(len(results), len(items))
+        for item, result, single in zip(items, results, expected):
+            with self.subTest(**item):
+                self.assertEqual(result, single)
+
+    def test_unknown_soil_type_warning_names_both_soil_types(self):
+        with self.assertLogs('weatherApp.predict_crop_requirements', 'WARNING') as logs:
+            soil_type, _ = resolve_soil_type('gleysol')
+        self.assertEqual(logs.output, [
+            f"WARNING:weatherApp.predict_crop_requirements:Soil type 'gleysol' not found. Using '{soil_type}' instead."
+        ])
+
+
+class SoilBundleCacheTests(SimpleTestCase):
+    def test_least_recently_used_soil_types_are_evicted_over_budget(self):
+        sizing = SoilBundleCache(models_dir, max_bytes=0)
+        bundle_bytes = sizing.get('loamy').resident_bytes
+        cache = SoilBundleCache(models_dir, max_bytes=int(bundle_bytes * 2.5))
+
+        for soil_type in ['loamy', 'clay', 'loamy', 'sandy']:
+            cache.get(soil_type)
+
+        stats = cache.stats()
+        self.assertEqual([b['soil_type'] for b in stats['soil_types']], ['loamy', 'sandy'])
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions']), (1, 3, 1))
+        self.assertLessEqual(stats['resident_bytes'], stats['max_bytes'])
+
+    def test_bundles_load_outside_the_cache_lock_and_only_once(self):
+        started, release = threading.Event(), threading.Event()
+        loads = []
+
+        class SlowCache(SoilBundleCache):
+            def _load_bundle(self, soil_type):
+                loads.append(soil_type)
+                if soil_type == 'clay':
+                    started.set()
+                    release.wait(5)
+                return super()._load_bundle(soil_type)
+
+        cache = SlowCache(models_dir)
+        loamy = cache.get('loamy')
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get('clay'))) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+
+        # A hit for another soil type does not wait for the clay load
+        self.assertTrue(started.wait(5))
+        hit = threading.Thread(target=cache.get, args=('loamy',))
+        hit.start()
+        hit.join(1)
+        self.assertFalse(hit.is_alive())
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(loads, ['loamy', 'clay'])
+        self.assertEqual(len({id(bundle) for bundle in results}), 1)
+
+    def test_mmap_bundle_predicts_like_regular_load(self):
+        features = pd.DataFrame([{
+            'crop': 'Maize', 'disease_vulnerability': 5, 'pest_vulnerability': 5,
+            'phosphorus_req': 60, 'potassium_req': 40, 'optimal_sunlight_hours': 8,
+            'drought_resistance': 5, 'optimal_ph': 6.0, 'nitrogen_req': 120, 'min_sunlight_hours': 6,
+        }])
+        regular = SoilBundleCache(models_dir).get_model('loamy', 'adjusted_nitrogen')
+        mapped = SoilBundleCache(models_dir, mmap_mode='r').get_model('loamy', 'adjusted_nitrogen')
+        np.testing.assert_array_equal(mapped.predict(features), regular.predict(features))
+
+
+class ModelResolutionTests(SimpleTestCase):
+    def test_table_is_rebuilt_when_a_soil_directory_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            soil_dir = os.path.join(tmp, 'loamy')
+            os.makedirs(soil_dir)
+            for name in ['adjusted_nitrogen', 'low_altitude_long_rainy_adjusted']:
+                open(os.path.join(soil_dir, f'{name}_model.joblib'), 'w').close()
+            table = ModelResolutionTable(models_dir=tmp, check_seconds=0)
+
+            self.assertEqual(table.lookup('loamy', 'mid', 'long_rainy'),
+                             ('low_altitude_long_rainy_adjusted', 'season'))
+            self.assertEqual(table.lookup('loamy', 'mid', 'short_dry'),
+                             ('low_altitude_long_rainy_adjusted', 'any'))
+
+            open(os.path.join(soil_dir, 'mid_altitude_long_rainy_adjusted_model.joblib'), 'w').close()
+            os.utime(soil_dir, ns=(0, table._soils['loamy'].signature + 1))
+
+            self.assertEqual(table.lookup('loamy', 'mid', 'long_rainy'),
+                             ('mid_altitude_long_rainy_adjusted', 'exact'))
+            self.assertEqual(table.lookup('loamy', 'mid', 'short_dry'),
+                             ('mid_altitude_long_rainy_adjusted', 'altitude'))
+
+
+class CropCatalogTests(SimpleTestCase):
+    def test_fuzzy_lookup_matches_a_full_difflib_scan(self):
+        from difflib import get_close_matches
+
+        catalog = CropCatalog()
+        crops = catalog.names()
+        queries = [name[:i] + name[i + 1:] for name in crops for i in range(len(name))]
+        queries += [name.upper() for name in crops] + ['Maiz', 'bens', 'xyz', 'ie', 'Tomatos']
+        for query in queries:
+            entry, match = catalog.lookup(query)
+            if match == 'alias':
+                continue
+            exact = [name for name in crops if name.lower() == query.lower()]
+            close = get_close_matches(query, crops)
+            expected = exact[0] if exact else (close[0] if close else None)
+            with self.subTest(query=query):
+                self.assertEqual(entry.name if entry else None, expected)
+
+    def test_reloads_when_the_dataset_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'crops.csv')
+            dataset = pd.read_csv(CROP_DATASET_PATH)
+            dataset.to_csv(path, index=False)
+            catalog = CropCatalog(path, check_seconds=0)
+            self.assertEqual(catalog.lookup('corn')[0].name, 'Maize')
+            self.assertEqual(catalog.lookup('Quinoa'), (None, None))
+
+            dataset.loc[len(dataset)] = dataset.iloc[0]
+            dataset.loc[len(dataset) - 1, 'crop'] = 'Quinoa'
+            dataset.to_csv(path, index=False)
+            os.utime(path, ns=(0, catalog._mtime + 1))
+
+            entry, match = catalog.lookup('quinoa')
+            self.assertEqual((entry.name, match), ('Quinoa', 'exact'))
+            self.assertEqual(catalog.autocomplete('qui')[0], {'crop': 'Quinoa', 'match': 'prefix'})
+
+
+class AdvisoryMatrixTests(TestCase):
+    def test_stored_rows_match_live_inference(self):
+        with self.assertLogs('weatherApp', 'INFO'):
+            rows = score_matrix_group('loamy', 'mid', ['Maize', 'Beans'], ['long_rainy', 'short_dry'])
+        AdvisoryMatrixEntry.objects.bulk_create(
+            AdvisoryMatrixEntry(model_version=advisory_model_version(), **fields) for fields in rows)
+        self.assertEqual(AdvisoryMatrixEntry.objects.count(), 4)
+
+        # Exact, differently cased, alias and misspelt crop names
+        for crop_name in ['Maize', 'beans', 'corn', 'Maiz']:
+            for season in ['long_rainy', 'short_dry']:
+                with self.subTest(crop=crop_name, season=season), contextlib.redirect_stdout(io.StringIO()):
+                    live = predict_crop_requirements(crop_name, 'loamy', altitude='mid', season=season)
+                    self.assertEqual(lookup_advisory(crop_name, 'loamy', 'mid', season), live)
+
+        self.assertIsNone(lookup_advisory('Maize', 'loamy', 'high', 'long_rainy'))
+        self.assertIsNone(lookup_advisory('Cassava', 'loamy', 'mid', 'long_rainy'))
+
+    def test_model_version_follows_changed_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'crops.csv')
+            with open(path, 'w') as f:
+                f.write('crop\nMaize\n')
+            version = ModelVersion(ModelRegistry(tmp), lambda: ([], [path]), check_seconds=0)
+            first = version()
+            self.assertEqual(version(), first)
+
+            with open(path, 'w') as f:
+                f.write('crop\nBeans\n')
+            os.utime(path, ns=(0, version._stamps[0][1] + 1))
+            second = version()
+            self.assertNotEqual(second, first)
+
+            # Within check_seconds the files are not looked at
+            version.check_seconds = 300
+            os.remove(path)
+            self.assertEqual(version(), second)
+            version.clear()
+            self.assertNotEqual(version(), second)
+
+
+class AdvisoryStageTests(SimpleTestCase):
+    @override_settings(WEATHER_ADVISORY_CONCURRENT=True, WEATHER_ADVISORY_STAGE_TIMEOUTS={'slow': 0.2})
+    def test_stages_see_the_request_context_and_slow_stages_time_out(self):
+        request_id = contextvars.ContextVar('request_id')
+        request_id.set('abc')
+        release = threading.Event()
+        try:
+            stages = run_stages({
+                'soil': lambda: {'soil': request_id.get()},
+                'altitude': lambda: threading.current_thread().name,
+                'slow': lambda: release.wait(5),
+            })
+        finally:
+            release.set()
+
+        self.assertEqual(stages['soil'], {'soil': 'abc'})
+        self.assertTrue(stages['altitude'].startswith('advisory'))
+        self.assertIn('error', stages['slow'])
+        self.assertEqual(stages.error_status('slow'), 504)
+        self.assertEqual(stages.error_status('soil'), 400)
+
+        with override_settings(WEATHER_ADVISORY_CONCURRENT=False):
+            stages = run_stages({'soil': lambda: request_id.get(), 'altitude': threading.current_thread})
+        self.assertEqual((stages['soil'], stages['altitude']), ('abc', threading.current_thread()))
+
+    @override_settings(WEATHER_ADVISORY_CONCURRENT=True, WEATHER_ADVISORY_QUEUE_TIMEOUT=5,
+                       WEATHER_ADVISORY_STAGE_TIMEOUTS={'first': 1, 'queued': 0.2})
+    def test_time_spent_queued_does_not_count_against_the_stage_timeout(self):
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='advisory') as pool, \
+                mock.patch('weatherApp.advisory._executor', pool):
+            stages = run_stages({
+                'first': lambda: time.sleep(0.4) or 'done',
+                'queued': lambda: time.sleep(0.05) or 'done',
+            })
+        self.assertEqual((stages['first'], stages['queued']), ('done', 'done'))
+        self.assertFalse(stages.timed_out)
+
+    @override_settings(WEATHER_ADVISORY_CONCURRENT=True, WEATHER_ADVISORY_QUEUE_TIMEOUT=0.1,
+                       WEATHER_ADVISORY_STAGE_TIMEOUTS={'first': 0.2})
+    def test_stages_that_never_get_a_thread_time_out(self):
+        release = threading.Event()
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='advisory') as pool, \
+                mock.patch('weatherApp.advisory._executor', pool):
+            try:
+                stages = run_stages({'first': lambda: release.wait(5), 'queued': lambda: 'done'})
+            finally:
+                release.set()
+        self.assertEqual(stages.timed_out, {'first', 'queued'})
+        self.assertEqual(stages.error_status('queued'), 504)
+
+
+class RequestTracingTests(SimpleTestCase):
+    @override_settings(WEATHER_SERVER_TIMING=True)
+    def test_stage_durations_are_logged_and_sent_as_server_timing(self):
+        def view(request):
+            run_stages({'soil': lambda: 'clay', 'weather': lambda: 'sunny'})
+            with trace_stage('predict'):
+                pass
+            return HttpResponse()
+
+        middleware = RequestTracingMiddleware(view)
+        with self.assertLogs('weatherApp.tracing', 'INFO') as logs:
+            response = middleware(RequestFactory().post('/weather/create/'))
+
+        metrics = [metric.split(';')[0] for metric in response['Server-Timing'].split(', ')]
+        self.assertEqual(sorted(metrics), ['predict', 'soil', 'total', 'weather'])
+        trace = logs.records[0].trace
+        self.assertEqual((trace['path'], trace['status']), ('/weather/create/', 200))
+        self.assertEqual(sorted(trace['stages_ms']), ['predict', 'soil', 'weather'])
+
+        untraced = RequestTracingMiddleware(lambda request: HttpResponse())(RequestFactory().get('/'))
+        self.assertNotIn('Server-Timing', untraced)
+
+
+class ForecastCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = ForecastCache(max_entries=2)
+        self.day = date(2026, 3, 1)
+        self.cache.warm_up(self.day, districts=[])
+
+    def test_names_are_canonical_and_repeat_lookups_hit(self):
+        forecast = self.cache.get('Kicukiro', self.day)
+        self.assertIs(self.cache.get(' KICUKIRO ', self.day), forecast)
+        self.assertIs(self.cache.get('kicukiro', self.day), forecast)
+        self.assertEqual(forecast, get_forecast('Kicukiro', seed=forecast_seed('Kicukiro', self.day), start_date=self.day))
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 1))
+
+    def test_unknown_districts_are_not_cached(self):
+        self.cache.get('Gasabo', self.day)
+        for name in ('Nowhere', 'x' * 50):
+            self.assertIsNotNone(self.cache.get(name, self.day))
+        self.assertEqual(self.cache.stats()['entries'], 1)
+        self.assertEqual(self.cache.uncached, 2)
+        self.assertEqual(self.cache.evictions, 0)
+
+    def test_least_recently_used_district_is_evicted(self):
+        self.cache.get('Gasabo', self.day)
+        self.cache.get('Huye', self.day)
+        self.cache.get('Gasabo', self.day)
+        self.cache.get('Musanze', self.day)
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertEqual([key[0] for key in self.cache._entries], ['Gasabo', 'Musanze'])
+
+    def test_new_day_warms_up_in_the_background(self):
+        self.cache.get('Gasabo', self.day)
+        next_day = self.day + timedelta(days=1)
+        forecast = self.cache.get('Huye', next_day)
+        self.assertIsNotNone(self.cache._warm_up_thread)
+        self.cache._warm_up_thread.join()
+
+        self.assertEqual(forecast.location, 'Huye')
+        self.assertEqual(self.cache.stats()['forecast_date'], next_day.isoformat())
+        self.assertTrue(all(key[1] == next_day for key in self.cache._entries))
+        self.assertLessEqual(len(self.cache._entries), 2)
+
+
+def seasonal_forecast_summary_text(forecast_df):
+    """The original get_seasonal_forecast_summary, rendering the report straight from the grouped frames."""
+    location = forecast_df['location'].iloc[0]
+    seasonal_summary = forecast_df.groupby('season').agg({
+        'temperature_c': ['mean', 'min', 'max'],
+        'rainfall_mm': ['mean', 'sum', 'max'],
+        'humidity_pct': ['mean', 'min', 'max']
+    }).round(1)
+    monthly_summary = forecast_df.groupby(['month', 'month_name']).agg({
+        'temperature_c': 'mean',
+        'rainfall_mm': 'sum',
+        'humidity_pct': 'mean'
+    }).round(1)
+
+    summary = f"Annual Weather Forecast for {location}, Rwanda\n"
+    summary += "=" * 50 + "\n\n"
+    summary += "SEASONAL FORECAST SUMMARY\n"
+    summary += "-" * 30 + "\n\n"
+    for season in ['Minor Dry Season', 'Major Rainy Season', 'Major Dry Season', 'Minor Rainy Season']:
+        if season in seasonal_summary.index:
+            summary += f"{season}:\n"
+            temp_mean = seasonal_summary.loc[season, ('temperature_c', 'mean')]
+            temp_min = seasonal_summary.loc[season, ('temperature_c', 'min')]
+            temp_max = seasonal_summary.loc[season, ('temperature_c', 'max')]
+            summary += f"  Temperature: {temp_mean}°C (Range: {temp_min}°C to {temp_max}°C)\n"
+            rain_total = seasonal_summary.loc[season, ('rainfall_mm', 'sum')]
+            rain_mean = seasonal_summary.loc[season, ('rainfall_mm', 'mean')]
+            rain_max = seasonal_summary.loc[season, ('rainfall_mm', 'max')]
+            if rain_total < 50:
+                rain_desc = "Very dry"
+            elif rain_total < 200:
+                rain_desc = "Relatively dry"
+            elif rain_total < 400:
+                rain_desc = "Moderate rainfall"
+            elif rain_total < 600:
+                rain_desc = "Wet"
+            else:
+                rain_desc = "Very wet"
+            summary += f"  Rainfall: {rain_desc} - Total: {rain_total}mm, Avg: {rain_mean}mm/day, Max: {rain_max}mm/day\n"
+            humidity_mean = seasonal_summary.loc[season, ('humidity_pct', 'mean')]
+            summary += f"  Humidity: {humidity_mean}%\n\n"
+
+    summary += "MONTHLY FORECAST BREAKDOWN\n"
+    summary += "-" * 30 + "\n\n"
+    for month_num, month_group in sorted(monthly_summary.groupby(level=0)):
+        month_name = month_group.index[0][1]
+        summary += f"{month_name}:\n"
+        summary += f"  Avg. Temperature: {month_group['temperature_c'].values[0]}°C\n"
+        summary += f"  Total Rainfall: {month_group['rainfall_mm'].values[0]}mm\n"
+        summary += f"  Avg. Humidity: {month_group['humidity_pct'].values[0]}%\n\n"
+    return summary
+
+
+class WeatherGeneratorTests(SimpleTestCase):
+    def test_statistics_match_the_shipped_dataset(self):
+        # The shipped dataset was made by the original day-by-day generator
+        shipped = pd.read_csv(os.path.join(os.path.dirname(__file__), 'data', 'rwanda_locations_weather_data.csv'))
+        generated = generate_location_weather_data(seed=7)
+        self.assertEqual(list(generated.columns), list(shipped.columns))
+        self.assertEqual(len(generated), len(shipped))
+
+        def summary(data):
+            groups = data.groupby(['location', 'is_rainy_season'])
+            stats = groups[['temp_avg_c', 'humidity_pct', 'rainfall_mm', 'wind_speed_kmh', 'sunshine_hours']].mean()
+            stats['wet_days'] = groups['rainfall_mm'].apply(lambda rain: (rain > 0).mean())
+            stats['temp_autocorr'] = groups['temp_avg_c'].apply(lambda temp: temp.autocorr(1))
+            return stats
+
+        # Bounds are a little over the spread between two seeds of the original generator
+        tolerance = pd.Series({'temp_avg_c': 0.5, 'humidity_pct': 1.5, 'rainfall_mm': 2.5, 'wind_speed_kmh': 0.5,
+                               'sunshine_hours': 0.8, 'wet_days': 0.12, 'temp_autocorr': 0.05})
+        difference = (summary(generated) - summary(shipped)).abs().max()
+        self.assertTrue((difference <= tolerance).all(), difference.to_dict())
+        self.assertAlmostEqual(generated['rainfall_mm'].isna().mean(), 0.01, delta=0.005)
+
+    def test_chunked_csv_keeps_the_district_order(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'weather.csv')
+            rows = write_location_weather_data(path, n_days=20, seed=1, districts_per_chunk=7)
+            written = pd.read_csv(path, parse_dates=['date'])
+        self.assertEqual(rows, 20 * len(RWANDA_DISTRICTS))
+        self.assertEqual(list(written['location'].unique()), list(RWANDA_DISTRICTS))
+        self.assertTrue(written.groupby('location')['date'].apply(lambda d: d.is_monotonic_increasing).all())
+
+
+class WeatherForecastSummaryTests(TestCase):
+    def setUp(self):
+        self.forecast = forecast_weather_yearly('Gasabo', seed=42, start_date=date(2026, 3, 1))
+        self.summary = summarize_forecast(self.forecast)
+
+    def test_text_matches_the_original_report(self):
+        self.assertEqual(self.summary.to_text(), seasonal_forecast_summary_text(self.forecast))
+        self.assertEqual(get_seasonal_forecast_summary(self.forecast), seasonal_forecast_summary_text(self.forecast))
+
+    def test_dict_round_trips_into_a_weather_record(self):
+        user = get_user_model().objects.create_user(phone_number='0700000004', role='farmer')
+        record = WeatherData.objects.create(district='Gasabo', sector='Remera', season='long_rainy', created_by=user,
+                                            **weather_record_fields(self.summary))
+        record.refresh_from_db()
+
+        self.assertEqual(record.monthly_data, self.summary.to_dict()['monthly_data'])
+        self.assertEqual(list(record.monthly_data), [month.month_name for month in self.summary.months])
+        self.assertEqual(len(self.summary.seasons), 4)
+        for season in self.summary.seasons:
+            prefix = SEASON_KEYS[season.season]
+            with self.subTest(season=season.season):
+                self.assertEqual(getattr(record, f'{prefix}_season_temp'), season.avg_temperature)
+                self.assertEqual(getattr(record, f'{prefix}_season_rainfall'), season.total_rainfall)
+                self.assertEqual(getattr(record, f'{prefix}_season_humidity'), season.humidity)
+
+
+class CleanWeatherDataTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.raw = generate_location_weather_data(n_days=60, seed=3)
+
+    def test_matches_the_per_location_loops(self):
+        # Shuffled rows and repeated records exercise the row-order interpolation and de-duplication
+        data = pd.concat([self.raw.sample(frac=1, random_state=0), self.raw.head(20)])
+        pd.testing.assert_frame_equal(clean_weather_data(data), clean_weather_data_by_location_loops(data),
+                                      check_exact=True)
+
+    def test_chunks_of_whole_locations_match_a_single_pass(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'weather.csv')
+            self.raw.to_csv(path, index=False)
+            # 250 rows split most districts (60 rows each) across two reads
+            chunks = list(read_weather_data_chunks(path, chunksize=250))
+            self.assertTrue(all(not set(a['location']) & set(b['location']) for a, b in zip(chunks, chunks[1:])))
+            cleaned = pd.concat(iter_clean_weather_data(chunks))
+            expected = clean_weather_data(pd.read_csv(path, parse_dates=['date']))
+
+        # Chunks keep the file's district order; a single pass sorts the districts by name
+        cleaned = cleaned.sort_values(['location', 'date']).reset_index(drop=True)
+        pd.testing.assert_frame_equal(cleaned, expected, check_exact=True)
+
+
+class LocationSequenceTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cleaned = clean_weather_data(generate_location_weather_data(n_days=40, seed=5))
+        # Locations interleaved, so their rows are not contiguous in the frame
+        cls.data = cleaned.sort_values(['date', 'location'], kind='stable')
+        cls.sequences, cls.scaler, cls.feature_cols, _ = prepare_location_sequences(cls.data, 'rainfall_mm', lookback=5)
+
+    def test_windows_match_slices_of_each_location(self):
+        scaled = self.data[self.feature_cols].astype(np.float64)
+        numerical = [col for col in self.feature_cols if not col.startswith('loc_')]
+        scaled[numerical] = self.scaler.transform(self.data[numerical])
+        X_list, y_list = [], []
+        for location in self.data['location'].unique():
+            features = scaled[self.data['location'] == location].to_numpy()
+            target = self.data.loc[self.data['location'] == location, 'rainfall_mm'].to_numpy()
+            for i in range(5, len(features)):
+                X_list.append(features[i - 5:i])
+                y_list.append(target[i])
+
+        X, y = self.sequences.arrays()
+        self.assertEqual(X.dtype, np.float32)
+        np.testing.assert_array_equal(X, np.array(X_list, dtype=np.float32))
+        np.testing.assert_array_equal(y, np.array(y_list, dtype=np.float32))
+
+    def test_batches_cover_the_split_once_per_pass(self):
+        train_idx, test_idx = self.sequences.split(test_size=0.2)
+        self.assertEqual(len(test_idx), int(np.ceil(0.2 * len(self.sequences))))
+        X_train, y_train = self.sequences.arrays(train_idx)
+
+        batches = list(self.sequences.batches(64, train_idx))
+        self.assertTrue(all(len(y) <= 64 for _, y in batches))
+        np.testing.assert_array_equal(np.concatenate([X for X, _ in batches]), X_train)
+
+        shuffled = self.sequences.batches(64, train_idx, shuffle=True, seed=0, repeat=True)
+        first_pass = np.concatenate([next(shuffled)[1] for _ in batches])
+        np.testing.assert_array_equal(np.sort(first_pass), np.sort(y_train))
+        self.assertEqual(len(next(shuffled)[1]), 64)
+
+
+class WeatherTrainingTests(SimpleTestCase):
+    def test_weather_model_runs_are_not_a_soil_type(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ['loamy', 'clay', WEATHER_MODEL_RUNS_DIR]:
+                os.makedirs(os.path.join(tmp, name))
+            self.assertEqual(list_soil_types(tmp), ['clay', 'loamy'])
+
+    def test_thread_env_is_restored(self):
+        before = {name: os.environ.get(name) for name in THREAD_ENV_VARS}
+        with thread_env(3):
+            self.assertTrue(all(os.environ[name] == '3' for name in THREAD_ENV_VARS))
+        self.assertEqual({name: os.environ.get(name) for name in THREAD_ENV_VARS}, before)
+
+
+class DistrictComparisonTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.settings_override = override_settings(WEATHER_DISTRICT_COMPARISON_DIR=tmp.name)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def request(self, **params):
+        request = APIRequestFactory().get('/weather/reports/district-comparison/', params)
+        force_authenticate(request, user=get_user_model()(phone_number='0700000002', is_staff=True))
+        return get_district_comparison(request)
+
+    def test_cached_tables_match_the_district_forecasts(self):
+        forecast_date = date(2026, 3, 1)
+        _, built = build_district_comparison(forecast_date, days_to_predict=90)
+        metadata, cached = load_district_comparison(forecast_date)
+        self.assertEqual(metadata['forecast_date'], '2026-03-01')
+
+        self.assertEqual(len(built['yearly']), len(RWANDA_DISTRICTS))
+        for period, table in summarize_district_forecasts(district_forecasts(forecast_date, 90)).items():
+            pd.testing.assert_frame_equal(built[period], table)
+            pd.testing.assert_frame_equal(cached[period], table, check_dtype=False)
+
+    def test_district_rows_come_from_the_served_forecast(self):
+        # The forecast cache and the yearly charts simulate a district from forecast_seed too
+        forecast_date = date(2026, 3, 1)
+        _, built = build_district_comparison(forecast_date)
+        served = forecast_weather_yearly('Huye', seed=forecast_seed('Huye', forecast_date), start_date=forecast_date)
+        for period, table in summarize_district_forecasts(served).items():
+            huye = built[period][built[period]['location'] == 'Huye'].reset_index(drop=True)
+            pd.testing.assert_frame_equal(huye, table)
+
+    def test_vectorized_forecasts_match_the_per_district_forecasts(self):
+        forecast_date = date(2026, 3, 1)
+        expected = pd.concat([
+            forecast_weather_yearly(district, days_to_predict=120, seed=forecast_seed(district, forecast_date),
+                                    start_date=forecast_date)
+            for district in RWANDA_DISTRICTS
+        ], ignore_index=True)
+        pd.testing.assert_frame_equal(district_forecasts(forecast_date, 120), expected, check_exact=True)
+        with self.assertRaises(ValueError):
+            forecast_weather_batch(['Huye', 'Gasabo'], 10, seeds=[1])
+
+    def test_report_uses_the_seeded_forecasts(self):
+        forecast_date = date(2026, 3, 1)
+        with mock.patch.object(pd.DataFrame, 'to_csv') as to_csv, mock.patch('os.makedirs'), \
+                contextlib.redirect_stdout(io.StringIO()):
+            report = generate_district_comparison_report(forecast_date)
+        self.assertEqual(to_csv.call_count, 3)
+        for period, table in summarize_district_forecasts(district_forecasts(forecast_date)).items():
+            pd.testing.assert_frame_equal(report[period], table)
+
+    def test_endpoint_falls_back_to_the_latest_comparison_for_today(self):
+        today = timezone.localdate()
+        self.assertEqual(self.request().status_code, 404)
+        build_district_comparison(today - timedelta(days=2), days_to_predict=30)
+        build_district_comparison(today + timedelta(days=1), days_to_predict=30)
+
+        response = self.request(period='yearly')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['requested_date'], today.isoformat())
+        self.assertEqual(response.data['forecast_date'], (today - timedelta(days=2)).isoformat())
+        # An explicit date is never substituted
+        self.assertEqual(self.request(date=today.isoformat()).status_code, 404)
+
+    def test_endpoint_serves_only_built_dates(self):
+        self.assertEqual(self.request(date='2026-03-02').status_code, 404)
+        self.assertEqual(self.request(date='2026-02-30').status_code, 400)
+        self.assertEqual(self.request(date='2026-03-02', period='weekly').status_code, 400)
+
+        build_district_comparison(date(2026, 3, 2), days_to_predict=30)
+        response = self.request(date='2026-03-02', period='seasonal')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['forecast_date'], '2026-03-02')
+        self.assertNotIn('yearly', response.data)
+        self.assertEqual({row['location'] for row in response.data['seasonal']}, set(RWANDA_DISTRICTS))
+
+
+class ForecastChartTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.settings_override = override_settings(MEDIA_ROOT=tmp.name, WEATHER_DISTRICT_COMPARISON_DIR=tmp.name,
+                                                   WEATHER_FORECAST_CHART_MAX_AGE_DAYS=7)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        load_module('matplotlib').use('Agg')
+        self.today = timezone.localdate()
+
+    def request(self, **params):
+        request = APIRequestFactory().get('/weather/forecast-charts/', params)
+        force_authenticate(request, user=get_user_model()(phone_number='0700000003'))
+        return get_forecast_charts(request)
+
+    def test_charts_are_queued_then_served_from_media(self):
+        params = {'district': 'Gasabo', 'date': self.today.isoformat(), 'chart': 'heatmap', 'image_format': 'svg'}
+        response = self.request(**params)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['charts'], [{'chart': 'heatmap', 'format': 'svg', 'status': 'pending', 'url': None}])
+
+        self.assertEqual(run_pending_charts(), (1, 0))
+        self.assertEqual(run_pending_charts(), (0, 0))
+        response = self.request(**params)
+        self.assertEqual(response.status_code, 200)
+        chart = ForecastChart.objects.get()
+        self.assertEqual(response.data['charts'][0]['url'], chart.file.url)
+        self.assertEqual(chart.file.name, f'forecast_charts/{self.today.isoformat()}/Gasabo/heatmap.svg')
+        with chart.file.open('rb') as f:
+            self.assertIn(b'<svg', f.read())
+
+        # A chart whose file disappeared is queued again
+        os.remove(chart.file.path)
+        self.assertEqual(self.request(**params).status_code, 202)
+
+    def test_comparison_charts_and_validation(self):
+        response = self.request(chart='monthly')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(run_pending_charts(), (1, 0))
+        self.assertTrue(ForecastChart.objects.get(district='').file.name.endswith('/all/monthly.png'))
+
+        self.assertEqual(self.request(district='Atlantis').status_code, 400)
+        self.assertEqual(self.request(district='Gasabo', chart='monthly').status_code, 400)
+        self.assertEqual(self.request(date='2026-02-30').status_code, 400)
+        self.assertEqual(self.request(image_format='pdf').status_code, 400)
+
+    def test_only_recent_dates_are_queued_and_old_charts_are_pruned(self):
+        for days in (-1, 8, 365 * 100):
+            forecast_date = (self.today - timedelta(days=days)).isoformat()
+            self.assertEqual(self.request(district='Gasabo', date=forecast_date).status_code, 400)
+        self.assertEqual(self.request(district='Gasabo', date='9999-12-31').status_code, 400)
+        self.assertFalse(ForecastChart.objects.exists())
+
+        self.request(district='Gasabo', date=(self.today - timedelta(days=7)).isoformat(), chart='rainfall')
+        self.request(district='Gasabo', chart='rainfall')
+        self.assertEqual(run_pending_charts(), (2, 0))
+        old = ForecastChart.objects.get(forecast_date=self.today - timedelta(days=7))
+
+        self.assertEqual(prune_forecast_charts(keep_days=3), 1)
+        self.assertFalse(os.path.exists(old.file.path))
+        self.assertEqual(list(ForecastChart.objects.values_list('forecast_date', flat=True)), [self.today])
+
+
+@skipUnless(importlib.util.find_spec('tensorflow'), "TensorFlow is not installed")
+class NumpyLSTMParityTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        raw = pd.read_csv(os.path.join(os.path.dirname(__file__), 'data', 'rwanda_locations_weather_data.csv'),
+                          parse_dates=['date'])
+        cls.recent_data = clean_weather_data(raw[raw['date'] > raw['date'].max() - pd.Timedelta(days=30)])
+        cls.locations = list(cls.recent_data['location'].unique())
+
+    def test_numpy_forecast_matches_keras_for_every_target(self):
+        from tensorflow.keras.losses import MeanSquaredError
+        from tensorflow.keras.models import load_model
+
+        for target_short, target in [('temp', 'temp_avg_c'), ('rainfall', 'rainfall_mm'), ('humidity', 'humidity_pct')]:
+            with self.subTest(target=target_short):
+                prefix = os.path.join(models_dir, f'location_lstm_{target_short}_model')
+                keras_model = load_model(f'{prefix}.h5', custom_objects={'mse': MeanSquaredError()})
+                numpy_model = NumpyLSTMModel.load(f'{prefix}.npz')
+                scaler = joblib.load(os.path.join(models_dir, f'location_scaler_{target_short}.pkl'))
+                with open(os.path.join(models_dir, f'location_features_{target_short}.txt')) as f:
+                    features = f.read().split(',')
+
+                expected = predict_weather_by_locations(self.locations, self.recent_data, target,
+                                                        keras_model, scaler, features, days_ahead=7)
+                actual = predict_weather_by_locations(self.locations, self.recent_data, target,
+                                                      numpy_model, scaler, features, days_ahead=7)
+                np.testing.assert_allclose(actual, expected, rtol=1e-4, atol=1e-3)
@@ -0,0 +1,111 @@
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_current_trace = contextvars.ContextVar('weather_request_trace', default=None)
+
+
+class RequestTrace:
+    """
+    Durations of the stages of one request, in the order they finished.
+
+    A stage recorded more than once (e.g. 'predict' for several crops) is
+    summed. Stages can overlap when they run concurrently, so their total
+    can exceed the request time.
+    """
+
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.spans = []
+
+    def add(self, stage, seconds):
+        # list.append is atomic, so stages running in pool threads can record too
+        self.spans.append((stage, seconds))
+
+    def durations(self):
+        """Stage -> total milliseconds."""
+        totals = {}
+        for stage, seconds in list(self.spans):
+            totals[stage] = totals.get(stage, 0.0) + seconds * 1000
+        return totals
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self):
+        """Value for the Server-Timing response header."""
+        metrics = [f"{stage};dur={ms:.1f}" for stage, ms in self.durations().items()]
+        metrics.append(f"total;dur={self.elapsed_ms():.1f}")
+        return ', '.join(metrics)
+
+    def log(self, status_code):
+        """Emit one structured INFO record with every stage duration."""
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        stages = {stage: round(ms, 2) for stage, ms in self.durations().items()}
+        total = round(self.elapsed_ms(), 2)
+        logger.info(
+            "%s %s %s total_ms=%.2f %s", self.method, self.path, status_code, total,
+            ' '.join(f"{stage}_ms={ms:.2f}" for stage, ms in stages.items()),
+            extra={'trace': {'method': self.method, 'path': self.path, 'status': status_code,
+                             'total_ms': total, 'stages_ms': stages}},
+        )
+
+
+def current_trace():
+    """The trace of the request being handled, or None outside a traced request."""
+    return _current_trace.get()
+
+
+def record_stage(stage, seconds):
+    """Add a duration measured elsewhere to the current trace, if any."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(stage, seconds)
+
+
+@contextmanager
+def trace_stage(stage):
+    """Time the enclosed block as a stage of the current request (no-op outside one)."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(stage, time.perf_counter() - start)
+
+
+class RequestTracingMiddleware:
+    """
+    Start a trace for every request. Requests that recorded stages are
+    logged on the ``weatherApp.tracing`` logger and, with
+    WEATHER_SERVER_TIMING = True, get a Server-Timing header that browser
+    dev tools show next to the request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        trace = RequestTrace(request.method, request.path)
+        token = _current_trace.set(trace)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_trace.reset(token)
+
+        if trace.spans:
+            trace.log(response.status_code)
+            if getattr(settings, 'WEATHER_SERVER_TIMING', False):
+                response['Server-Timing'] = trace.server_timing()
+        return response
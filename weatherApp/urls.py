@@ -3,9 +3,17 @@ from . import views
 
 urlpatterns = [
     path('create/', views.make_weather_adjusted_crop_prediction, name='predict_weather'),
+    path('batch/', views.make_batch_crop_requirement_prediction, name='batch-predictions'),
+    path('crops/autocomplete/', views.autocomplete_crops, name='crop-autocomplete'),
     path('predictions/', views.get_all_predictions, name='all-predictions'),
     path('<int:pk>/', views.get_prediction_by_id, name='get-prediction'),
     path('update/<int:pk>/', views.update_prediction, name='update-prediction'),
     path('delete/<int:pk>/', views.delete_prediction, name='delete-prediction'),
     path('user/', views.get_user_predictions, name='user-predictions'),
+    path('diagnostics/models/', views.get_model_registry_stats, name='model-registry-stats'),
+    path('diagnostics/forecast-cache/', views.get_forecast_cache_stats, name='forecast-cache-stats'),
+    path('diagnostics/model-resolution/', views.get_model_resolution_table, name='model-resolution-table'),
+    path('diagnostics/worker-memory/', views.get_worker_memory, name='worker-memory'),
+    path('reports/district-comparison/', views.get_district_comparison, name='district-comparison'),
+    path('forecast-charts/', views.get_forecast_charts, name='forecast-charts'),
 ]
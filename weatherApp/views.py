@@ -1,13 +1,23 @@
 from django.shortcuts import render
 from .predict_soil_type import predict_soil_texture
 from .predict_locationl_altitude import predict_altitude
-from .predict_weather import get_forecast_summary
+from .predict_weather import WeatherForecastSummary
+from .forecast_cache import forecast_cache
 from .predict_crop_requirements import predict_crop_requirements
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from .models import CropRequirementPrediction
 from weatherDataApp .models import WeatherData
+from .location_predictions import location_predictions
+from .advisory_matrix import lookup_advisory
+from .advisory import run_stages
+from .tracing import record_stage, trace_stage
+from functools import partial
+import logging
+import time
+
+logger = logging.getLogger(__name__)
 
 
 # Create function to get raw soil texture data (without Response object)
@@ -15,8 +25,13 @@ def get_soil_texture(district_name, sector_name):
     if not district_name or not sector_name:
         return {"error": "District and Sector names are required."}
     
-    soil_prediction = predict_soil_texture(district_name, sector_name)
-    print(f"Predicted soil texture for {district_name}, {sector_name}: {soil_prediction}")
+    # Known sectors are served from the materialized table; others run the model
+    materialized = location_predictions.lookup(district_name, sector_name)
+    if materialized is not None:
+        soil_prediction = materialized[0]
+    else:
+        soil_prediction = predict_soil_texture(district_name, sector_name)
+    logger.debug("Predicted soil texture for %s, %s: %s", district_name, sector_name, soil_prediction)
     
     return soil_prediction
 
@@ -26,7 +41,11 @@ def get_location_altitude(district_name, sector_name):
     if not district_name or not sector_name:
         return {"error": "District and Sector names are required."}
     
-    altitude_prediction = predict_altitude(district_name, sector_name)
+    materialized = location_predictions.lookup(district_name, sector_name)
+    if materialized is not None:
+        altitude_prediction = materialized[1]
+    else:
+        altitude_prediction = predict_altitude(district_name, sector_name)
     # print(f"Predicted altitude for {district_name}, {sector_name}: {altitude_prediction}")
     
     return altitude_prediction
@@ -37,20 +56,58 @@ def get_weather(district_name, sector_name):
     if not district_name or not sector_name:
         return {"error": "District and Sector names are required."}
     
-    weather_prediction = get_forecast_summary(district_name)
-    print(f"Predicted weather for {district_name}, {sector_name}: {weather_prediction}")
+    try:
+        weather_prediction = forecast_cache.get(district_name)
+    except Exception as e:
+        return {"error": f"Error generating forecast summary: {str(e)}"}
+    logger.debug("Predicted weather for %s, %s: %d seasons, %d months",
+                 district_name, sector_name, len(weather_prediction.seasons), len(weather_prediction.months))
     
     return weather_prediction
 
 
+# Soil, altitude and weather for a location, computed concurrently with per-stage timeouts
+def get_location_stages(district_name, sector_name):
+    return run_stages({
+        'soil': partial(get_soil_texture, district_name, sector_name),
+        'altitude': partial(get_location_altitude, district_name, sector_name),
+        'weather': partial(get_weather, district_name, sector_name),
+    })
+
+
+# Crop requirements from the precomputed advisory matrix, or live models on a miss
+def get_crop_requirements(crop_name, soil_prediction, altitude, season_name):
+    with trace_stage('predict'):
+        stored = lookup_advisory(crop_name, soil_prediction, altitude, season_name)
+        if stored is not None:
+            return stored
+        return predict_crop_requirements(crop_name, soil_prediction, altitude=altitude, season=season_name)
+
+
+# The console report of an advisory: (title, lines) sections between banners
+def format_report(sections):
+    banner = "=" * 70
+    parts = []
+    for title, lines in sections:
+        parts += ["", banner, title, banner, *lines]
+    return "\n".join(parts)
+
+
+# Render the forecast for the API response: structured values by default,
+# the plain-text report only when the client sends weather_format="text"
+def serialize_weather(weather_data, request):
+    if not isinstance(weather_data, WeatherForecastSummary):
+        return weather_data
+    if request.data.get("weather_format") == "text":
+        return weather_data.to_text()
+    return weather_data.to_dict()
+
+
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny]) 
 def make_crop_requirement_prediction(request):
-    print("==== Rwanda Agriculture Advisory System ====")
-    print("This system predicts soil type and crop requirements based on location and crop information.")
-    
     # Collect user inputs
     district_name = request.data.get("district")
     sector_name = request.data.get("sector")
@@ -61,34 +118,30 @@ def make_crop_requirement_prediction(request):
     if not district_name or not sector_name or not crop_name:
         return Response({"error": "District, sector, and crop name are required."}, status=400)
     
-    # Predict soil texture - use the raw data function, not the view
-    print("\nAnalyzing soil data for this location...")
-    soil_prediction = get_soil_texture(district_name, sector_name)
-    
-    weather_data = get_weather(district_name, sector_name)
+    # Soil texture, altitude and weather are independent - look them up concurrently
+    logger.debug("Analyzing soil, altitude and weather data for %s, %s", district_name, sector_name)
+    stages = get_location_stages(district_name, sector_name)
+    soil_prediction = stages['soil']
+    altitude_prediction = stages['altitude']
+    weather_data = stages['weather']
     
     if isinstance(soil_prediction, dict) and "error" in soil_prediction:
-        print(f"\n❌ {soil_prediction['error']}")
-        return Response({"error": soil_prediction['error']}, status=400)
-    
-    print(f"\n✅ Predicted soil texture for {district_name}, {sector_name}: {soil_prediction}")
-    
-    # Get altitude - use the raw data function, not the view
-    altitude_prediction = get_location_altitude(district_name, sector_name)
+        logger.info("Soil lookup for %s, %s failed: %s", district_name, sector_name, soil_prediction['error'])
+        return Response({"error": soil_prediction['error']}, status=stages.error_status('soil'))
     
     if isinstance(altitude_prediction, dict) and "error" in altitude_prediction:
-        print(f"\n❌ {altitude_prediction['error']}")
-        return Response({"error": altitude_prediction['error']}, status=400)
+        logger.info("Altitude lookup for %s, %s failed: %s", district_name, sector_name, altitude_prediction['error'])
+        return Response({"error": altitude_prediction['error']}, status=stages.error_status('altitude'))
     
     altitude = altitude_prediction
     
     # Make crop requirement prediction
-    print("\nGenerating crop requirements for these conditions...")
-    prediction = predict_crop_requirements(crop_name, soil_prediction, altitude=altitude, season=season_name)
+    logger.debug("Generating %s requirements for %s soil at %s altitude", crop_name, soil_prediction, altitude)
+    prediction = get_crop_requirements(crop_name, soil_prediction, altitude, season_name)
     
     # Handle errors in prediction
     if isinstance(prediction, dict) and 'error' in prediction:
-        print(f"\n❌ Error in prediction: {prediction['error']}")
+        logger.info("Crop requirement prediction for %s failed: %s", crop_name, prediction['error'])
         return Response({"error": prediction['error']}, status=400)
     
     # Format the response data
@@ -107,7 +160,7 @@ def make_crop_requirement_prediction(request):
             "potassium_kg_per_ha": prediction['requirements']['potassium_kg_per_ha'],
             "water_requirement_mm": prediction['requirements']['water_requirement_mm']
         },
-        "weather": weather_data,
+        "weather": serialize_weather(weather_data, request),
 
     }
     
@@ -130,47 +183,31 @@ def make_crop_requirement_prediction(request):
     if 'seasonal_recommendations' in prediction:
         response_data['seasonal_recommendations'] = prediction['seasonal_recommendations']
     
-    # Keep console output for debugging (all your print statements)
-    print("\n" + "="*70)
-    print("CROP REQUIREMENTS")
-    print("="*70)
-    print(f"Nitrogen: {prediction['requirements']['nitrogen_kg_per_ha']} kg/ha")
-    print(f"Phosphorus: {prediction['requirements']['phosphorus_kg_per_ha']} kg/ha")
-    print(f"Potassium: {prediction['requirements']['potassium_kg_per_ha']} kg/ha")
-    print(f"Water: {prediction['requirements']['water_requirement_mm']} mm")
-    
-    if 'planting_info' in prediction['requirements']:
-        print("\n" + "="*70)
-        print("PLANTING INFORMATION")
-        print("="*70)
-        planting = prediction['requirements']['planting_info']
-        print(f"Row Spacing: {planting['row_spacing_cm']} cm")
-        print(f"Plant Spacing: {planting['plant_spacing_cm']} cm")
-        print(f"Planting Depth: {planting['planting_depth_cm']} cm")
-    
-    if 'expected_yield_tons_per_ha' in prediction:
-        print("\n" + "="*70)
-        print("YIELD INFORMATION")
-        print("="*70)
-        print(f"Expected Yield: {prediction['expected_yield_tons_per_ha']} tons/ha")
-    
-    if 'intercropping_recommendation' in prediction:
-        print("\n" + "="*70)
-        print("INTERCROPPING RECOMMENDATIONS") 
-        print("="*70)
-        print(f"Compatible crops: {', '.join(prediction['intercropping_recommendation'])}")
-    
-    if 'seasonal_recommendations' in prediction:
-        print("\n" + "="*70)
-        print("SEASONAL RECOMMENDATIONS")
-        print("="*70)
-        for i, rec in enumerate(prediction['seasonal_recommendations'], 1):
-            print(f"{i}. {rec}")
-    
-    print("\n" + "="*70)
-    print("NOTE: This is an advisory system. Please consult with local agricultural")
-    print("extension officers for specific advice for your farm.")
-    print("="*70)
+    # Console report, only built when DEBUG logging is enabled
+    if logger.isEnabledFor(logging.DEBUG):
+        requirements = prediction['requirements']
+        sections = [("CROP REQUIREMENTS", [
+            f"Nitrogen: {requirements['nitrogen_kg_per_ha']} kg/ha",
+            f"Phosphorus: {requirements['phosphorus_kg_per_ha']} kg/ha",
+            f"Potassium: {requirements['potassium_kg_per_ha']} kg/ha",
+            f"Water: {requirements['water_requirement_mm']} mm",
+        ])]
+        if 'planting_info' in requirements:
+            planting = requirements['planting_info']
+            sections.append(("PLANTING INFORMATION", [
+                f"Row Spacing: {planting['row_spacing_cm']} cm",
+                f"Plant Spacing: {planting['plant_spacing_cm']} cm",
+                f"Planting Depth: {planting['planting_depth_cm']} cm",
+            ]))
+        if 'expected_yield_tons_per_ha' in prediction:
+            sections.append(("YIELD INFORMATION", [f"Expected Yield: {prediction['expected_yield_tons_per_ha']} tons/ha"]))
+        if 'intercropping_recommendation' in prediction:
+            sections.append(("INTERCROPPING RECOMMENDATIONS",
+                             [f"Compatible crops: {', '.join(prediction['intercropping_recommendation'])}"]))
+        if 'seasonal_recommendations' in prediction:
+            sections.append(("SEASONAL RECOMMENDATIONS",
+                             [f"{i}. {rec}" for i, rec in enumerate(prediction['seasonal_recommendations'], 1)]))
+        logger.debug("Crop requirements for %s, %s:%s", district_name, sector_name, format_report(sections))
     
     
     # Return the formatted response to the API client
@@ -182,7 +219,7 @@ def make_crop_requirement_prediction(request):
 from django.shortcuts import render
 from .predict_soil_type import predict_soil_texture
 from .predict_locationl_altitude import predict_altitude
-from .predict_weather import get_forecast_summary
+from .predict_weather import WeatherForecastSummary
 from .predict_crop_requirements import predict_crop_requirements
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
@@ -214,143 +251,6 @@ def get_season_months(season_name):
     return season_mappings.get(season_name, [])
 
 
-# New helper function to extract monthly weather data from forecast
-def extract_monthly_data(weather_text, months):
-    """Extract weather data for specific months from the forecast text."""
-    monthly_data = {}
-    
-    # Process weather text to extract monthly information
-    if not weather_text:
-        return monthly_data
-    
-    lines = weather_text.split('\n')
-    current_month = None
-    
-    for line in lines:
-        line = line.strip()
-        
-        # Look for month headers
-        for month in months:
-            if line.startswith(month + ":"):
-                current_month = month
-                monthly_data[current_month] = {}
-        
-        # If we're in a month section, collect the data
-        if current_month and line and ':' in line:
-            # Skip month header line
-            if not line.startswith(current_month):
-                key, value = line.split(':', 1)
-                key = key.strip()
-                value = value.strip()
-                
-                # Extract numeric values
-                if "Temperature" in key:
-                    try:
-                        monthly_data[current_month]["temperature"] = float(value.split('°C')[0])
-                    except:
-                        pass
-                elif "Rainfall" in key:
-                    try:
-                        monthly_data[current_month]["rainfall"] = float(value.split('mm')[0])
-                    except:
-                        pass
-                elif "Humidity" in key:
-                    try:
-                        monthly_data[current_month]["humidity"] = float(value.split('%')[0])
-                    except:
-                        pass
-    
-    return monthly_data
-
-
-# New helper function to extract seasonal weather data
-def extract_seasonal_data(weather_text, season_name):
-    """Extract seasonal forecast summary for the specified season."""
-    season_data = {}
-    
-    # Map season name to how it appears in the forecast
-    season_display_names = {
-        "short_rainy": "Minor Rainy Season",
-        "short_dry": "Minor Dry Season",
-        "long_rainy": "Major Rainy Season",
-        "long_dry": "Major Dry Season"
-    }
-    
-    # Alternative names sometimes used
-    alternative_names = {
-        "minor_rainy": "Minor Rainy Season",
-        "minor_dry": "Minor Dry Season",
-        "major_rainy": "Major Rainy Season",
-        "major_dry": "Major Dry Season"
-    }
-    
-    # Check which display name to use
-    display_name = season_display_names.get(season_name, "")
-    if not display_name and season_name in alternative_names:
-        display_name = alternative_names[season_name]
-    
-    if not display_name or not weather_text:
-        return season_data
-    
-    lines = weather_text.split('\n')
-    in_season_section = False
-    
-    for i, line in enumerate(lines):
-        if display_name + ":" in line:
-            in_season_section = True
-            continue
-        
-        if in_season_section:
-            # Check if we've reached the next season or section
-            if "Season:" in line or "MONTHLY FORECAST" in line:
-                break
-            
-            line = line.strip()
-            if line and ':' in line:
-                key, value = line.split(':', 1)
-                key = key.strip()
-                value = value.strip()
-                
-                if "Temperature" in key:
-                    try:
-                        temp_parts = value.split('°C')[0].strip()
-                        season_data["avg_temperature"] = float(temp_parts)
-                        
-                        # Try to extract temperature range
-                        if "Range:" in value:
-                            range_part = value.split('Range:')[1].strip()
-                            min_temp, max_temp = range_part.split(' to ')
-                            season_data["min_temperature"] = float(min_temp.split('°C')[0])
-                            season_data["max_temperature"] = float(max_temp.split('°C')[0])
-                    except:
-                        pass
-                elif "Rainfall" in key:
-                    try:
-                        # Extract total rainfall
-                        if "Total:" in value:
-                            total_part = value.split('Total:')[1].strip()
-                            season_data["total_rainfall"] = float(total_part.split('mm')[0])
-                        
-                        # Extract average rainfall
-                        if "Avg:" in value:
-                            avg_part = value.split('Avg:')[1].strip()
-                            season_data["avg_rainfall_per_day"] = float(avg_part.split('mm/day')[0])
-                            
-                        # Extract max rainfall
-                        if "Max:" in value:
-                            max_part = value.split('Max:')[1].strip()
-                            season_data["max_rainfall_per_day"] = float(max_part.split('mm/day')[0])
-                    except:
-                        pass
-                elif "Humidity" in key:
-                    try:
-                        season_data["humidity"] = float(value.split('%')[0])
-                    except:
-                        pass
-    
-    return season_data
-
-
 # New function to adjust water requirements based on weather
 def adjust_water_requirement(base_requirement, season_data, monthly_data):
     """
@@ -400,12 +300,23 @@ def adjust_water_requirement(base_requirement, season_data, monthly_data):
 from .models import CropRequirementPrediction
 from weatherDataApp.models import WeatherData
 
+
+# WeatherData fields holding a forecast summary's seasonal and monthly values
+def weather_record_fields(weather_data):
+    weather_dict = weather_data.to_dict()
+    seasonal_data = weather_dict['seasonal_data']
+    fields = {'monthly_data': weather_dict['monthly_data']}
+    for season_key in ['minor_dry', 'major_rainy', 'major_dry', 'minor_rainy']:
+        season = seasonal_data.get(season_key, {})
+        fields[f'{season_key}_season_temp'] = season.get('temperature')
+        fields[f'{season_key}_season_rainfall'] = season.get('rainfall')
+        fields[f'{season_key}_season_humidity'] = season.get('humidity')
+    return fields
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated]) 
 def make_weather_adjusted_crop_prediction(request):
-    print("==== Rwanda Agriculture Weather-Adjusted Advisory System ====")
-    print("This system predicts crop requirements adjusted for seasonal weather patterns.")
-    
     # Collect user inputs
     district_name = request.data.get("district")
     sector_name = request.data.get("sector")
@@ -416,58 +327,51 @@ def make_weather_adjusted_crop_prediction(request):
     if not district_name or not sector_name or not crop_name or not season_name:
         return Response({"error": "District, sector, crop name, and season are required."}, status=400)
     
-    # Get soil texture prediction
-    print("\nAnalyzing soil data for this location...")
-    soil_prediction = get_soil_texture(district_name, sector_name)
+    # Soil texture, altitude and weather forecast are looked up concurrently
+    logger.debug("Analyzing soil, altitude and weather data for %s, %s", district_name, sector_name)
+    stages = get_location_stages(district_name, sector_name)
+    soil_prediction = stages['soil']
+    altitude_prediction = stages['altitude']
+    weather_data = stages['weather']
     
     if isinstance(soil_prediction, dict) and "error" in soil_prediction:
-        print(f"\n❌ {soil_prediction['error']}")
-        return Response({"error": soil_prediction['error']}, status=400)
-    
-    print(f"\n✅ Predicted soil texture for {district_name}, {sector_name}: {soil_prediction}")
-    
-    # Get altitude
-    altitude_prediction = get_location_altitude(district_name, sector_name)
+        logger.info("Soil lookup for %s, %s failed: %s", district_name, sector_name, soil_prediction['error'])
+        return Response({"error": soil_prediction['error']}, status=stages.error_status('soil'))
     
     if isinstance(altitude_prediction, dict) and "error" in altitude_prediction:
-        print(f"\n❌ {altitude_prediction['error']}")
-        return Response({"error": altitude_prediction['error']}, status=400)
+        logger.info("Altitude lookup for %s, %s failed: %s", district_name, sector_name, altitude_prediction['error'])
+        return Response({"error": altitude_prediction['error']}, status=stages.error_status('altitude'))
     
-    print(f"\n✅ Predicted altitude for {district_name}, {sector_name}: {altitude_prediction}")
+    logger.debug("Predicted %s soil at %s altitude for %s, %s", soil_prediction, altitude_prediction, district_name, sector_name)
     
     altitude = altitude_prediction
     
-    # Get weather forecast
-    print("\nRetrieving weather data for this location...")
-    weather_data = get_weather(district_name, sector_name)
-    
     if isinstance(weather_data, dict) and "error" in weather_data:
-        print(f"\n❌ {weather_data['error']}")
-        return Response({"error": weather_data['error']}, status=400)
+        logger.info("Weather lookup for %s, %s failed: %s", district_name, sector_name, weather_data['error'])
+        return Response({"error": weather_data['error']}, status=stages.error_status('weather'))
     
     # Make base crop requirement prediction
-    print("\nGenerating base crop requirements...")
-    base_prediction = predict_crop_requirements(crop_name, soil_prediction, altitude=altitude, season=season_name)
+    logger.debug("Generating base %s requirements", crop_name)
+    base_prediction = get_crop_requirements(crop_name, soil_prediction, altitude, season_name)
     
     # Handle errors in prediction
     if isinstance(base_prediction, dict) and 'error' in base_prediction:
-        print(f"\n❌ Error in prediction: {base_prediction['error']}")
+        logger.info("Crop requirement prediction for %s failed: %s", crop_name, base_prediction['error'])
         return Response({"error": base_prediction['error']}, status=400)
     
     # Get months for the given season
     season_months = get_season_months(season_name)
-    print(f"\nAnalyzing weather for {season_name} season (months: {', '.join(season_months)})")
+    logger.debug("Analyzing weather for %s season (months: %s)", season_name, ', '.join(season_months))
     
-    # Extract weather data for the season months
-    monthly_weather_data = extract_monthly_data(weather_data, season_months)
-    seasonal_weather_data = extract_seasonal_data(weather_data, season_name)
+    # Weather data for the season months
+    monthly_weather_data = weather_data.monthly_data(season_months)
+    seasonal_weather_data = weather_data.seasonal_data(season_name)
     
     # Adjust water requirements based on weather
     base_water_req = base_prediction['requirements']['water_requirement_mm']
     adjusted_water_req = adjust_water_requirement(base_water_req, seasonal_weather_data, monthly_weather_data)
     
-    print(f"\nBase water requirement: {base_water_req:.2f} mm")
-    print(f"Weather-adjusted water requirement: {adjusted_water_req:.2f} mm")
+    logger.debug("Water requirement %.2f mm, %.2f mm after the weather adjustment", base_water_req, adjusted_water_req)
     
     # Calculate adjustment for fertilizer requirements based on rainfall
     # More rainfall can leach nutrients, requiring more fertilizer
@@ -525,7 +429,7 @@ def make_weather_adjusted_crop_prediction(request):
             "potassium_kg_per_ha": base_prediction['requirements']['potassium_kg_per_ha'],
             "water_requirement_mm": base_water_req,
         },
-        "weather": weather_data,
+        "weather": serialize_weather(weather_data, request),
     }
     
     # Add optional information if available
@@ -570,10 +474,11 @@ def make_weather_adjusted_crop_prediction(request):
         
   
     # Save base requirements to database
+    saving_started = time.perf_counter()
     try:
         
         if request.user:
-            print(f"Found user making prediction: {request.user.email}")
+            logger.debug("Saving prediction for %s", request.user.email)
             # Create default values dictionary with required fields
             defaults = {
                 'soil_type': base_prediction.get('soil_type', soil_prediction),
@@ -621,7 +526,7 @@ def make_weather_adjusted_crop_prediction(request):
             response_data['requirement_id'] = crop_req.id
             response_data['is_new_requirement'] = created
             
-            print(f"\n✅ {'Created' if created else 'Updated'} crop requirement record with ID: {crop_req.id}")
+            logger.debug("%s crop requirement record %s", 'Created' if created else 'Updated', crop_req.id)
             
             # THEN create and save the weather record
             # THEN create and save the weather record
@@ -629,84 +534,51 @@ def make_weather_adjusted_crop_prediction(request):
                 district=district_name,
                 sector=sector_name,
                 season=season_name,
-                # Weather data fields...
-                monthly_data=weather_data.get('monthly_data', {}),
-                
-                minor_dry_season_temp=weather_data.get('seasonal_data', {}).get('minor_dry', {}).get('temperature'),
-                minor_dry_season_rainfall=weather_data.get('seasonal_data', {}).get('minor_dry', {}).get('rainfall'),
-                minor_dry_season_humidity=weather_data.get('seasonal_data', {}).get('minor_dry', {}).get('humidity'),
-                
-                major_rainy_season_temp=weather_data.get('seasonal_data', {}).get('major_rainy', {}).get('temperature'),
-                major_rainy_season_rainfall=weather_data.get('seasonal_data', {}).get('major_rainy', {}).get('rainfall'),
-                major_rainy_season_humidity=weather_data.get('seasonal_data', {}).get('major_rainy', {}).get('humidity'),
-                
-                major_dry_season_temp=weather_data.get('seasonal_data', {}).get('major_dry', {}).get('temperature'),
-                major_dry_season_rainfall=weather_data.get('seasonal_data', {}).get('major_dry', {}).get('rainfall'),
-                major_dry_season_humidity=weather_data.get('seasonal_data', {}).get('major_dry', {}).get('humidity'),
-                
-                minor_rainy_season_temp=weather_data.get('seasonal_data', {}).get('minor_rainy', {}).get('temperature'),
-                minor_rainy_season_rainfall=weather_data.get('seasonal_data', {}).get('minor_rainy', {}).get('rainfall'),
-                minor_rainy_season_humidity=weather_data.get('seasonal_data', {}).get('minor_rainy', {}).get('humidity'),
-                
                 created_by=request.user,
+                **weather_record_fields(weather_data),
             )
             weather_record.related_prediction = crop_req
             weather_record.save()
-            print(f"\n✅ Saved weather data record for {district_name}, {sector_name}")
+            logger.debug("Saved weather data record for %s, %s", district_name, sector_name)
             
             
         else:
-            print("\n⚠️ User not authenticated - crop requirement data not saved")
+            logger.debug("User not authenticated - crop requirement data not saved")
     except Exception as e:
-        print(f"\n❌ Error saving crop requirement data: {str(e)}")
+        logger.warning("Error saving crop requirement data: %s", e)
         # Don't return an error to the user, just log it and continue
-    
-    # Keep console output for debugging
-    print("\n" + "="*70)
-    print("WEATHER-ADJUSTED CROP REQUIREMENTS")
-    print("="*70)
-    print(f"Nitrogen: {adjusted_nitrogen:.2f} kg/ha (Base: {base_prediction['requirements']['nitrogen_kg_per_ha']:.2f} kg/ha)")
-    print(f"Phosphorus: {adjusted_phosphorus:.2f} kg/ha (Base: {base_prediction['requirements']['phosphorus_kg_per_ha']:.2f} kg/ha)")
-    print(f"Potassium: {adjusted_potassium:.2f} kg/ha (Base: {base_prediction['requirements']['potassium_kg_per_ha']:.2f} kg/ha)")
-    print(f"Water: {adjusted_water_req:.2f} mm (Base: {base_water_req:.2f} mm)")
-    
-    if 'planting_info' in base_prediction['requirements']:
-        print("\n" + "="*70)
-        print("PLANTING INFORMATION")
-        print("="*70)
-        planting = base_prediction['requirements']['planting_info']
-        print(f"Row Spacing: {planting['row_spacing_cm']} cm")
-        print(f"Plant Spacing: {planting['plant_spacing_cm']} cm")
-        print(f"Planting Depth: {planting['planting_depth_cm']} cm")
-    
-    if 'expected_yield_tons_per_ha' in response_data:
-        print("\n" + "="*70)
-        print("YIELD INFORMATION")
-        print("="*70)
-        print(f"Expected Yield: {response_data['expected_yield_tons_per_ha']:.2f} tons/ha (Base: {base_prediction['expected_yield_tons_per_ha']:.2f} tons/ha)")
-    
-    if 'intercropping_recommendation' in response_data:
-        print("\n" + "="*70)
-        print("INTERCROPPING RECOMMENDATIONS") 
-        print("="*70)
-        print(f"Compatible crops: {', '.join(response_data['intercropping_recommendation'])}")
-    
-    print("\n" + "="*70)
-    print("WEATHER-SPECIFIC RECOMMENDATIONS")
-    print("="*70)
-    for i, rec in enumerate(weather_specific_recommendations, 1):
-        print(f"{i}. {rec}")
-    
-    print("\n" + "="*70)
-    print("SEASONAL RECOMMENDATIONS")
-    print("="*70)
-    for i, rec in enumerate(response_data['seasonal_recommendations'], 1):
-        print(f"{i}. {rec}")
-    
-    print("\n" + "="*70)
-    print("NOTE: This is an advisory system. Please consult with local agricultural")
-    print("extension officers for specific advice for your farm.")
-    print("="*70)
+    record_stage('db', time.perf_counter() - saving_started)
+    
+    # Console report, only built when DEBUG logging is enabled
+    if logger.isEnabledFor(logging.DEBUG):
+        base = base_prediction['requirements']
+        sections = [("WEATHER-ADJUSTED CROP REQUIREMENTS", [
+            f"Nitrogen: {adjusted_nitrogen:.2f} kg/ha (Base: {base['nitrogen_kg_per_ha']:.2f} kg/ha)",
+            f"Phosphorus: {adjusted_phosphorus:.2f} kg/ha (Base: {base['phosphorus_kg_per_ha']:.2f} kg/ha)",
+            f"Potassium: {adjusted_potassium:.2f} kg/ha (Base: {base['potassium_kg_per_ha']:.2f} kg/ha)",
+            f"Water: {adjusted_water_req:.2f} mm (Base: {base_water_req:.2f} mm)",
+        ])]
+        if 'planting_info' in base:
+            planting = base['planting_info']
+            sections.append(("PLANTING INFORMATION", [
+                f"Row Spacing: {planting['row_spacing_cm']} cm",
+                f"Plant Spacing: {planting['plant_spacing_cm']} cm",
+                f"Planting Depth: {planting['planting_depth_cm']} cm",
+            ]))
+        if 'expected_yield_tons_per_ha' in response_data:
+            sections.append(("YIELD INFORMATION", [
+                f"Expected Yield: {response_data['expected_yield_tons_per_ha']:.2f} tons/ha "
+                f"(Base: {base_prediction['expected_yield_tons_per_ha']:.2f} tons/ha)"
+            ]))
+        if 'intercropping_recommendation' in response_data:
+            sections.append(("INTERCROPPING RECOMMENDATIONS",
+                             [f"Compatible crops: {', '.join(response_data['intercropping_recommendation'])}"]))
+        sections.append(("WEATHER-SPECIFIC RECOMMENDATIONS",
+                         [f"{i}. {rec}" for i, rec in enumerate(weather_specific_recommendations, 1)]))
+        sections.append(("SEASONAL RECOMMENDATIONS",
+                         [f"{i}. {rec}" for i, rec in enumerate(response_data['seasonal_recommendations'], 1)]))
+        logger.debug("Weather-adjusted crop requirements for %s, %s:%s", district_name, sector_name,
+                     format_report(sections))
     
     # Return the formatted response to the API client
     return Response(response_data)
@@ -714,6 +586,138 @@ def make_weather_adjusted_crop_prediction(request):
 
 
 
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from .predict_crop_requirements import predict_crop_requirements_batch
+
+# Items resolved and predicted together; each chunk is flushed before the next starts
+BATCH_CHUNK_SIZE = 100
+
+
+# The soil and altitude predictors report failures as plain strings
+def location_error(prediction):
+    if isinstance(prediction, dict):
+        return prediction.get("error")
+    if isinstance(prediction, str) and (prediction.startswith(("Error", "Failed")) or "not found" in prediction):
+        return prediction
+    return None
+
+
+def iter_batch_crop_requirements(items, chunk_size=BATCH_CHUNK_SIZE):
+    """
+    Yield one result per (district, sector, crop, season) item, in input order.
+    Soil type and altitude come from the per-location lookups. Items found in
+    the advisory matrix are answered from it; the rest run once per chunk
+    through the batch predictor.
+    """
+    for chunk_start in range(0, len(items), chunk_size):
+        chunk = items[chunk_start:chunk_start + chunk_size]
+        results = [None] * len(chunk)
+        to_predict = []
+        
+        for offset, item in enumerate(chunk):
+            item = item if isinstance(item, dict) else {}
+            district_name = item.get("district")
+            sector_name = item.get("sector")
+            crop_name = item.get("crop")
+            season_name = item.get("season")
+            
+            if not district_name or not sector_name or not crop_name or not season_name:
+                results[offset] = {"error": "District, sector, crop name, and season are required."}
+                continue
+            
+            soil_prediction = get_soil_texture(district_name, sector_name)
+            error = location_error(soil_prediction)
+            if error:
+                results[offset] = {"error": error}
+                continue
+            
+            altitude_prediction = get_location_altitude(district_name, sector_name)
+            error = location_error(altitude_prediction)
+            if error:
+                results[offset] = {"error": error}
+                continue
+            
+            stored = lookup_advisory(crop_name, soil_prediction, altitude_prediction, season_name)
+            if stored is not None:
+                results[offset] = stored
+                continue
+            
+            to_predict.append((offset, {
+                "crop": crop_name,
+                "soil_type": soil_prediction,
+                "altitude": altitude_prediction,
+                "season": season_name,
+            }))
+        
+        predictions = predict_crop_requirements_batch(item for _, item in to_predict)
+        for (offset, _), prediction in zip(to_predict, predictions):
+            results[offset] = prediction
+        
+        for offset, result in enumerate(results):
+            item = chunk[offset] if isinstance(chunk[offset], dict) else {}
+            yield {
+                "index": chunk_start + offset,
+                "location": {
+                    "district": item.get("district"),
+                    "sector": item.get("sector")
+                },
+                **result,
+            }
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def make_batch_crop_requirement_prediction(request):
+    """
+    Crop requirements for a list of {district, sector, crop, season} items.
+    Results come back in input order with per-item errors; send "stream": true
+    (or Accept: application/x-ndjson) to receive them as NDJSON lines.
+    """
+    items = request.data.get("items")
+    if not isinstance(items, list) or not items:
+        return Response({"error": "A non-empty list of items is required."}, status=400)
+    
+    max_items = getattr(settings, 'WEATHER_BATCH_MAX_ITEMS', 1000)
+    if len(items) > max_items:
+        return Response({"error": f"At most {max_items} items can be predicted per request."}, status=400)
+    
+    stream = request.data.get("stream") is True or 'application/x-ndjson' in request.META.get('HTTP_ACCEPT', '')
+    if stream:
+        lines = (json.dumps(result, cls=DjangoJSONEncoder) + "\n" for result in iter_batch_crop_requirements(items))
+        return StreamingHttpResponse(lines, content_type='application/x-ndjson')
+    
+    results = list(iter_batch_crop_requirements(items))
+    return Response({
+        "count": len(results),
+        "errors": sum(1 for result in results if "error" in result),
+        "results": results,
+    })
+
+
+from .crop_catalog import crop_catalog
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def autocomplete_crops(request):
+    """
+    Crop names matching a partially typed name (?q=...&limit=10), prefix and
+    alias matches first, then the closest fuzzy matches
+    """
+    query = request.query_params.get("q", "").strip()
+    try:
+        limit = min(max(int(request.query_params.get("limit", 10)), 1), 50)
+    except ValueError:
+        return Response({"error": "limit must be an integer."}, status=400)
+    
+    return Response({"query": query, "results": crop_catalog.autocomplete(query, limit=limit)})
+
+
+
+
 # views.py
 from rest_framework import status, permissions
 from rest_framework.response import Response
@@ -793,15 +797,147 @@ def delete_prediction(request, pk):
                     status=status.HTTP_204_NO_CONTENT)
 
 
+from .model_registry import registry
+from .lazy_imports import import_timings
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def get_model_registry_stats(request):
+    """
+    Report load time and memory for every model artifact held by this process,
+    and how long each lazily imported library took to load
+    """
+    summary = registry.summary()
+    summary['lazy_imports'] = import_timings()
+    return Response(summary)
+
 
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def get_forecast_cache_stats(request):
+    """
+    Report size and hit/miss counters of this process's forecast cache
+    """
+    return Response(forecast_cache.stats())
+
+
+from .model_resolution import model_resolution
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def get_model_resolution_table(request):
+    """
+    Show which water requirement model each (soil, altitude, season) resolves to
+    """
+    return Response(model_resolution.table())
 
 
+from .warmup import warm_up_report
 
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def get_worker_memory(request):
+    """
+    Show the warm-up report and the shared/private memory of the worker serving this request
+    """
+    return Response(warm_up_report())
 
 
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from .district_comparison import latest_comparison_date, load_district_comparison
+from .predict_weather import DISTRICT_COMPARISON_PERIODS
 
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def get_district_comparison(request):
+    """
+    Monthly, seasonal and yearly weather of every district from the comparison
+    cached by ``manage.py build_district_comparison``
+
+    Query parameters: ``date`` (YYYY-MM-DD, default today) and ``period``
+    (monthly, seasonal or yearly, default all three). Without a date, the
+    most recent comparison up to today is served until today's is built;
+    ``forecast_date`` in the response is the date actually served and
+    ``requested_date`` the one asked for.
+    """
+    date_param = request.query_params.get("date")
+    try:
+        forecast_date = parse_date(date_param) if date_param else timezone.localdate()
+    except ValueError:
+        forecast_date = None
+    if forecast_date is None:
+        return Response({"error": "date must be formatted YYYY-MM-DD."}, status=400)
+
+    period = request.query_params.get("period")
+    if period and period not in DISTRICT_COMPARISON_PERIODS:
+        return Response({"error": f"period must be one of {', '.join(DISTRICT_COMPARISON_PERIODS)}."}, status=400)
+
+    requested_date = forecast_date
+    if not date_param:
+        forecast_date = latest_comparison_date(requested_date) or requested_date
+    comparison = load_district_comparison(forecast_date, periods=[period] if period else None)
+    if comparison is None:
+        return Response({"error": f"No district comparison has been built for {forecast_date.isoformat()}."},
+                        status=404)
+
+    metadata, tables = comparison
+    return Response({
+        "requested_date": requested_date.isoformat(),
+        **metadata,
+        **{name: table.to_dict(orient='records') for name, table in tables.items()},
+    })
+
+
+from .forecast_charts import CHART_FORMATS, chart_status, chart_types, request_charts
+from .predict_weather import RWANDA_DISTRICTS
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_forecast_charts(request):
+    """
+    URLs of the yearly forecast charts of a district, or of the district
+    comparison charts when no district is given, for a date
+
+    Charts that were not rendered yet are queued for the
+    ``manage.py render_forecast_charts`` worker and reported as pending
+    (status 202 while any chart is queued) so clients can poll; nothing
+    is drawn in the request.
+
+    Query parameters: ``district``, ``date`` (YYYY-MM-DD, default today,
+    at most WEATHER_FORECAST_CHART_MAX_AGE_DAYS back), ``chart`` (one chart
+    type, default all) and ``image_format`` (png or svg; DRF keeps
+    ``format`` for content negotiation).
+    """
+    district = request.query_params.get("district", "")
+    if district and district not in RWANDA_DISTRICTS:
+        return Response({"error": f"Unknown district '{district}'."}, status=400)
 
+    date_param = request.query_params.get("date")
+    try:
+        forecast_date = parse_date(date_param) if date_param else timezone.localdate()
+    except ValueError:
+        forecast_date = None
+    if forecast_date is None:
+        return Response({"error": "date must be formatted YYYY-MM-DD."}, status=400)
 
+    chart_type = request.query_params.get("chart")
+    if chart_type and chart_type not in chart_types(district):
+        return Response({"error": f"chart must be one of {', '.join(chart_types(district))}."}, status=400)
 
+    fmt = request.query_params.get("image_format", "png")
+    if fmt not in CHART_FORMATS:
+        return Response({"error": f"image_format must be one of {', '.join(CHART_FORMATS)}."}, status=400)
 
+    try:
+        charts = [chart_status(chart)
+                  for chart in request_charts(district, forecast_date, [chart_type] if chart_type else None, fmt)]
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+    queued = any(chart['status'] in ('pending', 'running') for chart in charts)
+    return Response({
+        "district": district or None,
+        "forecast_date": forecast_date.isoformat(),
+        "ready": all(chart['status'] == 'ready' for chart in charts),
+        "charts": charts,
+    }, status=202 if queued else 200)
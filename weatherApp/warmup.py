@@ -0,0 +1,150 @@
+import gc
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Inputs of the synthetic predictions run after loading the models
+SYNTHETIC_CROP = 'Maize'
+SYNTHETIC_ALTITUDE = 'mid'
+SYNTHETIC_SEASON = 'long_rainy'
+
+_last_report = None
+
+
+def memory_usage():
+    """
+    Memory of this process split into pages shared with other processes and
+    pages private to it, from /proc/self/smaps_rollup (Linux 4.14+).
+    Returns None where that file is unavailable.
+    """
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    fields = {}
+    for line in lines[1:]:
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+            fields[parts[0][:-1]] = int(parts[1]) * 1024
+    return {
+        'rss_bytes': fields.get('Rss'),
+        'pss_bytes': fields.get('Pss'),
+        'shared_bytes': fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0),
+        'private_bytes': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0),
+    }
+
+
+def _timed(steps, name, func):
+    start = time.perf_counter()
+    try:
+        result = func()
+    except Exception as e:
+        logger.warning("Warm-up step %s failed: %s", name, e)
+        result = None
+    steps[name] = round(time.perf_counter() - start, 4)
+    return result
+
+
+def run_synthetic_predictions(steps):
+    """One prediction per model so the first real request finds everything initialized."""
+    from .location_index import location_index
+    from .model_registry import registry
+    from .predict_crop_requirements import predict_crop_requirements
+    from .predict_locationl_altitude import predict_altitude
+    from .predict_soil_type import predict_soil_texture
+
+    records = location_index.records()
+    if records:
+        district, sector = records[0].district, records[0].sector
+        _timed(steps, 'predict_soil_texture', lambda: predict_soil_texture(district, sector))
+        _timed(steps, 'predict_altitude', lambda: predict_altitude(district, sector))
+
+    # Only the soil types already in the bundle cache, so this does not load more than the budget
+    for soil_type in registry.soil_bundles.stats()['soil_types']:
+        _timed(steps, f"predict_crop_requirements[{soil_type['soil_type']}]", lambda: predict_crop_requirements(
+            SYNTHETIC_CROP, soil_type['soil_type'], altitude=SYNTHETIC_ALTITUDE, season=SYNTHETIC_SEASON))
+
+
+def warm_up(before_fork=False):
+    """
+    Load the weather, soil, altitude and crop models plus the in-memory
+    tables and forecasts, then run a synthetic prediction per model.
+
+    Meant to run once per server process. ``before_fork=True`` also runs
+    ``prepare_for_fork``; only pass it in a process that is about to fork
+    workers.
+
+    Returns the report, which is also kept for ``warm_up_report``.
+    """
+    global _last_report
+
+    if not getattr(settings, 'WEATHER_PRELOAD_MODELS', True):
+        return None
+
+    from .crop_catalog import crop_catalog
+    from .forecast_cache import forecast_cache
+    from .location_index import location_index
+    from .location_predictions import location_predictions
+    from .model_registry import registry
+    from .model_resolution import model_resolution
+
+    start = time.perf_counter()
+    steps = {}
+    registry.track_memory = getattr(settings, 'WEATHER_TRACK_MODEL_MEMORY', True)
+    _timed(steps, 'model_registry', registry.warm_up)
+    _timed(steps, 'location_index', location_index.warm_up)
+    _timed(steps, 'location_predictions', location_predictions.reload)
+    _timed(steps, 'model_resolution', model_resolution.warm_up)
+    _timed(steps, 'crop_catalog', crop_catalog.warm_up)
+    _timed(steps, 'forecast_cache', forecast_cache.warm_up)
+    if getattr(settings, 'WEATHER_WARM_UP_PREDICTIONS', True):
+        run_synthetic_predictions(steps)
+
+    _last_report = {
+        'pid': os.getpid(),
+        'seconds': round(time.perf_counter() - start, 4),
+        'before_fork': False,
+        'frozen_objects': gc.get_freeze_count(),
+        'steps': steps,
+        'memory': memory_usage(),
+    }
+    logger.info("Warmed up weather models in %.2fs (pid %d)", _last_report['seconds'], _last_report['pid'])
+    if before_fork:
+        prepare_for_fork()
+    return _last_report
+
+
+def prepare_for_fork():
+    """
+    Get a warmed-up master process ready to fork workers: close the DB
+    connections opened while warming up (forked workers must not share
+    them) and move every object created so far to the permanent GC
+    generation with ``gc.freeze()``, so collections in the workers do not
+    write to, and un-share, those pages.
+
+    Called from gunicorn's when_ready hook (see gunicorn.conf.py); a
+    process that never forks should not call it.
+    """
+    connections.close_all()
+    gc.collect()
+    gc.freeze()
+    if _last_report is not None:
+        _last_report['before_fork'] = True
+        _last_report['frozen_objects'] = gc.get_freeze_count()
+    logger.info("Froze %d objects before forking workers (pid %d)", gc.get_freeze_count(), os.getpid())
+
+
+def warm_up_report():
+    """The last warm-up report (inherited from the master after a fork) and this process's memory now."""
+    return {
+        'pid': os.getpid(),
+        'warm_up': _last_report,
+        'memory': memory_usage(),
+    }
@@ -0,0 +1,146 @@
+import contextlib
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from .lazy_imports import load_module
+from .model_registry import WEATHER_MODEL_RUNS_DIR, models_dir
+from .predict_weather import LOCATION_LSTM_TARGETS, location_model_files
+
+logger = logging.getLogger(__name__)
+
+# Thread pool sizes read by the math libraries when they load in a worker process
+THREAD_ENV_VARS = ['OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS']
+
+_thread_limits = None
+
+
+def weather_runs_dir():
+    """Directory holding one subdirectory per trained version of the location LSTM models."""
+    return os.path.join(models_dir, WEATHER_MODEL_RUNS_DIR)
+
+
+def new_version():
+    return datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+@contextlib.contextmanager
+def thread_env(threads):
+    """Set the thread pool sizes in the environment inherited by worker processes started inside the block."""
+    saved = {name: os.environ.get(name) for name in THREAD_ENV_VARS}
+    os.environ.update({name: str(threads) for name in THREAD_ENV_VARS})
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def _init_worker(threads):
+    # Also caps BLAS/OpenMP pools that were created before the environment was read
+    from threadpoolctl import threadpool_limits
+    global _thread_limits
+    _thread_limits = threadpool_limits(threads)
+
+
+def train_target(target_short, data_path, output_dir, threads, train_options):
+    """
+    Train one target in a worker process and save its artifacts to output_dir.
+
+    The training output goes to ``<target>_training.log`` next to the
+    artifacts. Returns the target's manifest entry.
+    """
+    from .predict_weather import clean_weather_data, train_location_lstm_model
+    pd = load_module('pandas')
+    tf = load_module('tensorflow')
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+    start = time.perf_counter()
+    log_file = f'{target_short}_training.log'
+    with open(os.path.join(output_dir, log_file), 'w') as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        cleaned = clean_weather_data(pd.read_csv(data_path, parse_dates=['date']))
+        result = train_location_lstm_model(cleaned, target_short, models_dir=output_dir, plots_dir=None,
+                                           verbose=2, **train_options)
+
+    return {
+        'target_col': LOCATION_LSTM_TARGETS[target_short],
+        'test_mse': result['test_mse'],
+        'wall_seconds': round(time.perf_counter() - start, 3),
+        'train_sequences': result['train_sequences'],
+        'test_sequences': result['test_sequences'],
+        'pid': os.getpid(),
+        'files': location_model_files(target_short) + [log_file],
+    }
+
+
+def train_weather_models(data_path, targets=None, version=None, workers=None, threads_per_worker=None,
+                         metadata=None, **train_options):
+    """
+    Train the location LSTM targets in parallel worker processes into a new
+    versioned directory under weather_runs_dir().
+
+    Each target trains in its own spawned process (TensorFlow is not
+    fork-safe) with ``threads_per_worker`` BLAS/OpenMP/TensorFlow threads,
+    by default the CPUs split evenly between the workers so they do not
+    oversubscribe the machine. Everything is written to a hidden temporary
+    directory that is renamed to the version only once every target has
+    finished and manifest.json is written, so a version directory is always
+    complete. ``train_options`` are passed to train_location_lstm_model.
+
+    Returns:
+        (path of the version directory, manifest dict)
+    """
+    targets = list(targets or LOCATION_LSTM_TARGETS)
+    version = version or new_version()
+    workers = min(workers or len(targets), len(targets))
+    threads = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+
+    runs_dir = weather_runs_dir()
+    version_dir = os.path.join(runs_dir, version)
+    if os.path.exists(version_dir):
+        raise FileExistsError(f"Weather model version {version} already exists: {version_dir}")
+    tmp_dir = os.path.join(runs_dir, f'.{version}.tmp')
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    start = time.perf_counter()
+    try:
+        with thread_env(threads), ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker, initargs=(threads,),
+        ) as pool:
+            futures = {target: pool.submit(train_target, target, os.path.abspath(data_path), tmp_dir,
+                                           threads, train_options)
+                       for target in targets}
+            results = {target: future.result() for target, future in futures.items()}
+
+        manifest = {
+            'version': version,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            **(metadata or {}),
+            'data_path': os.path.abspath(data_path),
+            'parameters': train_options,
+            'workers': workers,
+            'threads_per_worker': threads,
+            'wall_seconds': round(time.perf_counter() - start, 3),
+            'targets': results,
+        }
+        with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.rename(tmp_dir, version_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    logger.info("Trained weather models %s (%s) in %.1fs", version, ', '.join(targets), manifest['wall_seconds'])
+    return version_dir, manifest